@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""Measure the number of events per second simulated by each policy.
+
+Every policy serves the same stationary workload on the same topology. Rates
+can be saved to a JSON file and compared with those of another revision of
+the simulator, which prints the speedup of each policy. Reference rates are
+recorded by copying the script next to the nfvpysim package of the other
+revision, which may predate batching and memoization of sessions, and
+running it there with --save. Policies that revision cannot simulate are
+skipped.
+
+By default, the whole experiment is timed, including the construction of the
+network model. With --kernel, only the time spent in process_event is,
+with events passed one by one.
+
+Usage:
+    python benchmark_policies.py [--policies P1,P2] [--topology NAME]
+                                 [--n-events N] [--per-event] [--kernel]
+                                 [--save rates.json] [--compare rates.json]
+"""
+import argparse
+import json
+import random
+import time
+
+from nfvpysim.registry import TOPOLOGY_FACTORY, WORKLOAD, VNF_ALLOCATION, POLICY
+from nfvpysim.execution import exec_experiment
+
+__all__ = ['benchmark_policy', 'benchmark_policies']
+
+DEFAULT_POLICIES = ['BASELINE', 'MARKOV', 'FIRST_ORDER', 'HOD_VNF', 'HOD_VNF_OFF', 'HOD_DEG',
+                    'HOD_CLOSE', 'HOD_PAGE', 'HOD_EIGEN', 'FIRST_FIT', 'TAP_ALGO', 'BCSP']
+
+
+def _timed(method, elapsed):
+    """Return a method adding the time spent in each of its calls to elapsed,
+    a list holding the total time and the number of calls
+    """
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            elapsed[0] += time.perf_counter() - start
+            elapsed[1] += 1
+    return timed
+
+
+def benchmark_policy(policy, topology='TATANLD', n_events=20000, cache_budget=8,
+                     per_event=False, kernel=False, seed=1):
+    """Simulate a stationary workload with a policy and return its rate.
+
+    Parameters
+    ----------
+    policy : str
+        The name of the policy
+    topology : str, optional
+        The name of the topology
+    n_events : int, optional
+        The number of events simulated
+    cache_budget : int, optional
+        The cache budget of the static VNF allocation
+    per_event : bool, optional
+        If True, events are passed one by one to process_event, so that only
+        the traversal of paths is measured, without batching or memoization
+    kernel : bool, optional
+        If True, only the time spent in process_event is measured, excluding
+        the construction of the network model and the dispatch of events.
+        Events are passed one by one, as with per_event
+    seed : int, optional
+        The seed of the topology and of the workload
+
+    Returns
+    -------
+    rate : float
+        The number of events simulated per second
+    """
+    random.seed(seed)
+    topo = TOPOLOGY_FACTORY[topology]()
+    VNF_ALLOCATION['STATIC'](topo, cache_budget=cache_budget)
+    workload = list(WORKLOAD['STATIONARY_RANDOM_SFC'](topo, sfc_req_rate=100.0, n_warmup=0,
+                                                      n_measured=n_events, seed=seed))
+    policy_cls = POLICY[policy]
+    # Revisions predating batching and memoization lack these attributes
+    saved = getattr(policy_cls, 'supports_batch', False), \
+        getattr(policy_cls, 'memoize_sessions', False)
+    process_event = vars(policy_cls).get('process_event')
+    kernel_elapsed = [0.0, 0]
+    if per_event or kernel:
+        policy_cls.supports_batch = policy_cls.memoize_sessions = False
+    if kernel:
+        policy_cls.process_event = _timed(policy_cls.process_event, kernel_elapsed)
+    try:
+        start = time.perf_counter()
+        results = exec_experiment(topo, workload, {}, {'name': policy}, {'name': 'NFV_CACHE'},
+                                  {'ACCEPTANCE_RATIO': {}, 'LATENCY': {}})
+        elapsed = time.perf_counter() - start
+    finally:
+        policy_cls.supports_batch, policy_cls.memoize_sessions = saved
+        if process_event is not None:
+            policy_cls.process_event = process_event
+        elif kernel:
+            del policy_cls.process_event
+    # Older revisions return no results for policies they cannot simulate
+    if results is None:
+        raise ValueError('Policy %s is not simulated by this revision' % policy)
+    if kernel:
+        if kernel_elapsed[1] != n_events:
+            raise ValueError('Policy %s processed %d events out of %d'
+                             % (policy, kernel_elapsed[1], n_events))
+        elapsed = kernel_elapsed[0]
+    return n_events / elapsed
+
+
+def benchmark_policies(policies, repeat=3, **kwargs):
+    """Return the best rate out of a number of runs of each policy.
+
+    Parameters
+    ----------
+    policies : list
+        The names of the policies
+    repeat : int, optional
+        The number of runs of each policy
+    **kwargs
+        Arguments passed to benchmark_policy
+
+    Returns
+    -------
+    rates : dict
+        The rate of each policy, in events per second. Policies that cannot
+        be simulated are skipped
+    """
+    rates = {}
+    for policy in policies:
+        try:
+            rates[policy] = max(benchmark_policy(policy, **kwargs) for _ in range(repeat))
+        except ValueError as error:
+            print("Skipped %s: %s" % (policy, error))
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--policies", default=','.join(DEFAULT_POLICIES),
+                        help="Comma-separated names of the policies")
+    parser.add_argument("--topology", default='TATANLD', help="The name of the topology")
+    parser.add_argument("--n-events", type=int, default=20000, help="The number of events")
+    parser.add_argument("--repeat", type=int, default=3, help="The number of runs of each policy")
+    parser.add_argument("--per-event", action='store_true',
+                        help="Disable batching and memoization of sessions")
+    parser.add_argument("--kernel", action='store_true',
+                        help="Time process_event alone, with events passed one by one")
+    parser.add_argument("--save", help="Save the rates to a JSON file")
+    parser.add_argument("--compare", help="Print the speedup over rates saved to a JSON file")
+    args = parser.parse_args()
+    rates = benchmark_policies(args.policies.split(','), repeat=args.repeat,
+                               topology=args.topology, n_events=args.n_events,
+                               per_event=args.per_event, kernel=args.kernel)
+    reference = {}
+    if args.compare:
+        with open(args.compare) as f:
+            reference = json.load(f)
+    for policy, rate in rates.items():
+        line = "%-12s %10.0f events/s" % (policy, rate)
+        if policy in reference:
+            line += "  speedup: %.2fx" % (rate / reference[policy])
+        print(line)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(rates, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
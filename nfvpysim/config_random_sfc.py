@@ -21,6 +21,21 @@ N_PROCESSES = cpu_count()
 # Currently only PICKLE is supported
 RESULTS_FORMAT = 'PICKLE'
 
+# Directory where node centralities of topologies are stored, so that they are
+# computed only once across processes and campaigns. If None, they are only
+# kept in memory. Set it to a directory (e.g. 'centrality_cache') to opt in
+CENTRALITY_CACHE_DIR = None
+
+# If True, experiments differing only in their policy are simulated together,
+# generating or reading the workload once and feeding the same events to all
+# policies. Results are still stored once per policy
+MULTI_POLICY_EXECUTION = False
+
+# Catalog of the VNF types: the name of a registered catalog, the path of a
+# JSON file or a dict with the 'cpu' demand of each VNF and, optionally, its
+# 'proc_delay', 'proc_delay_spread', 'memory' and 'names'
+VNF_CATALOG = 'DEFAULT'
+
 # Number of times each experiment is replicated
 # This is necessary for extracting confidence interval of selected metrics
 N_REPLICATIONS = 10
@@ -58,11 +73,16 @@ N_MEASURED_REQUESTS = [10 ** 3]
 # Number of requests per second (over the whole network)
 SFC_REQ_RATES = 100.0
 
+# Whether workloads draw random numbers in blocks from a NumPy generator, which
+# is faster but gives other requests than the random module for the same seed
+VECTORIZED_WORKLOAD = False
+
 # vnf allocation policy
 VNF_ALLOCATION_POLICY = 'STATIC'
 
 
-# NFV cache policy for storing VNFs
+# NFV cache policy for storing VNFs. NFV_CACHE_BITMASK behaves as NFV_CACHE
+# with constant-time lookups
 NFV_NODE_CACHE_POLICY = 'NFV_CACHE'
 
 # List of topologies tested
@@ -86,7 +106,8 @@ default = Tree()
 default['workload'] = {'name': 'STATIONARY_RANDOM_SFC',
                        'n_warmup': N_WARMUP_REQUESTS,
                        'n_measured': N_MEASURED_REQUESTS,
-                       'sfc_req_rate': SFC_REQ_RATES}
+                       'sfc_req_rate': SFC_REQ_RATES,
+                       'vectorized': VECTORIZED_WORKLOAD}
 
 default['vnf_allocation']['name'] = VNF_ALLOCATION_POLICY
 default['nfv_cache_policy']['name'] = NFV_NODE_CACHE_POLICY
@@ -21,6 +21,21 @@ N_PROCESSES = cpu_count()
 # Currently only PICKLE is supported
 RESULTS_FORMAT = 'PICKLE'
 
+# Directory where node centralities of topologies are stored, so that they are
+# computed only once across processes and campaigns. If None, they are only
+# kept in memory. Set it to a directory (e.g. 'centrality_cache') to opt in
+CENTRALITY_CACHE_DIR = None
+
+# If True, experiments differing only in their policy are simulated together,
+# generating or reading the workload once and feeding the same events to all
+# policies. Results are still stored once per policy
+MULTI_POLICY_EXECUTION = False
+
+# Catalog of the VNF types: the name of a registered catalog, the path of a
+# JSON file or a dict with the 'cpu' demand of each VNF and, optionally, its
+# 'proc_delay', 'proc_delay_spread', 'memory' and 'names'
+VNF_CATALOG = 'DEFAULT'
+
 # Number of times each experiment is replicated
 # This is necessary for extracting confidence interval of selected metrics
 N_REPLICATIONS = 5
@@ -60,6 +75,10 @@ N_MEASURED_REQUESTS = 1 * 10 ** 3
 SFC_REQ_RATE = 10.0
 #SFC_REQ_RATES = [100, 200, 300, 400, 500, 600, 700, 800, 900, 1000]
 
+# Whether workloads draw random numbers in blocks from a NumPy generator, which
+# is faster but gives other requests than the random module for the same seed
+VECTORIZED_WORKLOAD = False
+
 # vnf allocation policy
 VNF_ALLOCATION_POLICY = 'STATIC'
 
@@ -68,7 +87,8 @@ VNF_ALLOCATION_POLICY = 'STATIC'
 # cache size of an nfv_nodes
 
 
-# NFV cache policy for storing VNFs
+# NFV cache policy for storing VNFs. NFV_CACHE_BITMASK behaves as NFV_CACHE
+# with constant-time lookups
 NFV_NODE_CACHE_POLICY = 'NFV_CACHE'
 
 
@@ -88,7 +108,8 @@ default = Tree()
 default['workload'] = {'name':  'STATIONARY_SFC_BY_LEN',
                        'sfc_len': SFC_LENS,
                        'n_warmup': N_WARMUP_REQUESTS,
-                       'n_measured': N_MEASURED_REQUESTS
+                       'n_measured': N_MEASURED_REQUESTS,
+                       'vectorized': VECTORIZED_WORKLOAD
                        }
 
 default['vnf_allocation']['name'] = VNF_ALLOCATION_POLICY
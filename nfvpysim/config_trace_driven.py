@@ -22,6 +22,21 @@ N_PROCESSES = cpu_count()
 # Currently only PICKLE is supported
 RESULTS_FORMAT = 'PICKLE'
 
+# Directory where node centralities of topologies are stored, so that they are
+# computed only once across processes and campaigns. If None, they are only
+# kept in memory. Set it to a directory (e.g. 'centrality_cache') to opt in
+CENTRALITY_CACHE_DIR = None
+
+# If True, experiments differing only in their policy are simulated together,
+# generating or reading the workload once and feeding the same events to all
+# policies. Results are still stored once per policy
+MULTI_POLICY_EXECUTION = False
+
+# Catalog of the VNF types: the name of a registered catalog, the path of a
+# JSON file or a dict with the 'cpu' demand of each VNF and, optionally, its
+# 'proc_delay', 'proc_delay_spread', 'memory' and 'names'
+VNF_CATALOG = 'DEFAULT'
+
 # Number of times each experiment is replicated
 # This is necessary for extracting confidence interval of selected metrics
 N_REPLICATIONS = 3
@@ -69,7 +84,8 @@ VNF_ALLOCATION_POLICY = 'STATIC'
 # cache size of an nfv_nodes
 
 
-# NFV cache policy for storing VNFs
+# NFV cache policy for storing VNFs. NFV_CACHE_BITMASK behaves as NFV_CACHE
+# with constant-time lookups
 NFV_NODE_CACHE_POLICY = 'NFV_CACHE'
 
 
@@ -88,6 +104,12 @@ EXPERIMENT_QUEUE = deque()
 
 # Create tree of experiment configuration
 default = Tree()
+# TRACE_DRIVEN reads text traces, which may be compressed (.gz, .xz, .zst).
+# 'first_request' skips requests at the start of the trace, by seeking if it
+# was indexed by index_sfc_trace.py.
+# TRACE_DRIVEN_BINARY reads traces converted by convert_sfc_trace.py, which are
+# memory-mapped instead of parsed by every experiment. Adding 'prefetch': 'thread'
+# or 'process' generates events ahead of the simulation
 default['workload'] = {'name':  'TRACE_DRIVEN',
                        'reqs_file': '/home/igor/PycharmProjects/TESE/nfvpysim/sfc_seq_len_2_test.csv',
                        'n_warmup': N_WARMUP_REQUESTS,
@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+"""Convert a CSV trace of SFC requests to the binary format read by the
+TRACE_DRIVEN_BINARY workload.
+
+Each line of the CSV trace lists the id of a request followed by the VNFs of
+its SFC, as written by generate_requests_trace_driven.py. It may be compressed
+with gzip, xz or zstd.
+
+Usage:
+    python convert_sfc_trace.py trace.csv trace_dir
+"""
+import argparse
+
+from nfvpysim.tools.traces import convert_sfc_trace
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_path", help="The CSV trace")
+    parser.add_argument("path", help="The directory of the binary trace")
+    args = parser.parse_args()
+    n_requests = convert_sfc_trace(args.csv_path, args.path)
+    print("Converted %d requests to %s" % (n_requests, args.path))
+
+
+if __name__ == "__main__":
+    main()
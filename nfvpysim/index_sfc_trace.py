@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+"""Index a text trace of SFC requests, possibly compressed, so that the
+TRACE_DRIVEN workload skips requests at its start by seeking.
+
+The index is written next to the trace, with suffix .idx.npz, and is ignored
+once the trace changes.
+
+Usage:
+    python index_sfc_trace.py trace.csv.gz
+"""
+import argparse
+
+from nfvpysim.tools.traces import index_sfc_trace
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="The text trace")
+    args = parser.parse_args()
+    n_requests = index_sfc_trace(args.path)
+    print("Indexed %d requests of %s" % (n_requests, args.path))
+
+
+if __name__ == "__main__":
+    main()
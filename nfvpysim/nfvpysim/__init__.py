@@ -19,6 +19,7 @@ __license__ = release.license_short
 # This code ensures that the modules are imported and hence the decorators are
 # executed and the classes/functions registered.
 __modules_to_register = [
+    'nfvpysim.model.catalog',
     'nfvpysim.model.cache',
     'nfvpysim.model.policy',
     'nfvpysim.results.readwrite',
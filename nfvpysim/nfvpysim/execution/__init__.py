@@ -1,5 +1,13 @@
 """This package contains the code for the execution of a single experiment.
 """
+from nfvpysim.execution.centrality import *
+from nfvpysim.execution.routing import *
+from nfvpysim.execution.context import *
+from nfvpysim.execution.pathinfo import *
+from nfvpysim.execution.loadindex import *
+from nfvpysim.execution.events import *
+from nfvpysim.execution.outcomes import *
+from nfvpysim.execution.batch import *
 from nfvpysim.execution.network import *
 from nfvpysim.execution.collectors import *
 from nfvpysim.execution.engine import *
\ No newline at end of file
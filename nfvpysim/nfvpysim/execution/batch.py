@@ -0,0 +1,204 @@
+"""Batched simulation of sessions of policies with static VNF placement.
+
+Policies that never change the content of NFV caches after the network model
+is built serve each request independently of the previous ones: a request
+walks the shortest path from its ingress node and is served at the first hop
+where all the VNFs of its SFC have been found on the nodes traversed so far
+and the delay is within its budget. Since both the VNFs available on each
+path and the delays of its links never change, the outcome of a whole block
+of requests is computed at once from per-path arrays.
+"""
+import numpy as np
+
+__all__ = ['StaticSessionKernel']
+
+# Maximum number of distinct VNFs, each represented by a bit of an int64 mask
+MAX_VNFS = 63
+
+
+class StaticSessionKernel(object):
+    """Compute the outcome of blocks of sessions over a network model whose
+    NFV caches do not change.
+
+    Paths are registered the first time a request is routed on them and
+    identified by an integer. For each path the kernel keeps, for each hop,
+    the bitmask of the VNFs available on the nodes reached so far, the delay
+    of the link, the sum of the delays up to the hop and, for each VNF, the
+    first hop reaching a node hosting it.
+    """
+
+    def __init__(self, model, catalog):
+        """Constructor
+
+        Parameters
+        ----------
+        model : NetworkModel
+            The network model. Its NFV caches must not change afterwards
+        catalog : VnfCatalog
+            The catalog of VNFs, whose processing delays must be constant
+        """
+        self.model = model
+        self.catalog = catalog
+        self.vnf_bit = {}
+        self.path_id = {}
+        self.path_info = []
+        self._sfc_code = {}
+        self._paths = []
+        self._dirty = True
+
+    def _bit(self, vnf):
+        if vnf not in self.vnf_bit:
+            if len(self.vnf_bit) == MAX_VNFS:
+                return None
+            self.vnf_bit[vnf] = len(self.vnf_bit)
+        return self.vnf_bit[vnf]
+
+    def _node_mask(self, node):
+        mask = 0
+        for vnf in self.model.nfv_cache[node].nfv_cache:
+            bit = self._bit(vnf)
+            if bit is None:
+                return None
+            mask |= 1 << bit
+        return mask
+
+    def _register_path(self, ingress_node, egress_node):
+        info = self.model.path_info(ingress_node, egress_node)
+        hop_masks = []
+        first_hop = {}
+        cum_mask = 0
+        for hop, (_, v) in enumerate(info.links):
+            if info.nfv_hops[hop]:
+                node_mask = self._node_mask(v)
+                if node_mask is None:
+                    return None
+                new_mask = node_mask & ~cum_mask
+                while new_mask:
+                    low_bit = new_mask & -new_mask
+                    first_hop[low_bit.bit_length() - 1] = hop
+                    new_mask ^= low_bit
+                cum_mask |= node_mask
+            hop_masks.append(cum_mask)
+        self.path_id[(ingress_node, egress_node)] = len(self.path_info)
+        self.path_info.append(info)
+        self._paths.append((hop_masks, first_hop))
+        self._dirty = True
+        return self.path_id[(ingress_node, egress_node)]
+
+    def _build(self):
+        n_paths = len(self._paths)
+        n_hops = max([len(m) for m, _ in self._paths] + [1])
+        # Padding hops have an undefined delay, so that they never serve a
+        # request, and a null link delay, so that summing them has no effect
+        self.masks = np.zeros((n_paths, n_hops), dtype=np.int64)
+        self.link_delays = np.zeros((n_paths, n_hops), dtype=np.float64)
+        self.reset_delays = np.full((n_paths, n_hops), np.nan)
+        self.cum_delays = np.full((n_paths, n_hops), np.nan)
+        self.first_hop = np.full((n_paths, MAX_VNFS + 1), n_hops, dtype=np.int64)
+        self.n_hops = np.zeros(n_paths, dtype=np.int64)
+        for p, ((hop_masks, first_hop), info) in enumerate(zip(self._paths, self.path_info)):
+            length = len(hop_masks)
+            self.n_hops[p] = length
+            self.masks[p, :length] = hop_masks
+            self.link_delays[p, :length] = info.link_delays
+            self.reset_delays[p, :length] = info.link_delays
+            self.cum_delays[p, :length] = info.cum_delays
+            for bit, hop in first_hop.items():
+                self.first_hop[p, bit] = hop
+        self._dirty = False
+
+    def _encode_sfc(self, sfc):
+        spec = self.catalog.sfc_spec(sfc)
+        key = spec.id
+        if key not in self._sfc_code:
+            # Distinct VNFs, in the order in which they are processed at a hop
+            vnfs = list(dict.fromkeys(spec.vnfs))
+            bits = [self._bit(vnf) for vnf in vnfs]
+            if None in bits:
+                return None
+            mask = 0
+            for bit in bits:
+                mask |= 1 << bit
+            self._sfc_code[key] = (mask, bits, [self.catalog.vnf_proc_delay(vnf) for vnf in vnfs])
+        return self._sfc_code[key]
+
+    def run(self, events, cumulative_delay):
+        """Compute the outcome of a block of sessions
+
+        Parameters
+        ----------
+        events : list
+            List of (time, event) tuples
+        cumulative_delay : bool
+            If True, a request is served only if the sum of the delays of the
+            links traversed is within its budget. Otherwise only the delay of
+            the last link traversed is compared with the budget
+
+        Returns
+        -------
+        outcome : dict
+            Arrays with an entry per event: 'hit', 'hop_count', 'link_delay',
+            'proc_delay' and 'latency', plus the list 'path_info' with the
+            PathInfo of the path of each event, or None if the VNFs of the
+            events cannot be represented as bitmasks
+        """
+        n_events = len(events)
+        pid = np.empty(n_events, dtype=np.int64)
+        sfc_mask = np.empty(n_events, dtype=np.int64)
+        delay = np.empty(n_events, dtype=np.float64)
+        codes = []
+        for i, (_, event) in enumerate(events):
+            key = (event.ingress_node, event.egress_node)
+            p = self.path_id.get(key)
+            if p is None:
+                p = self._register_path(*key)
+                if p is None:
+                    return None
+            code = self._encode_sfc(event.sfc)
+            if code is None:
+                return None
+            pid[i] = p
+            sfc_mask[i] = code[0]
+            delay[i] = event.delay
+            codes.append(code)
+        if self._dirty:
+            self._build()
+
+        n_slots = max([len(code[1]) for code in codes] + [0])
+        bits = np.full((n_events, n_slots), MAX_VNFS, dtype=np.int64)
+        proc = np.zeros((n_events, n_slots), dtype=np.float64)
+        for i, (_, slot_bits, slot_proc) in enumerate(codes):
+            bits[i, :len(slot_bits)] = slot_bits
+            proc[i, :len(slot_proc)] = slot_proc
+
+        # A request is served at the first hop where all the VNFs of the SFC
+        # have been found and the delay is within budget
+        delays = self.cum_delays if cumulative_delay else self.reset_delays
+        served = ((self.masks[pid] & sfc_mask[:, None]) == sfc_mask[:, None]) \
+            & (delays[pid] <= delay[:, None])
+        hit = served.any(axis=1)
+        last_hop = np.where(hit, served.argmax(axis=1), self.n_hops[pid] - 1)
+
+        # Delays are summed hop by hop in the order in which the controller
+        # would sum them, so that results are identical to process_event
+        first_hop = self.first_hop[pid[:, None], bits]
+        link_delay = np.zeros(n_events)
+        proc_delay = np.zeros(n_events)
+        latency = np.zeros(n_events)
+        for hop in range(self.masks.shape[1]):
+            walked = hop <= last_hop
+            if not walked.any():
+                break
+            hop_delay = np.where(walked, self.link_delays[pid, hop], 0.0)
+            link_delay += hop_delay
+            latency += hop_delay
+            for slot in range(n_slots):
+                slot_delay = np.where(walked & (first_hop[:, slot] == hop), proc[:, slot], 0.0)
+                proc_delay += slot_delay
+                latency += slot_delay
+        return {'hit': hit,
+                'hop_count': last_hop + 1,
+                'link_delay': link_delay,
+                'proc_delay': proc_delay,
+                'latency': latency,
+                'path_info': [self.path_info[p] for p in pid]}
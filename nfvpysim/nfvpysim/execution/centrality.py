@@ -0,0 +1,164 @@
+"""Node centrality measures of a topology, computed once and cached.
+
+Centralities are computed the first time they are requested and kept in
+memory for as long as the topology context holding them. If a cache directory
+is set, they are also stored on disk, keyed by the fingerprint of the
+topology, so that later processes and campaigns on the same topology load them
+instead of computing them again.
+"""
+import os
+import logging
+import tempfile
+from operator import itemgetter
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import networkx as nx
+
+__all__ = [
+    'CentralityService',
+    'set_centrality_cache_dir'
+]
+
+logger = logging.getLogger('orchestration')
+
+# Functions computing each supported centrality measure keyed by name
+CENTRALITY_MEASURES = {
+    'degree': lambda topology: nx.degree_centrality(topology),
+    'closeness': lambda topology: nx.closeness_centrality(topology),
+    'betweenness': lambda topology: nx.betweenness_centrality(topology),
+    'pagerank': lambda topology: nx.pagerank(topology, alpha=0.9),
+    'eigenvector': lambda topology: nx.eigenvector_centrality(topology, max_iter=500),
+}
+
+# Directory where centralities are stored on disk. If None, they are only
+# kept in memory
+_cache_dir = None
+
+
+def set_centrality_cache_dir(cache_dir):
+    """Set the directory where centralities computed by this process are stored
+
+    Parameters
+    ----------
+    cache_dir : str
+        Path of the directory. If None, centralities are not stored on disk
+    """
+    global _cache_dir
+    _cache_dir = cache_dir
+
+
+class CentralityService(object):
+    """Provide the centrality of the nodes of a topology.
+
+    Each measure is computed at most once per topology. Rankings are sorted
+    by decreasing centrality, with ties kept in the order in which nodes are
+    stored in the topology.
+    """
+
+    def __init__(self, topology, fingerprint, cache_dir=None):
+        """Constructor
+
+        Parameters
+        ----------
+        topology : fnss.Topology
+            The topology
+        fingerprint : str
+            The fingerprint of the topology, used as key of the disk cache
+        cache_dir : str, optional
+            The directory of the disk cache. If not specified, the directory
+            set by set_centrality_cache_dir is used
+        """
+        self.topology = topology
+        self.fingerprint = fingerprint
+        self.cache_dir = cache_dir if cache_dir is not None else _cache_dir
+        self._centrality = None
+        self._ranking = {}
+
+    @property
+    def cache_file(self):
+        if self.cache_dir is None:
+            return None
+        return os.path.join(self.cache_dir, '%s.pickle' % self.fingerprint)
+
+    def _load(self):
+        self._centrality = {}
+        if self.cache_file is not None and os.path.isfile(self.cache_file):
+            try:
+                with open(self.cache_file, 'rb') as f:
+                    self._centrality = pickle.load(f)
+            except (IOError, EOFError, pickle.UnpicklingError):
+                logger.warning('Ignoring unreadable centrality cache %s' % self.cache_file)
+
+    def _store(self):
+        if self.cache_file is None:
+            return
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        # Write to a temporary file first so that concurrent processes never
+        # read a partially written cache
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(self._centrality, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_file)
+
+    def centrality(self, measure):
+        """Return the centrality of all nodes
+
+        Parameters
+        ----------
+        measure : str
+            The centrality measure: 'degree', 'closeness', 'betweenness',
+            'pagerank' or 'eigenvector'
+
+        Returns
+        -------
+        centrality : dict
+            The centrality of each node. It must not be modified
+        """
+        if measure not in CENTRALITY_MEASURES:
+            raise ValueError('Unknown centrality measure %s' % measure)
+        if self._centrality is None:
+            self._load()
+        if measure not in self._centrality:
+            self._centrality[measure] = CENTRALITY_MEASURES[measure](self.topology)
+            self._store()
+        return self._centrality[measure]
+
+    def ranking(self, measure):
+        """Return all nodes sorted by decreasing centrality
+
+        Parameters
+        ----------
+        measure : str
+            The centrality measure
+
+        Returns
+        -------
+        ranking : list
+            List of (node, centrality) tuples
+        """
+        if measure not in self._ranking:
+            self._ranking[measure] = sorted(self.centrality(measure).items(),
+                                            key=itemgetter(1), reverse=True)
+        return self._ranking[measure]
+
+    def top_nodes(self, measure, k):
+        """Return the k nodes with the highest centrality
+
+        Parameters
+        ----------
+        measure : str
+            The centrality measure
+        k : int
+            The number of nodes
+
+        Returns
+        -------
+        top_nodes : dict
+            The centrality of the top k nodes, in decreasing order
+        """
+        return dict(self.ranking(measure)[0:k])
@@ -4,6 +4,7 @@ from nfvpysim.tools.stats import cdf
 import collections
 
 __all__ = [
+    'SessionSummary',
     'DataCollector',
     'CollectorProxy',
     'AcceptanceRatioCollector',
@@ -13,7 +14,56 @@ __all__ = [
 ]
 
 
+class SessionSummary(object):
+    """Compact record of a session, built by the network controller while the
+    session runs and delivered once to collectors at its end.
+
+    Attributes
+    ----------
+    hop_count : int
+        The number of hops traversed by the request
+    link_delay : float
+        The sum of the delays of the links of the main path
+    proc_delay : float
+        The sum of the processing delays of the VNFs processed
+    latency : float
+        link_delay + proc_delay, summed in the order of the events
+    hits : int
+        The number of times the SFC was reported as served
+    links : list
+        The (u, v) links traversed, in order
+    """
+
+    __slots__ = ('timestamp', 'sfc_id', 'ingress_node', 'egress_node', 'sfc', 'delay',
+                 'hop_count', 'link_delay', 'proc_delay', 'latency', 'hits', 'links')
+
+    def __init__(self, timestamp, sfc_id, ingress_node, egress_node, sfc, delay):
+        self.timestamp = timestamp
+        self.sfc_id = sfc_id
+        self.ingress_node = ingress_node
+        self.egress_node = egress_node
+        self.sfc = sfc
+        self.delay = delay
+        self.hop_count = 0
+        self.link_delay = 0.0
+        self.proc_delay = 0.0
+        self.latency = 0.0
+        self.hits = 0
+        self.links = []
+
+    @property
+    def hit(self):
+        return self.hits > 0
+
+
 class DataCollector:
+    """Base class of data collectors.
+
+    Collectors are notified of each event of a session through the methods
+    below. Alternatively, a collector can implement session_summary only and
+    receive a single SessionSummary at the end of each session, which is much
+    cheaper than per-hop notifications.
+    """
 
     def __init__(self, view, **params):
         self.view = view
@@ -39,13 +89,16 @@ class DataCollector:
     def end_session(self, success=True):
         pass
 
+    def session_summary(self, summary, success=True):
+        pass
+
     def results(self):
         pass
 
 
 class CollectorProxy(DataCollector):
     EVENTS = ('start_session', 'request_vnf_hop', 'vnf_proc_payload', 'sfc_hit', 'vnf_proc_delay', 'get_sess_latency',
-              'end_session', 'results')
+              'end_session', 'session_summary', 'results')
 
     def __init__(self, view, collectors, **params):
 
@@ -82,6 +135,14 @@ class CollectorProxy(DataCollector):
         for c in self.collectors['end_session']:
             c.end_session(success)
 
+    def session_summary(self, summary, success=True):
+        for c in self.collectors['session_summary']:
+            c.session_summary(summary, success)
+
+    def listens(self, event):
+        """Return whether any of the collectors handles an event"""
+        return len(self.collectors[event]) > 0
+
     def results(self):
         return Tree(**{c.name: c.results() for c in self.collectors['results']})
 
@@ -112,13 +173,12 @@ class LinkLoadCollector(DataCollector):
         self.t_start = -1
         self.t_end = 1
 
-    def start_session(self, timestamp, sfc_id, ingress_node, egress_node, sfc, delay):
+    def session_summary(self, summary, success=True):
         if self.t_start < 0:
-            self.t_start = timestamp
-        self.t_end = timestamp
-
-    def request_vnf_hop(self, u, v, path=True):
-        self.req_count[(u, v)] += 1
+            self.t_start = summary.timestamp
+        self.t_end = summary.timestamp
+        for link in summary.links:
+            self.req_count[link] += 1
 
     def results(self):
         duration = self.t_end - self.t_start
@@ -164,24 +224,10 @@ class LatencyCollector(DataCollector):
         self.sess_count = 0
         self.latency = 0.0
         self.vnf_proc_time = 0.0
-        self.dict_vnfs_cpu_req_proc_delay = {0: 15,  # nat
-                                             1: 25,  # fw
-                                             2: 25,  # ids
-                                             3: 20,  # wanopt
-                                             4: 20,  # lb
-                                             5: 25,  # encrypt
-                                             6: 25,  # decrypts
-                                             7: 30  # dpi
-                                             }
 
         if cdf:
             self.latency_data = collections.deque()
 
-    def start_session(self, timestamp, sfc_id, ingress_node, egress_node, sfc, delay):
-        self.sess_count += 1
-        self.sess_latency = 0.0
-        self.vnf_proc_time = 0.0
-
     """
     @staticmethod
     def get_vnf_proc_delay(lower, upper):
@@ -189,18 +235,10 @@ class LatencyCollector(DataCollector):
         return round(delay, 2)
     """
 
-    def request_vnf_hop(self, u, v, path=True):
-        if path:
-            self.sess_latency += self.view.link_delay(u, v)
-
-    def vnf_proc_delay(self, vnf):
-        if vnf in self.dict_vnfs_cpu_req_proc_delay.keys():
-            self.sess_latency += self.dict_vnfs_cpu_req_proc_delay[vnf]
-
-    def get_sess_latency(self):
-        return self.sess_latency
-
-    def end_session(self, success=True):
+    def session_summary(self, summary, success=True):
+        self.sess_count += 1
+        self.sess_latency = summary.latency
+        self.vnf_proc_time = summary.proc_delay
         if not success:
             return
         if self.cdf:
@@ -228,19 +266,15 @@ class AcceptanceRatioCollector(DataCollector):
         self.view = view
         self.sess_count = 0
         self.sfc_hits = 0
-        self.curr_path = None
 
         if per_sfc:
             self.per_sfc_hit = collections.defaultdict(int)
 
-    def start_session(self, timestamp, sfc_id, ingress_node, egress_node, sfc, delay):
+    def session_summary(self, summary, success=True):
         self.sess_count += 1
-        self.curr_path = self.view.shortest_path(ingress_node, egress_node)
-
-    def sfc_hit(self, sfc_id):
-        self.sfc_hits += 1
-        if self.per_sfc_hit:
-            self.self.per_sfc_hit[sfc_id] += 1
+        self.sfc_hits += summary.hits
+        if self.per_sfc:
+            self.per_sfc_hit[summary.sfc_id] += summary.hits
 
     def results(self):
         n_sess = self.sess_count
@@ -283,19 +317,14 @@ class PathStretchCollector(DataCollector):
             self.req_stretch_data = collections.deque()
             self.stretch_data = collections.deque()
 
-    def start_session(self, timestamp, sfc_id, ingress_node, egress_node, sfc, delay):
-        self.req_path_len = 0
+    def session_summary(self, summary, success=True):
+        self.req_path_len = summary.hop_count
         self.sess_count += 1
-        self.ingress_node = ingress_node
-        self.egress_node = egress_node
-
-    def request_vnf_hop(self, u, v, main_path=True):
-        self.req_path_len += 1
-
-    def end_session(self, success=True):
+        self.ingress_node = summary.ingress_node
+        self.egress_node = summary.egress_node
         if not success:
             return
-        req_sp_len = len(self.view.shortest_path(self.ingress_node, self.egress_node))
+        req_sp_len = self.view.path_info(self.ingress_node, self.egress_node).egress_index + 1
         req_stretch = self.req_path_len / req_sp_len
         self.mean_stretch += req_stretch
 
@@ -0,0 +1,219 @@
+"""Precomputed topology data shared by network models, views and policies.
+
+All network models of an experiment derive the same information from the
+topology: the shortest paths between all pairs of nodes, the type and delay of
+each link, the role and cache size of each node and the centrality of
+nodes. This module computes it once and memoizes it in the running process, so that replications and
+policies run on the same topology by a worker reuse it.
+"""
+import collections
+import hashlib
+
+import fnss
+import networkx as nx
+
+from nfvpysim.execution.centrality import CentralityService
+from nfvpysim.execution.routing import RoutingArrays, ShortestPathOracle, CandidatePathIndex
+
+__all__ = [
+    'TopologyContext',
+    'topology_fingerprint',
+    'get_topology_context',
+    'clear_topology_contexts'
+]
+
+# Maximum number of topology contexts kept in memory by each process
+CONTEXT_CACHE_SIZE = 4
+
+# Topology contexts built by this process keyed by topology fingerprint
+_contexts = collections.OrderedDict()
+
+
+def topology_fingerprint(topology):
+    """Return a fingerprint of a topology.
+
+    The fingerprint depends on the nodes and their stacks, on the links and
+    their attributes and on the units of delays and weights. Two topologies
+    built by the same factory with the same seed and cache allocation then
+    have the same fingerprint, even if they are distinct objects.
+
+    Parameters
+    ----------
+    topology : Topology
+        The topology
+
+    Returns
+    -------
+    fingerprint : str
+        Hex digest identifying the topology
+    """
+    h = hashlib.sha1()
+    h.update(repr((topology.is_directed(),
+                   topology.graph.get('delay_unit'),
+                   topology.graph.get('weight_unit'))).encode())
+    for v in sorted(topology.nodes(), key=repr):
+        stack = topology.node[v].get('stack')
+        h.update(repr((v, stack)).encode())
+    edges = []
+    for u, v, data in topology.edges(data=True):
+        if not topology.is_directed():
+            u, v = sorted((u, v), key=repr)
+        edges.append(repr((u, v, sorted(data.items()))))
+    for edge in sorted(edges):
+        h.update(edge.encode())
+    return h.hexdigest()
+
+
+class TopologyContext(object):
+    """Read-only data derived from a topology.
+
+    The context must not be modified by network models. Routing tables are
+    computed the first time they are requested for a given link weight.
+    """
+
+    def __init__(self, topology, fingerprint=None):
+        """Constructor
+
+        Parameters
+        ----------
+        topology : fnss.Topology
+            The topology object
+        fingerprint : str, optional
+            The fingerprint of the topology, if already known
+        """
+        if not isinstance(topology, fnss.Topology):
+            raise ValueError('The topology argument must be an'
+                             'instance of fnss.Topology or   of its subclasses')
+        self.topology = topology
+        self.fingerprint = fingerprint if fingerprint is not None \
+            else topology_fingerprint(topology)
+
+        self.link_type = nx.get_edge_attributes(topology, 'type')
+        self.link_delay = fnss.get_delays(topology)
+        if not topology.is_directed():
+            for (u, v), link_type in list(self.link_type.items()):
+                self.link_type[(v, u)] = link_type
+            for (u, v), delay in list(self.link_delay.items()):
+                self.link_delay[(v, u)] = delay
+
+        self.nfv_cache_size = {}
+        ingress_nodes, egress_nodes, nfv_nodes = set(), set(), set()
+        for node in topology.nodes():
+            stack_name, stack_props = fnss.get_stack(topology, node)
+            if stack_name == 'nfv_node' and 'cache_size' in stack_props:
+                self.nfv_cache_size[node] = stack_props['cache_size']
+            if stack_name == 'ingress_node':
+                ingress_nodes.add(node)
+            elif stack_name == 'egress_node':
+                egress_nodes.add(node)
+            elif stack_name == 'nfv_node':
+                nfv_nodes.add(node)
+        self.ingress_nodes = frozenset(ingress_nodes)
+        self.egress_nodes = frozenset(egress_nodes)
+        self.nfv_nodes = frozenset(nfv_nodes)
+
+        self.centrality = CentralityService(topology, self.fingerprint)
+        self._shortest_path = {}
+        self._routing_arrays = {}
+        self._oracles = {}
+        self._candidate_paths = None
+
+    def shortest_path(self, weight='weight'):
+        """Return the shortest paths between all pairs of nodes
+
+        Parameters
+        ----------
+        weight : str, optional
+            The link attribute used as weight
+
+        Returns
+        -------
+        shortest_path : dict of dicts
+            Shortest paths keyed by source and destination nodes
+        """
+        if weight not in self._shortest_path:
+            paths = nx.all_pairs_dijkstra_path(self.topology, weight=weight)
+            self._shortest_path[weight] = dict(paths)
+        return self._shortest_path[weight]
+
+    def routing_arrays(self, weight='weight', backend='networkx'):
+        """Return the array-backed routing state of the topology
+
+        Parameters
+        ----------
+        weight : str, optional
+            The link attribute used as weight
+        backend : str, optional
+            The implementation of Dijkstra's algorithm: 'networkx' or 'scipy'
+
+        Returns
+        -------
+        routing : RoutingArrays
+            Node indices, CSR adjacency, distance and predecessor matrices
+        """
+        key = (weight, backend)
+        if key not in self._routing_arrays:
+            self._routing_arrays[key] = RoutingArrays(self.topology, weight, backend)
+        return self._routing_arrays[key]
+
+    def shortest_path_oracle(self, weight='weight'):
+        """Return an oracle computing the shortest paths from each source on
+        request
+
+        Parameters
+        ----------
+        weight : str, optional
+            The link attribute used as weight
+
+        Returns
+        -------
+        oracle : ShortestPathOracle
+            Shortest paths keyed by source and destination nodes
+        """
+        if weight not in self._oracles:
+            self._oracles[weight] = ShortestPathOracle(self.topology, weight)
+        return self._oracles[weight]
+
+    def candidate_paths(self):
+        """Return the index of the paths with the minimum number of hops
+        between pairs of nodes, scored on the load of NFV nodes with a cache
+
+        Returns
+        -------
+        index : CandidatePathIndex
+            The candidate path index
+        """
+        if self._candidate_paths is None:
+            self._candidate_paths = CandidatePathIndex(self.topology, list(self.nfv_cache_size),
+                                                       self.link_delay)
+        return self._candidate_paths
+
+
+def get_topology_context(topology):
+    """Return the context of a topology, building it only if no context of an
+    identical topology is already held by this process.
+
+    Parameters
+    ----------
+    topology : fnss.Topology
+        The topology
+
+    Returns
+    -------
+    context : TopologyContext
+        The topology context
+    """
+    fingerprint = topology_fingerprint(topology)
+    if fingerprint in _contexts:
+        _contexts.move_to_end(fingerprint)
+        return _contexts[fingerprint]
+    context = TopologyContext(topology, fingerprint)
+    _contexts[fingerprint] = context
+    while len(_contexts) > CONTEXT_CACHE_SIZE:
+        _contexts.popitem(last=False)
+    return context
+
+
+def clear_topology_contexts():
+    """Drop all topology contexts held by this process"""
+    _contexts.clear()
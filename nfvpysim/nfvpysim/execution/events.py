@@ -0,0 +1,115 @@
+"""Events of the workloads.
+
+Workloads yield (time, event) tuples, where event is an SfcRequest storing
+the attributes of a request in slots. Policies receive these attributes as
+the arguments of process_event. Workloads yielding events as dictionaries
+with the same keys are still supported: their events are converted once by
+the engine.
+"""
+
+__all__ = [
+    'SfcRequest',
+    'as_request'
+]
+
+
+class SfcRequest(object):
+    """Request for an SFC, as generated by a workload.
+
+    Attributes can be read as items, as in a dictionary, so that an event can
+    also be passed to process_event as keyword arguments. Events are shared by
+    all the strategies simulated on a workload and must not be modified.
+    """
+
+    __slots__ = ('sfc_id', 'ingress_node', 'egress_node', 'sfc', 'delay', 'log')
+
+    def __init__(self, sfc_id, ingress_node, egress_node, sfc, delay, log):
+        """Constructor
+
+        Parameters
+        ----------
+        sfc_id : any hashable type
+            The identifier of the request
+        ingress_node : any hashable type
+            The node where the request enters the network
+        egress_node : any hashable type
+            The node where the request leaves the network
+        sfc : int or SfcSpec or list
+            The SFC requested, given as the id of an SFC interned by the VNF
+            catalog, as its spec or as a list of VNFs
+        delay : float
+            The delay budget of the request
+        log : bool
+            Whether the request is measured by collectors
+        """
+        self.sfc_id = sfc_id
+        self.ingress_node = ingress_node
+        self.egress_node = egress_node
+        self.sfc = sfc
+        self.delay = delay
+        self.log = log
+
+    @classmethod
+    def from_dict(cls, event):
+        """Return the request of an event given as a dictionary"""
+        try:
+            return cls(**event)
+        except TypeError:
+            raise ValueError('Invalid event %r: its keys must be %s'
+                             % (event, ', '.join(cls.__slots__)))
+
+    def keys(self):
+        return self.__slots__
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def to_dict(self):
+        """Return the event as a dictionary"""
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __eq__(self, other):
+        if not isinstance(other, SfcRequest):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return tuple(getattr(self, key) for key in self.__slots__)
+
+    def __setstate__(self, state):
+        for key, value in zip(self.__slots__, state):
+            setattr(self, key, value)
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__,
+                           ', '.join('%s=%r' % (key, getattr(self, key)) for key in self.__slots__))
+
+
+def as_request(event):
+    """Return an event as an SfcRequest
+
+    Parameters
+    ----------
+    event : SfcRequest or dict
+        The event, as yielded by a workload
+
+    Returns
+    -------
+    request : SfcRequest
+        The event itself if it is already an SfcRequest, otherwise a request
+        with the items of the dictionary
+    """
+    if isinstance(event, SfcRequest):
+        return event
+    return SfcRequest.from_dict(event)
@@ -0,0 +1,77 @@
+"""Index of the least loaded NFV node.
+
+The CPU allocated on NFV nodes changes every time a policy places VNFs, while
+load-aware policies repeatedly look for the least loaded node, among all
+nodes or among the nodes of a path. A segment tree over the loads of the nodes
+considered, in path order, answers this query in constant time and is updated
+in logarithmic time when the load of one of its nodes changes.
+"""
+
+__all__ = ['MinLoadTree']
+
+
+class MinLoadTree(object):
+    """Segment tree returning the position of the minimum of an array of loads.
+
+    Ties are broken in favour of the lowest position.
+    """
+
+    def __init__(self, loads):
+        """Constructor
+
+        Parameters
+        ----------
+        loads : array-like
+            The initial load of each position
+        """
+        self.n = len(loads)
+        self.size = 1
+        while self.size < max(self.n, 1):
+            self.size *= 2
+        # Each entry is a (load, position) tuple, so that comparing entries
+        # also compares positions on equal loads
+        self.tree = [(float('inf'), i - self.size) for i in range(2 * self.size)]
+        for i, load in enumerate(loads):
+            self.tree[self.size + i] = (load, i)
+        for i in range(self.size - 1, 0, -1):
+            self.tree[i] = min(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, position):
+        return self.tree[self.size + position][0]
+
+    def update(self, position, load):
+        """Set the load of a position
+
+        Parameters
+        ----------
+        position : int
+            The position
+        load : int or float
+            The new load
+        """
+        if not 0 <= position < self.n:
+            raise ValueError('Position %d out of range' % position)
+        i = self.size + position
+        self.tree[i] = (load, position)
+        i //= 2
+        while i >= 1:
+            self.tree[i] = min(self.tree[2 * i], self.tree[2 * i + 1])
+            i //= 2
+
+    def argmin(self):
+        """Return the position with the minimum load
+
+        Returns
+        -------
+        position : int
+            The position with the minimum load
+        load : int or float
+            Its load
+        """
+        if self.n == 0:
+            raise ValueError('No position to return')
+        load, position = self.tree[1]
+        return position, load
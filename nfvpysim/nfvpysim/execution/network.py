@@ -1,17 +1,40 @@
 import networkx as nx
+import numpy as np
 import fnss
 from itertools import cycle
 import random
-from collections import defaultdict
-from nfvpysim.registry import CACHE_POLICY
+from collections import defaultdict, OrderedDict
+from nfvpysim.registry import CACHE_POLICY, register_network_model, register_network_view
 from nfvpysim.util import path_links
-from collections import OrderedDict
-from operator import itemgetter
+from nfvpysim.execution.context import get_topology_context
+from nfvpysim.execution.pathinfo import PathInfo
+from nfvpysim.execution.loadindex import MinLoadTree
+from nfvpysim.execution.batch import StaticSessionKernel
+from nfvpysim.execution.outcomes import OutcomeCache, SessionOutcome
+from nfvpysim.execution.collectors import SessionSummary
+from nfvpysim.model.catalog import get_vnf_catalog
 import logging
 
 logger = logging.getLogger('orchestration')
 
+# Representations of the routing state of network models:
+#  * 'dict': dicts of shortest paths and of link attributes
+#  * 'array': integer node indices, CSR adjacency and NumPy distance and
+#    predecessor matrices, from which paths are rebuilt on request
+#  * 'scipy': same as 'array', with the matrices computed by
+#    scipy.sparse.csgraph. Among paths of equal length, the path selected may
+#    differ from the one selected by networkx
+#  * 'oracle': dicts of shortest paths computed per source on request and
+#    kept in a cache of bounded memory
+ROUTING = ('dict', 'array', 'scipy', 'oracle')
+
+# Number of nodes whose NFV nodes, sorted by delay, are kept by network models
+# to find the nearest instance of a VNF
+NEAREST_INSTANCE_CACHE_SIZE = 1024
+
 __all__ = [
+    'NetworkModel',
+    'NetworkView',
     'NetworkModelRba',
     'NetworkModelFirstOrder',
     'NetworkModelMarkov',
@@ -36,17 +59,20 @@ __all__ = [
     'NetworkModelProposalCloseness',
     'NetworkModelProposalPageRank',
     'NetworkModelProposalEigenVector',
+    'NetworkModelBcsp',
+    'NetworkViewBcsp',
     'NetworkController'
 ]
 
 
-class NetworkViewProposalOff:
+class NetworkView(object):
+    """Base class of network views.
 
-    def __init__(self, model):
-        if not isinstance(model, NetworkModelProposalOff):
-            raise ValueError('The model argument must be an instance of '
-                             'NetworkModel')
+    A network view provides policies and data collectors with read-only access
+    to the state of a network model.
+    """
 
+    def __init__(self, model):
         self.model = model
 
     def shortest_path(self, ingress_node, egress_node):
@@ -55,6 +81,12 @@ class NetworkViewProposalOff:
     def all_pairs_shortest_paths(self):
         return self.model.shortest_path
 
+    def path_info(self, ingress_node, egress_node):
+        return self.model.path_info(ingress_node, egress_node)
+
+    def route_info(self, path):
+        return self.model.route_info(path)
+
     def nfv_cache_nodes(self, size=True):
         return {v: c.maxlen for v, c in self.model.nfv_cache.items()} if size \
             else list(self.model.nfv_cache.keys())
@@ -82,541 +114,370 @@ class NetworkViewProposalOff:
     def topology(self):
         return self.model.topology
 
-    def get_vnf_instances(self, vnf):
-        n_vnf_inst = 0
-        for node in self.model.nfv_cache:
-            if self.model.nfv_cache[node].has_vnf(vnf):
-                n_vnf_inst += 1
-
-        return n_vnf_inst
+    def context(self):
+        return self.model.context
 
+    def get_vnf_instances(self, vnf):
+        return len(self.model.vnf_hosts(vnf))
 
+    def nearest_instance(self, node, vnf):
+        return self.model.nearest_instance(node, vnf)
 
+    def vnf_catalog(self):
+        return self.model.vnf_catalog
 
 
-class NetworkViewRba:
+@register_network_view('HOD_VNF_OFF')
+class NetworkViewProposalOff(NetworkView):
 
     def __init__(self, model):
-        if not isinstance(model, NetworkModelRba):
+        if not isinstance(model, NetworkModelProposalOff):
             raise ValueError('The model argument must be an instance of '
                              'NetworkModel')
+        super(NetworkViewProposalOff, self).__init__(model)
 
-        self.model = model
 
-    def shortest_path(self, ingress_node, egress_node):
-        return self.model.shortest_path[ingress_node][egress_node]
+@register_network_view('RBA')
+class NetworkViewRba(NetworkView):
 
-    def all_pairs_shortest_paths(self):
-        return self.model.shortest_path
-
-    def nfv_cache_nodes(self, size=True):
-        return {v: c.maxlen for v, c in self.model.nfv_cache.items()} if size \
-            else list(self.model.nfv_cache.keys())
-
-    def is_nfv_node(self, node):
-        return node in self.model.nfv_cache
-
-    def nfv_nodes(self):
-        return self.model.nfv_cache
-
-    def link_type(self, u, v):
-        return self.model.link_type[(u, v)]
-
-    def link_delay(self, u, v):
-        return self.model.link_delay[(u, v)]
-
-    def delay_path(self, path):
-        sum_delay = 0
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            sum_delay += self.link_delay(u, v)
-        return sum_delay
-
-    def topology(self):
-        return self.model.topology
-
-    def get_vnf_instances(self, vnf):
-        n_vnf_inst = 0
-        for node in self.model.nfv_cache:
-            if self.model.nfv_cache[node].has_vnf(vnf):
-                n_vnf_inst += 1
-
-        return n_vnf_inst
+    def __init__(self, model):
+        if not isinstance(model, NetworkModelRba):
+            raise ValueError('The model argument must be an instance of '
+                             'NetworkModel')
+        super(NetworkViewRba, self).__init__(model)
 
 
-class NetworkViewMarkov:
+@register_network_view('MARKOV')
+class NetworkViewMarkov(NetworkView):
 
     def __init__(self, model):
         if not isinstance(model, NetworkModelMarkov):
             raise ValueError('The model argument must be an instance of '
                              'NetworkModel')
+        super(NetworkViewMarkov, self).__init__(model)
 
-        self.model = model
-
-    def shortest_path(self, ingress_node, egress_node):
-        return self.model.shortest_path[ingress_node][egress_node]
-
-    def all_pairs_shortest_paths(self):
-        return self.model.shortest_path
-
-    def nfv_cache_nodes(self, size=True):
-        return {v: c.maxlen for v, c in self.model.nfv_cache.items()} if size \
-            else list(self.model.nfv_cache.keys())
-
-    def is_nfv_node(self, node):
-        return node in self.model.nfv_cache
-
-    def link_type(self, u, v):
-        return self.model.link_type[(u, v)]
-
-    def link_delay(self, u, v):
-        return self.model.link_delay[(u, v)]
-
-    def delay_path(self, path):
-        sum_delay = 0
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            sum_delay += self.link_delay(u, v)
-        return sum_delay
-
-    def topology(self):
-        return self.model.topology
-
-    def get_vnf_instances(self, vnf):
-        n_vnf_inst = 0
-        for node in self.model.nfv_cache:
-            if self.model.nfv_cache[node].has_vnf(vnf):
-                n_vnf_inst += 1
-
-        return n_vnf_inst
 
-
-class NetworkViewTapAlgo:
+@register_network_view('TAP_ALGO')
+class NetworkViewTapAlgo(NetworkView):
 
     def __init__(self, model):
         if not isinstance(model, NetworkModelTapAlgo):
             raise ValueError('The model argument must be an instance of '
                              'NetworkModel')
+        super(NetworkViewTapAlgo, self).__init__(model)
 
-        self.model = model
-
-    def shortest_path(self, ingress_node, egress_node):
-        return self.model.shortest_path[ingress_node][egress_node]
-
-    def all_pairs_shortest_paths(self):
-        return self.model.shortest_path
-
-    def nfv_cache_nodes(self, size=True):
-        return {v: c.maxlen for v, c in self.model.nfv_cache.items()} if size \
-            else list(self.model.nfv_cache.keys())
 
-    def is_nfv_node(self, node):
-        return node in self.model.nfv_cache
-
-    def link_type(self, u, v):
-        return self.model.link_type[(u, v)]
-
-    def link_delay(self, u, v):
-        return self.model.link_delay[(u, v)]
-
-    def delay_path(self, path):
-        sum_delay = 0
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            sum_delay += self.link_delay(u, v)
-        return sum_delay
-
-    def topology(self):
-        return self.model.topology
-
-    def get_vnf_instances(self, vnf):
-        n_vnf_inst = 0
-        for node in self.model.nfv_cache:
-            if self.model.nfv_cache[node].has_vnf(vnf):
-                n_vnf_inst += 1
-
-        return n_vnf_inst
-
-
-class NetworkViewFirstFit:
+@register_network_view('FIRST_FIT')
+class NetworkViewFirstFit(NetworkView):
 
     def __init__(self, model):
         if not isinstance(model, NetworkModelFirstFit):
             raise ValueError('The model argument must be an instance of '
                              'NetworkModel')
+        super(NetworkViewFirstFit, self).__init__(model)
 
-        self.model = model
-
-    def shortest_path(self, ingress_node, egress_node):
-        return self.model.shortest_path[ingress_node][egress_node]
 
-    def all_pairs_shortest_paths(self):
-        return self.model.shortest_path
-
-    def nfv_cache_nodes(self, size=True):
-        return {v: c.maxlen for v, c in self.model.nfv_cache.items()} if size \
-            else list(self.model.nfv_cache.keys())
-
-    def is_nfv_node(self, node):
-        return node in self.model.nfv_cache
-
-    def link_type(self, u, v):
-        return self.model.link_type[(u, v)]
-
-    def link_delay(self, u, v):
-        return self.model.link_delay[(u, v)]
-
-    def delay_path(self, path):
-        sum_delay = 0
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            sum_delay += self.link_delay(u, v)
-        return sum_delay
-
-    def topology(self):
-        return self.model.topology
-
-    def get_vnf_instances(self, vnf):
-        n_vnf_inst = 0
-        for node in self.model.nfv_cache:
-            if self.model.nfv_cache[node].has_vnf(vnf):
-                n_vnf_inst += 1
-
-        return n_vnf_inst
-
-
-class NetworkViewBaseLine:
+@register_network_view('BASELINE')
+class NetworkViewBaseLine(NetworkView):
 
     def __init__(self, model):
         if not isinstance(model, NetworkModelBaseLine):
             raise ValueError('The model argument must be an instance of '
                              'NetworkModel')
+        super(NetworkViewBaseLine, self).__init__(model)
 
-        self.model = model
-
-    def shortest_path(self, ingress_node, egress_node):
-        return self.model.shortest_path[ingress_node][egress_node]
-
-    def all_pairs_shortest_paths(self):
-        return self.model.shortest_path
-
-    def nfv_cache_nodes(self, size=True):
-        return {v: c.maxlen for v, c in self.model.nfv_cache.items()} if size \
-            else list(self.model.nfv_cache.keys())
-
-    def is_nfv_node(self, node):
-        return node in self.model.nfv_cache
 
-    def link_type(self, u, v):
-        return self.model.link_type[(u, v)]
-
-    def link_delay(self, u, v):
-        return self.model.link_delay[(u, v)]
-
-    def topology(self):
-        return self.model.topology
-
-    def get_vnf_instances(self, vnf):
-        n_vnf_inst = 0
-        for node in self.model.nfv_cache:
-            if self.model.nfv_cache[node].has_vnf(vnf):
-                n_vnf_inst += 1
-
-        return n_vnf_inst
-
-
-class NetworkViewFirstOrder:
+@register_network_view('FIRST_ORDER')
+class NetworkViewFirstOrder(NetworkView):
 
     def __init__(self, model):
         if not isinstance(model, NetworkModelFirstOrder):
             raise ValueError('The model argument must be an instance of '
                              'NetworkModel')
+        super(NetworkViewFirstOrder, self).__init__(model)
 
-        self.model = model
-
-    def shortest_path(self, ingress_node, egress_node):
-        return self.model.shortest_path[ingress_node][egress_node]
 
-    def all_pairs_shortest_paths(self):
-        return self.model.shortest_path
-
-    def nfv_cache_nodes(self, size=True):
-        return {v: c.maxlen for v, c in self.model.nfv_cache.items()} if size \
-            else list(self.model.nfv_cache.keys())
-
-    def is_nfv_node(self, node):
-        return node in self.model.nfv_cache
-
-    def link_type(self, u, v):
-        return self.model.link_type[(u, v)]
-
-    def link_delay(self, u, v):
-        return self.model.link_delay[(u, v)]
-
-    def topology(self):
-        return self.model.topology
-
-    def get_vnf_instances(self, vnf):
-        n_vnf_inst = 0
-        for node in self.model.nfv_cache:
-            if self.model.nfv_cache[node].has_vnf(vnf):
-                n_vnf_inst += 1
-
-        return n_vnf_inst
-
-
-class NetworkViewProposal:
+@register_network_view('HOD_VNF')
+class NetworkViewProposal(NetworkView):
 
     def __init__(self, model):
         if not isinstance(model, NetworkModelProposal):
             raise ValueError('The model argument must be an instance of '
                              'NetworkModel')
+        super(NetworkViewProposal, self).__init__(model)
 
-        self.model = model
-
-    def shortest_path(self, ingress_node, egress_node):
-        return self.model.shortest_path[ingress_node][egress_node]
 
-    def all_pairs_shortest_paths(self):
-        return self.model.shortest_path
-
-    def nfv_cache_nodes(self, size=True):
-        return {v: c.maxlen for v, c in self.model.nfv_cache.items()} if size \
-            else list(self.model.nfv_cache.keys())
-
-    def is_nfv_node(self, node):
-        return node in self.model.nfv_cache
-
-    def link_type(self, u, v):
-        return self.model.link_type[(u, v)]
-
-    def link_delay(self, u, v):
-        return self.model.link_delay[(u, v)]
-
-    def topology(self):
-        return self.model.topology
-
-    def get_vnf_instances(self, vnf):
-        n_vnf_inst = 0
-        for node in self.model.nfv_cache:
-            if self.model.nfv_cache[node].has_vnf(vnf):
-                n_vnf_inst += 1
-
-        return n_vnf_inst
-
-
-class NetworkViewDeg:
+@register_network_view('HOD_DEG')
+class NetworkViewDeg(NetworkView):
 
     def __init__(self, model):
         if not isinstance(model, NetworkModelProposalDegree):
             raise ValueError('The model argument must be an instance of '
                              'NetworkModel')
+        super(NetworkViewDeg, self).__init__(model)
 
-        self.model = model
-
-    def shortest_path(self, ingress_node, egress_node):
-        return self.model.shortest_path[ingress_node][egress_node]
-
-    def all_pairs_shortest_paths(self):
-        return self.model.shortest_path
-
-    def nfv_cache_nodes(self, size=True):
-        return {v: c.maxlen for v, c in self.model.nfv_cache.items()} if size \
-            else list(self.model.nfv_cache.keys())
-
-    def is_nfv_node(self, node):
-        return node in self.model.nfv_cache
-
-    def nfv_nodes(self):
-        return self.model.nfv_cache
-
-    def link_type(self, u, v):
-        return self.model.link_type[(u, v)]
 
-    def link_delay(self, u, v):
-        return self.model.link_delay[(u, v)]
-
-    def delay_path(self, path):
-        sum_delay = 0
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            sum_delay += self.link_delay(u, v)
-        return sum_delay
-
-    def topology(self):
-        return self.model.topology
-
-    def get_vnf_instances(self, vnf):
-        n_vnf_inst = 0
-        for node in self.model.nfv_cache:
-            if self.model.nfv_cache[node].has_vnf(vnf):
-                n_vnf_inst += 1
-
-        return n_vnf_inst
-
-
-class NetworkViewClose:
+@register_network_view('HOD_CLOSE')
+class NetworkViewClose(NetworkView):
 
     def __init__(self, model):
         if not isinstance(model, NetworkModelProposalCloseness):
             raise ValueError('The model argument must be an instance of '
                              'NetworkModel')
+        super(NetworkViewClose, self).__init__(model)
 
-        self.model = model
-
-    def shortest_path(self, ingress_node, egress_node):
-        return self.model.shortest_path[ingress_node][egress_node]
-
-    def all_pairs_shortest_paths(self):
-        return self.model.shortest_path
-
-    def nfv_cache_nodes(self, size=True):
-        return {v: c.maxlen for v, c in self.model.nfv_cache.items()} if size \
-            else list(self.model.nfv_cache.keys())
-
-    def is_nfv_node(self, node):
-        return node in self.model.nfv_cache
-
-    def nfv_nodes(self):
-        return self.model.nfv_cache
-
-    def link_type(self, u, v):
-        return self.model.link_type[(u, v)]
-
-    def link_delay(self, u, v):
-        return self.model.link_delay[(u, v)]
-
-    def delay_path(self, path):
-        sum_delay = 0
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            sum_delay += self.link_delay(u, v)
-        return sum_delay
-
-    def topology(self):
-        return self.model.topology
-
-    def get_vnf_instances(self, vnf):
-        n_vnf_inst = 0
-        for node in self.model.nfv_cache:
-            if self.model.nfv_cache[node].has_vnf(vnf):
-                n_vnf_inst += 1
-
-        return n_vnf_inst
 
-
-class NetworkViewPage:
+@register_network_view('HOD_PAGE')
+class NetworkViewPage(NetworkView):
 
     def __init__(self, model):
         if not isinstance(model, NetworkModelProposalPageRank):
-            raise ValueError('The model argument must be an instance of '
-                             'NetworkModel')
-
-        self.model = model
-
-    def shortest_path(self, ingress_node, egress_node):
-        return self.model.shortest_path[ingress_node][egress_node]
-
-    def all_pairs_shortest_paths(self):
-        return self.model.shortest_path
-
-    def nfv_cache_nodes(self, size=True):
-        return {v: c.maxlen for v, c in self.model.nfv_cache.items()} if size \
-            else list(self.model.nfv_cache.keys())
-
-    def is_nfv_node(self, node):
-        return node in self.model.nfv_cache
-
-    def nfv_nodes(self):
-        return self.model.nfv_cache
-
-    def link_type(self, u, v):
-        return self.model.link_type[(u, v)]
-
-    def link_delay(self, u, v):
-        return self.model.link_delay[(u, v)]
-
-    def delay_path(self, path):
-        sum_delay = 0
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            sum_delay += self.link_delay(u, v)
-        return sum_delay
-
-    def topology(self):
-        return self.model.topology
-
-    def get_vnf_instances(self, vnf):
-        n_vnf_inst = 0
-        for node in self.model.nfv_cache:
-            if self.model.nfv_cache[node].has_vnf(vnf):
-                n_vnf_inst += 1
-
-        return n_vnf_inst
+            raise ValueError('The model argument must be an instance of '
+                             'NetworkModel')
+        super(NetworkViewPage, self).__init__(model)
 
 
-class NetworkViewEigen:
+@register_network_view('HOD_EIGEN')
+class NetworkViewEigen(NetworkView):
 
     def __init__(self, model):
         if not isinstance(model, NetworkModelProposalEigenVector):
             raise ValueError('The model argument must be an instance of '
                              'NetworkModel')
+        super(NetworkViewEigen, self).__init__(model)
 
-        self.model = model
-
-    def shortest_path(self, ingress_node, egress_node):
-        return self.model.shortest_path[ingress_node][egress_node]
-
-    def all_pairs_shortest_paths(self):
-        return self.model.shortest_path
-
-    def nfv_cache_nodes(self, size=True):
-        return {v: c.maxlen for v, c in self.model.nfv_cache.items()} if size \
-            else list(self.model.nfv_cache.keys())
 
-    def is_nfv_node(self, node):
-        return node in self.model.nfv_cache
+class NetworkModel(object):
+    """
+    Base class of all network models.
+    It holds the routing table, the link attributes and the NFV caches. All
+    data derived from the topology alone is taken from a TopologyContext shared
+    with the other models built on the same topology instead of being recomputed.
+    The routing state is held in dicts or, with routing='array', in compact
+    arrays suitable for large topologies.
 
-    def nfv_nodes(self):
-        return self.model.nfv_cache
+    """
 
-    def link_type(self, u, v):
-        return self.model.link_type[(u, v)]
+    # Link attribute used as weight to compute the shortest paths
+    route_weight = 'weight'
 
-    def link_delay(self, u, v):
-        return self.model.link_delay[(u, v)]
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):
 
-    def delay_path(self, path):
-        sum_delay = 0
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            sum_delay += self.link_delay(u, v)
-        return sum_delay
+        if not isinstance(topology, fnss.Topology):
+            raise ValueError('The topology argument must be an'
+                             'instance of fnss.Topology or   of its subclasses')
 
-    def topology(self):
-        return self.model.topology
+        if context is None:
+            context = get_topology_context(topology)
+        self.context = context
+        self.topology = topology
 
-    def get_vnf_instances(self, vnf):
-        n_vnf_inst = 0
-        for node in self.model.nfv_cache:
-            if self.model.nfv_cache[node].has_vnf(vnf):
-                n_vnf_inst += 1
+        if routing not in ROUTING:
+            raise ValueError('Unknown routing %s. Valid options are %s'
+                             % (routing, ', '.join(ROUTING)))
+        self.routing = routing
+
+        self.routing_arrays = None
+        if routing in ('array', 'scipy'):
+            # Paths are rebuilt on request from the predecessor matrix and link
+            # attributes are looked up in CSR arrays
+            backend = 'scipy' if routing == 'scipy' else 'networkx'
+            self.routing_arrays = context.routing_arrays(self.route_weight, backend)
+            self.shortest_path = self.routing_arrays.shortest_paths
+            self.link_type = self.routing_arrays.link_type
+            self.link_delay = self.routing_arrays.link_delay
+        else:
+            self.shortest_path = context.shortest_path_oracle(self.route_weight) \
+                if routing == 'oracle' else context.shortest_path(self.route_weight)
+            self.link_type = context.link_type
+            self.link_delay = context.link_delay
+        if shortest_path is not None:
+            self.routing_arrays = None
+            self.shortest_path = dict(shortest_path)
+
+        # Features of the VNFs stored by caches and requested
+        self.vnf_catalog = get_vnf_catalog()
 
-        return n_vnf_inst
+        policy_name = nfv_cache_policy['name']
+        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
+        # The actual cache objects storing the vnfs
+        self.nfv_cache = {node: CACHE_POLICY[policy_name](cache_size, **policy_args)
+                          for node, cache_size in context.nfv_cache_size.items()}
+
+        # PathInfo objects keyed by (ingress_node, egress_node)
+        self._path_info = {}
+        # PathInfo objects of arbitrary routes, keyed by tuple of nodes
+        self._route_info = {}
+        # Number of VNFs inserted in caches by the controller, which
+        # identifies the content of caches
+        self.cache_version = 0
+        # Nodes hosting each VNF, built after the initial placement of VNFs
+        # the first time it is requested and then updated by the controller
+        self._vnf_hosts = None
+        # Bitmask of the positions in nfv_cache of the nodes hosting each VNF,
+        # built and updated along with _vnf_hosts
+        self._vnf_host_mask = None
+        self._nfv_nodes = list(self.nfv_cache)
+        self._nfv_position = {node: i for i, node in enumerate(self._nfv_nodes)}
+        # Positions of the NFV nodes sorted by delay from a node, and then by
+        # position, for the nodes queried most recently
+        self._nfv_order = OrderedDict()
+
+    def path_info(self, ingress_node, egress_node):
+        """Return the features of the shortest path between two nodes
+
+        Parameters
+        ----------
+        ingress_node : any hashable type
+            The ingress node
+        egress_node : any hashable type
+            The egress node
+
+        Returns
+        -------
+        path_info : PathInfo
+            The features of the path, memoized
+        """
+        key = (ingress_node, egress_node)
+        if key not in self._path_info:
+            path = self.shortest_path[ingress_node][egress_node]
+            get_closest_nfv_node = getattr(self, 'get_closest_nfv_node_path', None)
+            closest_nfv_node = get_closest_nfv_node(path) \
+                if get_closest_nfv_node is not None else None
+            self._path_info[key] = PathInfo(path, self.link_delay, self.nfv_cache, closest_nfv_node)
+        return self._path_info[key]
+
+    def route_info(self, path):
+        """Return the features of an arbitrary route, such as a shortest path
+        other than the one selected by the routing
+
+        Parameters
+        ----------
+        path : list
+            The nodes of the route
+
+        Returns
+        -------
+        path_info : PathInfo
+            The features of the route, memoized. No NFV node is selected to
+            host missed VNFs
+        """
+        key = tuple(path)
+        if key not in self._route_info:
+            self._route_info[key] = PathInfo(list(path), self.link_delay, self.nfv_cache)
+        return self._route_info[key]
+
+    def vnf_hosts(self, vnf):
+        """Return the NFV nodes whose cache stores a VNF
+
+        Parameters
+        ----------
+        vnf : any hashable type
+            The VNF
+
+        Returns
+        -------
+        nodes : set
+            The nodes. It must not be modified
+        """
+        if self._vnf_hosts is None:
+            self._vnf_hosts = defaultdict(set)
+            self._vnf_host_mask = defaultdict(int)
+            for position, (node, cache) in enumerate(self.nfv_cache.items()):
+                for cached_vnf in cache.nfv_cache:
+                    self._vnf_hosts[cached_vnf].add(node)
+                    self._vnf_host_mask[cached_vnf] |= 1 << position
+        return self._vnf_hosts.get(vnf, set())
+
+    def vnf_inserted(self, node, vnf, evicted=None):
+        """Update the index of the nodes hosting VNFs after a VNF has been
+        inserted in the cache of a node
+
+        Parameters
+        ----------
+        node : any hashable type
+            The NFV node
+        vnf : any hashable type
+            The VNF inserted
+        evicted : any hashable type, optional
+            The VNF evicted by the insertion, if any
+        """
+        self.cache_version += 1
+        if self._vnf_hosts is None:
+            return
+        bit = 1 << self._nfv_position[node]
+        self._vnf_hosts[vnf].add(node)
+        self._vnf_host_mask[vnf] |= bit
+        if evicted is not None:
+            self._vnf_hosts[evicted].discard(node)
+            self._vnf_host_mask[evicted] &= ~bit
+
+    def nearest_instance(self, node, vnf):
+        """Return the NFV node hosting a VNF with the minimum delay from a
+        node
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node
+        vnf : any hashable type
+            The VNF
+
+        Returns
+        -------
+        nfv_node : any hashable type
+            The closest node hosting the VNF, which is node itself if it hosts
+            it, or None if no node hosts the VNF. Ties are broken in favour
+            of the first node of nfv_cache
+        """
+        if self._vnf_hosts is None:
+            self.vnf_hosts(vnf)
+        mask = self._vnf_host_mask.get(vnf, 0)
+        if not mask:
+            return None
+        # NFV nodes are scanned from the closest one, up to the first host
+        for position in self._nfv_delay_order(node):
+            if mask >> position & 1:
+                return self._nfv_nodes[position]
+
+    def _nfv_delay_order(self, node):
+        """Return the positions of the NFV nodes sorted by delay from a node"""
+        order = self._nfv_order.get(node)
+        if order is not None:
+            self._nfv_order.move_to_end(node)
+            return order
+        if self.routing_arrays is not None:
+            index = self.routing_arrays.index
+            delays = self.routing_arrays.delay[index[node], [index[v] for v in self._nfv_nodes]]
+        else:
+            delays = np.array([self.path_delay(node, v) for v in self._nfv_nodes])
+        order = self._nfv_order[node] = np.argsort(delays, kind='stable').tolist()
+        if len(self._nfv_order) > NEAREST_INSTANCE_CACHE_SIZE:
+            self._nfv_order.popitem(last=False)
+        return order
+
+    def path_length(self, source, target):
+        """Return the number of hops of the shortest path between two nodes"""
+        if self.routing_arrays is not None:
+            return self.routing_arrays.path_length(source, target)
+        return len(self.shortest_path[source][target]) - 1
+
+    def path_delay(self, source, target):
+        """Return the sum of link delays along the shortest path between two
+        nodes
+        """
+        if self.routing_arrays is not None:
+            return self.routing_arrays.path_delay(source, target)
+        path = self.shortest_path[source][target]
+        return sum(self.link_delay[(path[i - 1], path[i])] for i in range(1, len(path)))
 
 
-################################### NetworkModelRba ##################################################
+################################### NetworkModelRba ##############################################
 
 
-class NetworkModelRba:
+@register_network_model('RBA')
+class NetworkModelRba(NetworkModel):
     """
     Models the internal state of the network.
     This object should never be edited by VNF Allocation Policies directly, but only
@@ -624,42 +485,12 @@ class NetworkModelRba:
 
     """
 
-    def __init__(self, topology, nfv_cache_policy, shortest_path=None):  #
-
-        if not isinstance(topology, fnss.Topology):
-            raise ValueError('The topology argument must be an'
-                             'instance of fnss.Topology or   of its subclasses')
-
-        self.shortest_path = dict(shortest_path) if shortest_path is not None \
-            else (dict(nx.all_pairs_dijkstra_path(topology)))
-
-        self.topology = topology
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):  #
+        super(NetworkModelRba, self).__init__(topology, nfv_cache_policy, shortest_path, context,
+                                              routing)
         self.node_betw = {}
 
-        self.link_type = nx.get_edge_attributes(topology, 'type')
-        self.link_delay = fnss.get_delays(topology)
-
-        if not topology.is_directed():
-            for (u, v), link_type in list(self.link_type.items()):
-                self.link_type[(v, u)] = link_type
-
-            for (u, v), delay in list(self.link_delay.items()):
-                self.link_delay[(v, u)] = delay
-
-        nfv_cache_size = {}
-        for node in topology.nodes():
-            stack_name, stack_props = fnss.get_stack(topology, node)
-            if stack_name == 'nfv_node':
-                if 'cache_size' in stack_props:
-                    nfv_cache_size[node] = stack_props['cache_size']
-
-        # if any(c < 8 for c in nfv_cache_size.values()):
-        # logger.warning('Some nfv node caches have size less than 8.'
-        # 'I am setting them to 8 and run the experiment anyway')
-        # for node in nfv_cache_size:
-        # if nfv_cache_size[node] < 8:
-        # nfv_cache_size[node] = 8
-
         # use when the len(vnfs) < len(nfv_nodes)
         def vnfs_assignment(nfv_nodes, vnfs):
             if len(nfv_nodes) < len(vnfs):
@@ -667,14 +498,8 @@ class NetworkModelRba:
             else:
                 return dict(zip(nfv_nodes, cycle(vnfs)))
 
-        policy_name = nfv_cache_policy['name']
-        # policy_name = 'NFV_CACHE'
-        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
-        # The actual cache objects storing the vnfs
-        self.nfv_cache = {node: CACHE_POLICY[policy_name](nfv_cache_size[node], **policy_args)
-                          for node in nfv_cache_size}
-
-        self.nfv_nodes_betw = {node: NetworkModelRba.get_node_betw(topology, node) for node in
+        node_betw = self.context.centrality.centrality('betweenness')
+        self.nfv_nodes_betw = {node: node_betw[node] for node in
                                NetworkModelRba.get_nfv_nodes(topology)}
 
         # for node in self.nfv_cache:
@@ -706,8 +531,7 @@ class NetworkModelRba:
         """
     @staticmethod
     def get_node_betw(topology, node):
-        node_betw = nx.betweenness_centrality(topology)
-        return node_betw[node]
+        return get_topology_context(topology).centrality.centrality('betweenness')[node]
 
     @staticmethod
     def shortest_path(topology, ingress_node, egress_node):
@@ -769,7 +593,8 @@ class NetworkModelRba:
 ################################### NetworkModelTapAlgo ##################################################
 
 
-class NetworkModelTapAlgo:
+@register_network_model('TAP_ALGO')
+class NetworkModelTapAlgo(NetworkModel):
     """
     Models the internal state of the network.
     This object should never be edited by VNF Allocation Policies directly, but only
@@ -777,41 +602,10 @@ class NetworkModelTapAlgo:
 
     """
 
-    def __init__(self, topology, nfv_cache_policy, shortest_path=None):  #
-
-        if not isinstance(topology, fnss.Topology):
-            raise ValueError('The topology argument must be an'
-                             'instance of fnss.Topology or   of its subclasses')
-
-        self.shortest_path = dict(shortest_path) if shortest_path is not None \
-            else (dict(nx.all_pairs_dijkstra_path(topology)))
-
-        self.topology = topology
-        self.nfv_cache = None
-
-        self.link_type = nx.get_edge_attributes(topology, 'type')
-        self.link_delay = fnss.get_delays(topology)
-
-        if not topology.is_directed():
-            for (u, v), link_type in list(self.link_type.items()):
-                self.link_type[(v, u)] = link_type
-
-            for (u, v), delay in list(self.link_delay.items()):
-                self.link_delay[(v, u)] = delay
-
-        nfv_cache_size = {}
-        for node in topology.nodes():
-            stack_name, stack_props = fnss.get_stack(topology, node)
-            if stack_name == 'nfv_node':
-                if 'cache_size' in stack_props:
-                    nfv_cache_size[node] = stack_props['cache_size']
-
-        # if any(c < 8 for c in nfv_cache_size.values()):
-        # logger.warning('Some nfv node caches have size less than 8.'
-        # 'I am setting them to 8 and run the experiment anyway')
-        # for node in nfv_cache_size:
-        # if nfv_cache_size[node] < 8:
-        # fv_cache_size[node] = 8
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):  #
+        super(NetworkModelTapAlgo, self).__init__(topology, nfv_cache_policy, shortest_path,
+                                                  context, routing)
 
         # use when the len(vnfs) < len(nfv_nodes)
         def vnfs_assignment(nfv_nodes, vnfs):
@@ -820,13 +614,6 @@ class NetworkModelTapAlgo:
             else:
                 return dict(zip(nfv_nodes, cycle(vnfs)))
 
-        policy_name = nfv_cache_policy['name']
-        # policy_name = 'NFV_CACHE'
-        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
-        # The actual cache objects storing the vnfs
-        self.nfv_cache = {node: CACHE_POLICY[policy_name](nfv_cache_size[node], **policy_args)
-                          for node in nfv_cache_size}
-
         # for node in self.nfv_cache:
         # print(node)
         # self.nfv_cache[node].list_nfv_cache()
@@ -916,7 +703,8 @@ class NetworkModelTapAlgo:
 ####################################### NetworkModelFirtFit #################################
 
 
-class NetworkModelFirstFit:
+@register_network_model('FIRST_FIT')
+class NetworkModelFirstFit(NetworkModel):
     """
     Models the internal state of the network.
     This object should never be edited by VNF Allocation Policies directly, but only
@@ -924,41 +712,10 @@ class NetworkModelFirstFit:
 
     """
 
-    def __init__(self, topology, nfv_cache_policy, shortest_path=None):  #
-
-        if not isinstance(topology, fnss.Topology):
-            raise ValueError('The topology argument must be an'
-                             'instance of fnss.Topology or   of its subclasses')
-
-        self.shortest_path = dict(shortest_path) if shortest_path is not None \
-            else (dict(nx.all_pairs_dijkstra_path(topology)))
-
-        self.topology = topology
-        self.nfv_cache = None
-
-        self.link_type = nx.get_edge_attributes(topology, 'type')
-        self.link_delay = fnss.get_delays(topology)
-
-        if not topology.is_directed():
-            for (u, v), link_type in list(self.link_type.items()):
-                self.link_type[(v, u)] = link_type
-
-            for (u, v), delay in list(self.link_delay.items()):
-                self.link_delay[(v, u)] = delay
-
-        nfv_cache_size = {}
-        for node in topology.nodes():
-            stack_name, stack_props = fnss.get_stack(topology, node)
-            if stack_name == 'nfv_node':
-                if 'cache_size' in stack_props:
-                    nfv_cache_size[node] = stack_props['cache_size']
-
-        # if any(c < 8 for c in nfv_cache_size.values()):
-        # logger.warning('Some nfv node caches have size less than 8.'
-        # 'I am setting them to 8 and run the experiment anyway')
-        # for node in nfv_cache_size:
-        # if nfv_cache_size[node] < 8:
-        # fv_cache_size[node] = 8
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):  #
+        super(NetworkModelFirstFit, self).__init__(topology, nfv_cache_policy, shortest_path,
+                                                   context, routing)
 
         # use when the len(vnfs) < len(nfv_nodes)
         def vnfs_assignment(nfv_nodes, vnfs):
@@ -967,13 +724,6 @@ class NetworkModelFirstFit:
             else:
                 return dict(zip(nfv_nodes, cycle(vnfs)))
 
-        policy_name = nfv_cache_policy['name']
-        # policy_name = 'NFV_CACHE'
-        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
-        # The actual cache objects storing the vnfs
-        self.nfv_cache = {node: CACHE_POLICY[policy_name](nfv_cache_size[node], **policy_args)
-                          for node in nfv_cache_size}
-
         # for node in self.nfv_cache:
         # print(node)
         # self.nfv_cache[node].list_nfv_cache()
@@ -1063,7 +813,8 @@ class NetworkModelFirstFit:
 ################################### NetworkModelBaseLine ##################################################
 
 
-class NetworkModelBaseLine:
+@register_network_model('BASELINE')
+class NetworkModelBaseLine(NetworkModel):
     """
     Models the internal state of the network.
     This object should never be edited by VNF Allocation Policies directly, but only
@@ -1071,41 +822,10 @@ class NetworkModelBaseLine:
 
     """
 
-    def __init__(self, topology, nfv_cache_policy, shortest_path=None):  #
-
-        if not isinstance(topology, fnss.Topology):
-            raise ValueError('The topology argument must be an'
-                             'instance of fnss.Topology or   of its subclasses')
-
-        self.shortest_path = dict(shortest_path) if shortest_path is not None \
-            else (dict(nx.all_pairs_dijkstra_path(topology)))
-
-        self.topology = topology
-        self.nfv_cache = None
-
-        self.link_type = nx.get_edge_attributes(topology, 'type')
-        self.link_delay = fnss.get_delays(topology)
-
-        if not topology.is_directed():
-            for (u, v), link_type in list(self.link_type.items()):
-                self.link_type[(v, u)] = link_type
-
-            for (u, v), delay in list(self.link_delay.items()):
-                self.link_delay[(v, u)] = delay
-
-        nfv_cache_size = {}
-        for node in topology.nodes():
-            stack_name, stack_props = fnss.get_stack(topology, node)
-            if stack_name == 'nfv_node':
-                if 'cache_size' in stack_props:
-                    nfv_cache_size[node] = stack_props['cache_size']
-
-        # if any(c < 8 for c in nfv_cache_size.values()):
-        # ogger.warning('Some nfv node caches have size less than 8.'
-        # 'I am setting them to 8 and run the experiment anyway')
-        # for node in nfv_cache_size:
-        # if nfv_cache_size[node] < 8:
-        # nfv_cache_size[node] = 8
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):  #
+        super(NetworkModelBaseLine, self).__init__(topology, nfv_cache_policy, shortest_path,
+                                                   context, routing)
 
         # use when the len(vnfs) < len(nfv_nodes)
         def vnfs_assignment(nfv_nodes, vnfs):
@@ -1114,13 +834,6 @@ class NetworkModelBaseLine:
             else:
                 return dict(zip(nfv_nodes, cycle(vnfs)))
 
-        policy_name = nfv_cache_policy['name']
-        # policy_name = 'NFV_CACHE'
-        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
-        # The actual cache objects storing the vnfs
-        self.nfv_cache = {node: CACHE_POLICY[policy_name](nfv_cache_size[node], **policy_args)
-                          for node in nfv_cache_size}
-
         # for node in self.nfv_cache:
         # print(node)
         # self.nfv_cache[node].list_nfv_cache()
@@ -1220,7 +933,8 @@ class NetworkModelBaseLine:
 
 ################################### NetworkModelFirstOrder ##################################################
 
-class NetworkModelMarkov:
+@register_network_model('MARKOV')
+class NetworkModelMarkov(NetworkModel):
     """
     Models the internal state of the network.
     This object should never be edited by VNF Allocation Policies directly, but only
@@ -1228,42 +942,13 @@ class NetworkModelMarkov:
 
     """
 
-    def __init__(self, topology, nfv_cache_policy, shortest_path=None):  #
-
-        if not isinstance(topology, fnss.Topology):
-            raise ValueError('The topology argument must be an'
-                             'instance of fnss.Topology or   of its subclasses')
-
-        self.shortest_path = dict(shortest_path) if shortest_path is not None \
-            else (dict(nx.all_pairs_dijkstra_path(topology, weight='delay')))
-
-        self.topology = topology
-        self.nfv_cache = None
-
-        self.link_type = nx.get_edge_attributes(topology, 'type')
-        self.link_delay = fnss.get_delays(topology)
-
-        if not topology.is_directed():
-            for (u, v), link_type in list(self.link_type.items()):
-                self.link_type[(v, u)] = link_type
-
-            for (u, v), delay in list(self.link_delay.items()):
-                self.link_delay[(v, u)] = delay
-                # print(delay)
+    # VNF requests are routed over the paths of minimum delay
+    route_weight = 'delay'
 
-        nfv_cache_size = {}
-        for node in topology.nodes():
-            stack_name, stack_props = fnss.get_stack(topology, node)
-            if stack_name == 'nfv_node':
-                if 'cache_size' in stack_props:
-                    nfv_cache_size[node] = stack_props['cache_size']
-
-        # if any(c < 8 for c in nfv_cache_size.values()):
-        # logger.warning('Some nfv node caches have size less than 8.'
-        # 'I am setting them to 8 and run the experiment anyway')
-        # for node in nfv_cache_size:
-        # if nfv_cache_size[node] < 8:
-        # nfv_cache_size[node] = 8
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):  #
+        super(NetworkModelMarkov, self).__init__(topology, nfv_cache_policy, shortest_path, context,
+                                                 routing)
 
         # use when the len(vnfs) < len(nfv_nodes)
         def vnfs_assignment(nfv_nodes, vnfs):
@@ -1272,13 +957,6 @@ class NetworkModelMarkov:
             else:
                 return dict(zip(nfv_nodes, cycle(vnfs)))
 
-        policy_name = nfv_cache_policy['name']
-        # policy_name = 'NFV_CACHE'
-        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
-        # The actual cache objects storing the vnfs
-        self.nfv_cache = {node: CACHE_POLICY[policy_name](nfv_cache_size[node], **policy_args)
-                          for node in nfv_cache_size}
-
         # for node in self.nfv_cache:
         # print(node)
         # self.nfv_cache[node].list_nfv_cache()
@@ -1382,7 +1060,8 @@ class NetworkModelMarkov:
             return nx.shortest_path_length(source, target)
 
 
-class NetworkModelFirstOrder:
+@register_network_model('FIRST_ORDER')
+class NetworkModelFirstOrder(NetworkModel):
     """
     Models the internal state of the network.
     This object should never be edited by VNF Allocation Policies directly, but only
@@ -1390,42 +1069,13 @@ class NetworkModelFirstOrder:
 
     """
 
-    def __init__(self, topology, nfv_cache_policy, shortest_path=None):  #
-
-        if not isinstance(topology, fnss.Topology):
-            raise ValueError('The topology argument must be an'
-                             'instance of fnss.Topology or   of its subclasses')
-
-        self.shortest_path = dict(shortest_path) if shortest_path is not None \
-            else (dict(nx.all_pairs_dijkstra_path(topology, weight='delay')))
-
-        self.topology = topology
-        self.nfv_cache = None
-
-        self.link_type = nx.get_edge_attributes(topology, 'type')
-        self.link_delay = fnss.get_delays(topology)
-
-        if not topology.is_directed():
-            for (u, v), link_type in list(self.link_type.items()):
-                self.link_type[(v, u)] = link_type
-
-            for (u, v), delay in list(self.link_delay.items()):
-                self.link_delay[(v, u)] = delay
-                # print(delay)
-
-        nfv_cache_size = {}
-        for node in topology.nodes():
-            stack_name, stack_props = fnss.get_stack(topology, node)
-            if stack_name == 'nfv_node':
-                if 'cache_size' in stack_props:
-                    nfv_cache_size[node] = stack_props['cache_size']
+    # VNF requests are routed over the paths of minimum delay
+    route_weight = 'delay'
 
-        # if any(c < 8 for c in nfv_cache_size.values()):
-        # logger.warning('Some nfv node caches have size less than 8.'
-        # 'I am setting them to 8 and run the experiment anyway')
-        # for node in nfv_cache_size:
-        # if nfv_cache_size[node] < 8:
-        # nfv_cache_size[node] = 8
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):  #
+        super(NetworkModelFirstOrder, self).__init__(topology, nfv_cache_policy, shortest_path,
+                                                     context, routing)
 
         # use when the len(vnfs) < len(nfv_nodes)
         def vnfs_assignment(nfv_nodes, vnfs):
@@ -1434,13 +1084,6 @@ class NetworkModelFirstOrder:
             else:
                 return dict(zip(nfv_nodes, cycle(vnfs)))
 
-        policy_name = nfv_cache_policy['name']
-        # policy_name = 'NFV_CACHE'
-        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
-        # The actual cache objects storing the vnfs
-        self.nfv_cache = {node: CACHE_POLICY[policy_name](nfv_cache_size[node], **policy_args)
-                          for node in nfv_cache_size}
-
         # for node in self.nfv_cache:
         # print(node)
         # self.nfv_cache[node].list_nfv_cache()
@@ -1546,7 +1189,8 @@ class NetworkModelFirstOrder:
 ################################### NetworkModelHodVnfs ##################################################
 
 
-class NetworkModelProposal:  # BETWEENESS_CENTRALITY
+@register_network_model('HOD_VNF')
+class NetworkModelProposal(NetworkModel):  # BETWEENESS_CENTRALITY
     """
     Models the internal state of the network.
     This object should never be edited by VNF Allocation Policies directly, but only
@@ -1554,48 +1198,10 @@ class NetworkModelProposal:  # BETWEENESS_CENTRALITY
 
     """
 
-    def __init__(self, topology, nfv_cache_policy, shortest_path=None):  #
-
-        if not isinstance(topology, fnss.Topology):
-            raise ValueError('The topology argument must be an'
-                             'instance of fnss.Topology or   of its subclasses')
-
-        self.shortest_path = dict(shortest_path) if shortest_path is not None \
-            else (dict(nx.all_pairs_dijkstra_path(topology)))
-
-        self.nfv_cache = None
-        self.topology = topology
-
-        self.link_type = nx.get_edge_attributes(topology, 'type')
-        self.link_delay = fnss.get_delays(topology)
-
-        if not topology.is_directed():
-            for (u, v), link_type in list(self.link_type.items()):
-                self.link_type[(v, u)] = link_type
-
-            for (u, v), delay in list(self.link_delay.items()):
-                self.link_delay[(v, u)] = delay
-
-        nfv_cache_size = {}
-        for node in topology.nodes():
-            stack_name, stack_props = fnss.get_stack(topology, node)
-            if stack_name == 'nfv_node':
-                if 'cache_size' in stack_props:
-                    # self.nfv_nodes.append(node)
-                    nfv_cache_size[node] = stack_props['cache_size']
-        # if any(c < 8 for c in nfv_cache_size.values()):
-        # logger.warning('Some nfv node caches have size less than 8. '
-        # 'I am setting them to 8 and run the experiment anyway')
-        # for node in nfv_cache_size:
-        # if nfv_cache_size[node] < 8:
-        # nfv_cache_size[node] = 8
-
-        policy_name = nfv_cache_policy['name']
-        # policy_name = 'NFV_CACHE'
-        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
-        # The actual cache objects storing the vnfs
-        self.nfv_cache = {node: CACHE_POLICY[policy_name](nfv_cache_size[node], **policy_args)
-                          for node in nfv_cache_size}
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):  #
+        super(NetworkModelProposal, self).__init__(topology, nfv_cache_policy, shortest_path,
+                                                   context, routing)
 
         def hod_vnfs_assignment(nfv_nodes, sfcs):
             if len(nfv_nodes) < len(sfcs):
@@ -1619,7 +1225,7 @@ class NetworkModelProposal:  # BETWEENESS_CENTRALITY
         ]
 
         # place vnfs on top-20 nfv_nodes with the highest betweenness_centrality value
-        betw_nfv_nodes = NetworkModelProposal.get_top_betw_nodes(topology, 10)
+        betw_nfv_nodes = self.context.centrality.top_nodes('betweenness', 10)
         target_nfv_nodes = hod_vnfs_assignment(betw_nfv_nodes, hods_vnfs)
         for node in self.nfv_cache:
             if node in target_nfv_nodes.keys():
@@ -1657,9 +1263,7 @@ class NetworkModelProposal:  # BETWEENESS_CENTRALITY
 
     @staticmethod
     def get_top_betw_nodes(topology, n_of_nodes):
-        dict_nodes_betw = nx.betweenness_centrality(topology)
-        ord_dict = OrderedDict(sorted(dict_nodes_betw.items(), key=itemgetter(1), reverse=True))
-        return dict(list(ord_dict.items())[0:n_of_nodes])
+        return get_topology_context(topology).centrality.top_nodes('betweenness', n_of_nodes)
 
     @staticmethod
     def shortest_path_len(topology, source_node, dest_node):
@@ -1725,12 +1329,12 @@ class NetworkModelProposal:  # BETWEENESS_CENTRALITY
         nfv_nodes = []
         closest_node = None
         dist_nfv_node_egr_node = defaultdict(int)
-        egr_node = NetworkModelProposal.get_egress_node_path(self.topology, path)
+        egr_node = next((node for node in path if node in self.context.egress_nodes), None)
         for node in path:
-            if self.topology.node[node]['stack'][0] == 'nfv_node':
+            if node in self.context.nfv_nodes:
                 nfv_nodes.append(node)
         for nfv_node in nfv_nodes:
-            dist_nfv_node_egr_node[nfv_node] = len(self.get_shortest_path_between_two_nodes(nfv_node, egr_node))
+            dist_nfv_node_egr_node[nfv_node] = self.path_length(nfv_node, egr_node) + 1
             closest_node = max(dist_nfv_node_egr_node, key=lambda k: dist_nfv_node_egr_node[k]) if len(
                 dist_nfv_node_egr_node) > 0 \
                 else None
@@ -1762,7 +1366,8 @@ class NetworkModelProposal:  # BETWEENESS_CENTRALITY
 ################################### NetworkModelHodVnfs-Off##################################################
 
 
-class NetworkModelProposalOff:  # BETWEENESS_CENTRALITY
+@register_network_model('HOD_VNF_OFF')
+class NetworkModelProposalOff(NetworkModel):  # BETWEENESS_CENTRALITY
     """
     Models the internal state of the network.
     This object should never be edited by VNF Allocation Policies directly, but only
@@ -1770,48 +1375,10 @@ class NetworkModelProposalOff:  # BETWEENESS_CENTRALITY
 
     """
 
-    def __init__(self, topology, nfv_cache_policy, shortest_path=None):  #
-
-        if not isinstance(topology, fnss.Topology):
-            raise ValueError('The topology argument must be an'
-                             'instance of fnss.Topology or   of its subclasses')
-
-        self.shortest_path = dict(shortest_path) if shortest_path is not None \
-            else (dict(nx.all_pairs_dijkstra_path(topology)))
-
-        self.nfv_cache = None
-        self.topology = topology
-
-        self.link_type = nx.get_edge_attributes(topology, 'type')
-        self.link_delay = fnss.get_delays(topology)
-
-        if not topology.is_directed():
-            for (u, v), link_type in list(self.link_type.items()):
-                self.link_type[(v, u)] = link_type
-
-            for (u, v), delay in list(self.link_delay.items()):
-                self.link_delay[(v, u)] = delay
-
-        nfv_cache_size = {}
-        for node in topology.nodes():
-            stack_name, stack_props = fnss.get_stack(topology, node)
-            if stack_name == 'nfv_node':
-                if 'cache_size' in stack_props:
-                    # self.nfv_nodes.append(node)
-                    nfv_cache_size[node] = stack_props['cache_size']
-        # if any(c < 8 for c in nfv_cache_size.values()):
-        # logger.warning('Some nfv node caches have size less than 8. '
-        # 'I am setting them to 8 and run the experiment anyway')
-        # for node in nfv_cache_size:
-        # if nfv_cache_size[node] < 8:
-        # nfv_cache_size[node] = 8
-
-        policy_name = nfv_cache_policy['name']
-        # policy_name = 'NFV_CACHE'
-        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
-        # The actual cache objects storing the vnfs
-        self.nfv_cache = {node: CACHE_POLICY[policy_name](nfv_cache_size[node], **policy_args)
-                          for node in nfv_cache_size}
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):  #
+        super(NetworkModelProposalOff, self).__init__(topology, nfv_cache_policy, shortest_path,
+                                                      context, routing)
 
         def hod_vnfs_assignment(nfv_nodes, sfcs):
             if len(nfv_nodes) < len(sfcs):
@@ -1835,7 +1402,7 @@ class NetworkModelProposalOff:  # BETWEENESS_CENTRALITY
         ]
 
         # place vnfs on top-20 nfv_nodes with the highest betweenness_centrality value
-        betw_nfv_nodes = NetworkModelProposal.get_top_betw_nodes(topology, 10)
+        betw_nfv_nodes = self.context.centrality.top_nodes('betweenness', 10)
         target_nfv_nodes = hod_vnfs_assignment(betw_nfv_nodes, hods_vnfs)
         for node in self.nfv_cache:
             if node in target_nfv_nodes.keys():
@@ -1873,9 +1440,7 @@ class NetworkModelProposalOff:  # BETWEENESS_CENTRALITY
 
     @staticmethod
     def get_top_betw_nodes(topology, n_of_nodes):
-        dict_nodes_betw = nx.betweenness_centrality(topology)
-        ord_dict = OrderedDict(sorted(dict_nodes_betw.items(), key=itemgetter(1), reverse=True))
-        return dict(list(ord_dict.items())[0:n_of_nodes])
+        return get_topology_context(topology).centrality.top_nodes('betweenness', n_of_nodes)
 
     @staticmethod
     def shortest_path_len(topology, source_node, dest_node):
@@ -1941,12 +1506,12 @@ class NetworkModelProposalOff:  # BETWEENESS_CENTRALITY
         nfv_nodes = []
         closest_node = None
         dist_nfv_node_egr_node = defaultdict(int)
-        egr_node = NetworkModelProposal.get_egress_node_path(self.topology, path)
+        egr_node = next((node for node in path if node in self.context.egress_nodes), None)
         for node in path:
-            if self.topology.node[node]['stack'][0] == 'nfv_node':
+            if node in self.context.nfv_nodes:
                 nfv_nodes.append(node)
         for nfv_node in nfv_nodes:
-            dist_nfv_node_egr_node[nfv_node] = len(self.get_shortest_path_between_two_nodes(nfv_node, egr_node))
+            dist_nfv_node_egr_node[nfv_node] = self.path_length(nfv_node, egr_node) + 1
             closest_node = max(dist_nfv_node_egr_node, key=lambda k: dist_nfv_node_egr_node[k]) if len(
                 dist_nfv_node_egr_node) > 0 \
                 else None
@@ -1978,7 +1543,8 @@ class NetworkModelProposalOff:  # BETWEENESS_CENTRALITY
 ############################################################################################################
 
 
-class NetworkModelProposalDegree:  # DEGREE_CENTRALITY
+@register_network_model('HOD_DEG')
+class NetworkModelProposalDegree(NetworkModel):  # DEGREE_CENTRALITY
     """
     Models the internal state of the network.
     This object should never be edited by VNF Allocation Policies directly, but only
@@ -1986,48 +1552,10 @@ class NetworkModelProposalDegree:  # DEGREE_CENTRALITY
 
     """
 
-    def __init__(self, topology, nfv_cache_policy, shortest_path=None):  #
-
-        if not isinstance(topology, fnss.Topology):
-            raise ValueError('The topology argument must be an'
-                             'instance of fnss.Topology or   of its subclasses')
-
-        self.shortest_path = dict(shortest_path) if shortest_path is not None \
-            else (dict(nx.all_pairs_dijkstra_path(topology)))
-
-        self.nfv_cache = None
-        self.topology = topology
-
-        self.link_type = nx.get_edge_attributes(topology, 'type')
-        self.link_delay = fnss.get_delays(topology)
-
-        if not topology.is_directed():
-            for (u, v), link_type in list(self.link_type.items()):
-                self.link_type[(v, u)] = link_type
-
-            for (u, v), delay in list(self.link_delay.items()):
-                self.link_delay[(v, u)] = delay
-
-        nfv_cache_size = {}
-        for node in topology.nodes():
-            stack_name, stack_props = fnss.get_stack(topology, node)
-            if stack_name == 'nfv_node':
-                if 'cache_size' in stack_props:
-                    # self.nfv_nodes.append(node)
-                    nfv_cache_size[node] = stack_props['cache_size']
-        # if any(c < 8 for c in nfv_cache_size.values()):
-        # logger.warning('Some nfv node caches have size less than 8. '
-        # 'I am setting them to 8 and run the experiment anyway')
-        # for node in nfv_cache_size:
-        # if nfv_cache_size[node] < 8:
-        # nfv_cache_size[node] = 8
-
-        policy_name = nfv_cache_policy['name']
-        # policy_name = 'NFV_CACHE'
-        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
-        # The actual cache objects storing the vnfs
-        self.nfv_cache = {node: CACHE_POLICY[policy_name](nfv_cache_size[node], **policy_args)
-                          for node in nfv_cache_size}
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):  #
+        super(NetworkModelProposalDegree, self).__init__(topology, nfv_cache_policy, shortest_path,
+                                                         context, routing)
 
         def hod_vnfs_assignment(nfv_nodes, sfcs):
             if len(nfv_nodes) < len(sfcs):
@@ -2051,7 +1579,7 @@ class NetworkModelProposalDegree:  # DEGREE_CENTRALITY
         ]
 
         # place vnfs on top-20 nfv_nodes with the highest betweenness_centrality value
-        deg_nfv_nodes = NetworkModelProposalDegree.get_top_degree_nodes(topology, 10)
+        deg_nfv_nodes = self.context.centrality.top_nodes('degree', 10)
         target_nfv_nodes = hod_vnfs_assignment(deg_nfv_nodes, hods_vnfs)
         for node in self.nfv_cache:
             if node in target_nfv_nodes.keys():
@@ -2089,9 +1617,7 @@ class NetworkModelProposalDegree:  # DEGREE_CENTRALITY
 
     @staticmethod
     def get_top_degree_nodes(topology, n_of_nodes):
-        dict_nodes_deg = nx.degree_centrality(topology)
-        ord_dict = OrderedDict(sorted(dict_nodes_deg.items(), key=itemgetter(1), reverse=True))
-        return dict(list(ord_dict.items())[0:n_of_nodes])
+        return get_topology_context(topology).centrality.top_nodes('degree', n_of_nodes)
 
     @staticmethod
     def shortest_path_len(topology, source_node, dest_node):
@@ -2157,12 +1683,12 @@ class NetworkModelProposalDegree:  # DEGREE_CENTRALITY
         nfv_nodes = []
         closest_node = None
         dist_nfv_node_egr_node = defaultdict(int)
-        egr_node = NetworkModelProposal.get_egress_node_path(self.topology, path)
+        egr_node = next((node for node in path if node in self.context.egress_nodes), None)
         for node in path:
-            if self.topology.node[node]['stack'][0] == 'nfv_node':
+            if node in self.context.nfv_nodes:
                 nfv_nodes.append(node)
         for nfv_node in nfv_nodes:
-            dist_nfv_node_egr_node[nfv_node] = len(self.get_shortest_path_between_two_nodes(nfv_node, egr_node))
+            dist_nfv_node_egr_node[nfv_node] = self.path_length(nfv_node, egr_node) + 1
             closest_node = min(dist_nfv_node_egr_node, key=lambda k: dist_nfv_node_egr_node[k]) if len(
                 dist_nfv_node_egr_node) > 0 \
                 else None
@@ -2193,7 +1719,8 @@ class NetworkModelProposalDegree:  # DEGREE_CENTRALITY
 
 ############################################################################################################
 
-class NetworkModelProposalCloseness:  # CLOSENESS_CENTRALITY
+@register_network_model('HOD_CLOSE')
+class NetworkModelProposalCloseness(NetworkModel):  # CLOSENESS_CENTRALITY
     """
     Models the internal state of the network.
     This object should never be edited by VNF Allocation Policies directly, but only
@@ -2201,48 +1728,10 @@ class NetworkModelProposalCloseness:  # CLOSENESS_CENTRALITY
 
     """
 
-    def __init__(self, topology, nfv_cache_policy, shortest_path=None):  #
-
-        if not isinstance(topology, fnss.Topology):
-            raise ValueError('The topology argument must be an'
-                             'instance of fnss.Topology or   of its subclasses')
-
-        self.shortest_path = dict(shortest_path) if shortest_path is not None \
-            else (dict(nx.all_pairs_dijkstra_path(topology)))
-
-        self.nfv_cache = None
-        self.topology = topology
-
-        self.link_type = nx.get_edge_attributes(topology, 'type')
-        self.link_delay = fnss.get_delays(topology)
-
-        if not topology.is_directed():
-            for (u, v), link_type in list(self.link_type.items()):
-                self.link_type[(v, u)] = link_type
-
-            for (u, v), delay in list(self.link_delay.items()):
-                self.link_delay[(v, u)] = delay
-
-        nfv_cache_size = {}
-        for node in topology.nodes():
-            stack_name, stack_props = fnss.get_stack(topology, node)
-            if stack_name == 'nfv_node':
-                if 'cache_size' in stack_props:
-                    # self.nfv_nodes.append(node)
-                    nfv_cache_size[node] = stack_props['cache_size']
-        # if any(c < 8 for c in nfv_cache_size.values()):
-        # logger.warning('Some nfv node caches have size less than 8. '
-        # 'I am setting them to 8 and run the experiment anyway')
-        # for node in nfv_cache_size:
-        # if nfv_cache_size[node] < 8:
-        # nfv_cache_size[node] = 8
-
-        policy_name = nfv_cache_policy['name']
-        # policy_name = 'NFV_CACHE'
-        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
-        # The actual cache objects storing the vnfs
-        self.nfv_cache = {node: CACHE_POLICY[policy_name](nfv_cache_size[node], **policy_args)
-                          for node in nfv_cache_size}
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):  #
+        super(NetworkModelProposalCloseness, self).__init__(topology, nfv_cache_policy,
+                                                            shortest_path, context, routing)
 
         def hod_vnfs_assignment(nfv_nodes, sfcs):
             if len(nfv_nodes) < len(sfcs):
@@ -2267,7 +1756,7 @@ class NetworkModelProposalCloseness:  # CLOSENESS_CENTRALITY
         ]
 
         # place vnfs on top-20 nfv_nodes with the highest betweenness_centrality value
-        close_nfv_nodes = NetworkModelProposalCloseness.get_top_close_nodes(topology, 10)
+        close_nfv_nodes = self.context.centrality.top_nodes('closeness', 10)
         target_nfv_nodes = hod_vnfs_assignment(close_nfv_nodes, hods_vnfs)
         for node in self.nfv_cache:
             if node in target_nfv_nodes.keys():
@@ -2305,9 +1794,7 @@ class NetworkModelProposalCloseness:  # CLOSENESS_CENTRALITY
 
     @staticmethod
     def get_top_close_nodes(topology, n_of_nodes):
-        dict_nodes_close = nx.closeness_centrality(topology)
-        ord_dict = OrderedDict(sorted(dict_nodes_close.items(), key=itemgetter(1), reverse=True))
-        return dict(list(ord_dict.items())[0:n_of_nodes])
+        return get_topology_context(topology).centrality.top_nodes('closeness', n_of_nodes)
 
     @staticmethod
     def shortest_path_len(topology, source_node, dest_node):
@@ -2373,12 +1860,12 @@ class NetworkModelProposalCloseness:  # CLOSENESS_CENTRALITY
         nfv_nodes = []
         closest_node = None
         dist_nfv_node_egr_node = defaultdict(int)
-        egr_node = NetworkModelProposal.get_egress_node_path(self.topology, path)
+        egr_node = next((node for node in path if node in self.context.egress_nodes), None)
         for node in path:
-            if self.topology.node[node]['stack'][0] == 'nfv_node':
+            if node in self.context.nfv_nodes:
                 nfv_nodes.append(node)
         for nfv_node in nfv_nodes:
-            dist_nfv_node_egr_node[nfv_node] = len(self.get_shortest_path_between_two_nodes(nfv_node, egr_node))
+            dist_nfv_node_egr_node[nfv_node] = self.path_length(nfv_node, egr_node) + 1
             closest_node = min(dist_nfv_node_egr_node, key=lambda k: dist_nfv_node_egr_node[k]) if len(
                 dist_nfv_node_egr_node) > 0 \
                 else None
@@ -2410,7 +1897,8 @@ class NetworkModelProposalCloseness:  # CLOSENESS_CENTRALITY
 ############################################################################################################
 
 
-class NetworkModelProposalPageRank:  # PAGERANK_CENTRALITY
+@register_network_model('HOD_PAGE')
+class NetworkModelProposalPageRank(NetworkModel):  # PAGERANK_CENTRALITY
     """
     Models the internal state of the network.
     This object should never be edited by VNF Allocation Policies directly, but only
@@ -2418,48 +1906,10 @@ class NetworkModelProposalPageRank:  # PAGERANK_CENTRALITY
 
     """
 
-    def __init__(self, topology, nfv_cache_policy, shortest_path=None):  #
-
-        if not isinstance(topology, fnss.Topology):
-            raise ValueError('The topology argument must be an'
-                             'instance of fnss.Topology or   of its subclasses')
-
-        self.shortest_path = dict(shortest_path) if shortest_path is not None \
-            else (dict(nx.all_pairs_dijkstra_path(topology)))
-
-        self.nfv_cache = None
-        self.topology = topology
-
-        self.link_type = nx.get_edge_attributes(topology, 'type')
-        self.link_delay = fnss.get_delays(topology)
-
-        if not topology.is_directed():
-            for (u, v), link_type in list(self.link_type.items()):
-                self.link_type[(v, u)] = link_type
-
-            for (u, v), delay in list(self.link_delay.items()):
-                self.link_delay[(v, u)] = delay
-
-        nfv_cache_size = {}
-        for node in topology.nodes():
-            stack_name, stack_props = fnss.get_stack(topology, node)
-            if stack_name == 'nfv_node':
-                if 'cache_size' in stack_props:
-                    # self.nfv_nodes.append(node)
-                    nfv_cache_size[node] = stack_props['cache_size']
-        # if any(c < 8 for c in nfv_cache_size.values()):
-        # logger.warning('Some nfv node caches have size less than 8. '
-        # 'I am setting them to 8 and run the experiment anyway')
-        # for node in nfv_cache_size:
-        # if nfv_cache_size[node] < 8:
-        # nfv_cache_size[node] = 8
-
-        policy_name = nfv_cache_policy['name']
-        # policy_name = 'NFV_CACHE'
-        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
-        # The actual cache objects storing the vnfs
-        self.nfv_cache = {node: CACHE_POLICY[policy_name](nfv_cache_size[node], **policy_args)
-                          for node in nfv_cache_size}
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):  #
+        super(NetworkModelProposalPageRank, self).__init__(topology, nfv_cache_policy,
+                                                           shortest_path, context, routing)
 
         def hod_vnfs_assignment(nfv_nodes, sfcs):
             if len(nfv_nodes) < len(sfcs):
@@ -2484,7 +1934,7 @@ class NetworkModelProposalPageRank:  # PAGERANK_CENTRALITY
         ]
 
         # place vnfs on top-20 nfv_nodes with the highest betweenness_centrality value
-        pg_rank_nfv_nodes = NetworkModelProposalPageRank.get_top_pg_rank_nodes(topology, 10)
+        pg_rank_nfv_nodes = self.context.centrality.top_nodes('pagerank', 10)
         target_nfv_nodes = hod_vnfs_assignment(pg_rank_nfv_nodes, hods_vnfs)
         for node in self.nfv_cache:
             if node in target_nfv_nodes.keys():
@@ -2522,9 +1972,7 @@ class NetworkModelProposalPageRank:  # PAGERANK_CENTRALITY
 
     @staticmethod
     def get_top_pg_rank_nodes(topology, n_of_nodes):
-        dict_nodes_pg_rank = nx.pagerank(topology, alpha=0.9)
-        ord_dict = OrderedDict(sorted(dict_nodes_pg_rank.items(), key=itemgetter(1), reverse=True))
-        return dict(list(ord_dict.items())[0:n_of_nodes])
+        return get_topology_context(topology).centrality.top_nodes('pagerank', n_of_nodes)
 
     @staticmethod
     def shortest_path_len(topology, source_node, dest_node):
@@ -2590,12 +2038,12 @@ class NetworkModelProposalPageRank:  # PAGERANK_CENTRALITY
         nfv_nodes = []
         closest_node = None
         dist_nfv_node_egr_node = defaultdict(int)
-        egr_node = NetworkModelProposal.get_egress_node_path(self.topology, path)
+        egr_node = next((node for node in path if node in self.context.egress_nodes), None)
         for node in path:
-            if self.topology.node[node]['stack'][0] == 'nfv_node':
+            if node in self.context.nfv_nodes:
                 nfv_nodes.append(node)
         for nfv_node in nfv_nodes:
-            dist_nfv_node_egr_node[nfv_node] = len(self.get_shortest_path_between_two_nodes(nfv_node, egr_node))
+            dist_nfv_node_egr_node[nfv_node] = self.path_length(nfv_node, egr_node) + 1
             closest_node = min(dist_nfv_node_egr_node, key=lambda k: dist_nfv_node_egr_node[k]) if len(
                 dist_nfv_node_egr_node) > 0 \
                 else None
@@ -2626,7 +2074,8 @@ class NetworkModelProposalPageRank:  # PAGERANK_CENTRALITY
 
 ############################################################################################################
 
-class NetworkModelProposalEigenVector:  # EIGEN_VECTOR_CENTRALITY
+@register_network_model('HOD_EIGEN')
+class NetworkModelProposalEigenVector(NetworkModel):  # EIGEN_VECTOR_CENTRALITY
     """
     Models the internal state of the network.
     This object should never be edited by VNF Allocation Policies directly, but only
@@ -2634,48 +2083,10 @@ class NetworkModelProposalEigenVector:  # EIGEN_VECTOR_CENTRALITY
 
     """
 
-    def __init__(self, topology, nfv_cache_policy, shortest_path=None):  #
-
-        if not isinstance(topology, fnss.Topology):
-            raise ValueError('The topology argument must be an'
-                             'instance of fnss.Topology or   of its subclasses')
-
-        self.shortest_path = dict(shortest_path) if shortest_path is not None \
-            else (dict(nx.all_pairs_dijkstra_path(topology)))
-
-        self.nfv_cache = None
-        self.topology = topology
-
-        self.link_type = nx.get_edge_attributes(topology, 'type')
-        self.link_delay = fnss.get_delays(topology)
-
-        if not topology.is_directed():
-            for (u, v), link_type in list(self.link_type.items()):
-                self.link_type[(v, u)] = link_type
-
-            for (u, v), delay in list(self.link_delay.items()):
-                self.link_delay[(v, u)] = delay
-
-        nfv_cache_size = {}
-        for node in topology.nodes():
-            stack_name, stack_props = fnss.get_stack(topology, node)
-            if stack_name == 'nfv_node':
-                if 'cache_size' in stack_props:
-                    # self.nfv_nodes.append(node)
-                    nfv_cache_size[node] = stack_props['cache_size']
-        # if any(c < 8 for c in nfv_cache_size.values()):
-        # ogger.warning('Some nfv node caches have size less than 8. '
-        # 'I am setting them to 8 and run the experiment anyway')
-        # for node in nfv_cache_size:
-        # if nfv_cache_size[node] < 8:
-        # nfv_cache_size[node] = 8
-
-        policy_name = nfv_cache_policy['name']
-        # policy_name = 'NFV_CACHE'
-        policy_args = {k: v for k, v in nfv_cache_policy.items() if k != 'name'}
-        # The actual cache objects storing the vnfs
-        self.nfv_cache = {node: CACHE_POLICY[policy_name](nfv_cache_size[node], **policy_args)
-                          for node in nfv_cache_size}
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):  #
+        super(NetworkModelProposalEigenVector, self).__init__(topology, nfv_cache_policy,
+                                                              shortest_path, context, routing)
 
         def hod_vnfs_assignment(nfv_nodes, sfcs):
             if len(nfv_nodes) < len(sfcs):
@@ -2700,7 +2111,7 @@ class NetworkModelProposalEigenVector:  # EIGEN_VECTOR_CENTRALITY
         ]
 
         # place vnfs on top-20 nfv_nodes with the highest betweenness_centrality value
-        eigen_nfv_nodes = NetworkModelProposalEigenVector.get_top_eigen_nodes(topology, 10)
+        eigen_nfv_nodes = self.context.centrality.top_nodes('eigenvector', 10)
         target_nfv_nodes = hod_vnfs_assignment(eigen_nfv_nodes, hods_vnfs)
         for node in self.nfv_cache:
             if node in target_nfv_nodes.keys():
@@ -2738,9 +2149,7 @@ class NetworkModelProposalEigenVector:  # EIGEN_VECTOR_CENTRALITY
 
     @staticmethod
     def get_top_eigen_nodes(topology, n_of_nodes):
-        dict_nodes_eigen = nx.eigenvector_centrality(topology, max_iter=500)
-        ord_dict = OrderedDict(sorted(dict_nodes_eigen.items(), key=itemgetter(1), reverse=True))
-        return dict(list(ord_dict.items())[0:n_of_nodes])
+        return get_topology_context(topology).centrality.top_nodes('eigenvector', n_of_nodes)
 
     @staticmethod
     def shortest_path_len(topology, source_node, dest_node):
@@ -2806,12 +2215,12 @@ class NetworkModelProposalEigenVector:  # EIGEN_VECTOR_CENTRALITY
         nfv_nodes = []
         closest_node = None
         dist_nfv_node_egr_node = defaultdict(int)
-        egr_node = NetworkModelProposal.get_egress_node_path(self.topology, path)
+        egr_node = next((node for node in path if node in self.context.egress_nodes), None)
         for node in path:
-            if self.topology.node[node]['stack'][0] == 'nfv_node':
+            if node in self.context.nfv_nodes:
                 nfv_nodes.append(node)
         for nfv_node in nfv_nodes:
-            dist_nfv_node_egr_node[nfv_node] = len(self.get_shortest_path_between_two_nodes(nfv_node, egr_node))
+            dist_nfv_node_egr_node[nfv_node] = self.path_length(nfv_node, egr_node) + 1
             closest_node = min(dist_nfv_node_egr_node, key=lambda k: dist_nfv_node_egr_node[k]) if len(
                 dist_nfv_node_egr_node) > 0 \
                 else None
@@ -2840,6 +2249,36 @@ class NetworkModelProposalEigenVector:  # EIGEN_VECTOR_CENTRALITY
         return self.shortest_path[source][target]
 
 
+################################### NetworkModelBcsp ##############################################
+
+
+@register_network_model('BCSP')
+class NetworkModelBcsp(NetworkModel):
+    """
+    Models the internal state of the network.
+    This object should never be edited by VNF Allocation Policies directly, but only
+    through calls to the network controller.
+
+    NFV caches start empty: the BCSP policy places the SFC of each request on
+    the NFV node of its path with the highest betweenness centrality.
+    """
+
+    def __init__(self, topology, nfv_cache_policy, shortest_path=None, context=None,
+                 routing='dict'):
+        super(NetworkModelBcsp, self).__init__(topology, nfv_cache_policy, shortest_path,
+                                               context, routing)
+
+
+@register_network_view('BCSP')
+class NetworkViewBcsp(NetworkView):
+
+    def __init__(self, model):
+        if not isinstance(model, NetworkModelBcsp):
+            raise ValueError('The model argument must be an instance of '
+                             'NetworkModel')
+        super(NetworkViewBcsp, self).__init__(model)
+
+
 ##################################################### NetworkController #####################################
 
 
@@ -2849,15 +2288,178 @@ class NetworkController:
 
         self.session = None
         self.model = model
+        self._catalog = model.vnf_catalog
         self.collector = None
+        # Summary of the current session, built only if the collector
+        # consumes session summaries
+        self.summary = None
+        self._listens = {}
+        # CPU allocated on each node with an NFV cache, kept up to date as
+        # VNFs are inserted in and evicted from caches. Nodes are ordered as
+        # in model.nfv_cache
+        self._nfv_nodes = list(model.nfv_cache)
+        self.nfv_position = {node: i for i, node in enumerate(self._nfv_nodes)}
+        self.cpu_load = np.array([cache.sum_vnfs_cpu_node() for cache in model.nfv_cache.values()],
+                                 dtype=np.int64)
+        # Segment trees of the loads of the NFV nodes of each queried path,
+        # keyed by path, or of all NFV nodes, keyed by None. Trees are built
+        # on the first query, so that changing loads costs nothing else
+        # until load-aware queries are made
+        self._load_trees = {}
+        # The (tree, position in the tree) pairs of each position in cpu_load
+        self._load_tree_slots = {}
+        # Positions in cpu_load of the NFV nodes of each path, keyed by path
+        self._path_positions = {}
+        # Kernel simulating blocks of sessions of static placement policies
+        self._static_kernel = None
+        # Outcomes of sessions, if enabled, with the key of the request of the
+        # current session and the count of cache changes when it started
+        self.outcomes = None
+        self._session_key = None
+        self._session_version = None
 
     def attach_collector(self, collector):
         self.collector = collector
+        # Per-event notifications are only sent for events handled by the
+        # collector. Collectors other than CollectorProxy receive all of them
+        listens = getattr(collector, 'listens', None)
+        self._listens = {event: listens(event) if listens is not None else True
+                         for event in ('start_session', 'request_vnf_hop', 'vnf_proc_payload',
+                                       'vnf_proc_delay', 'sfc_hit', 'get_sess_latency',
+                                       'end_session', 'session_summary')}
 
     def detach_collector(self):
         self.collector = None
+        self._listens = {}
+
+    def batch_supported(self):
+        """Return whether sessions can be simulated in blocks, which requires
+        the collector to consume session summaries only and the processing
+        delay of VNFs to be constant
+        """
+        if not self.model.vnf_catalog.deterministic:
+            return False
+        return self.collector is None or \
+            not any(listens for event, listens in self._listens.items()
+                    if event != 'session_summary')
+
+    def process_static_batch(self, events, cumulative_delay):
+        """Simulate a block of sessions of a policy that does not change the
+        content of NFV caches and deliver their summaries to the collector
+
+        Parameters
+        ----------
+        events : list
+            List of (time, event) tuples
+        cumulative_delay : bool
+            Whether the delay budget of requests is compared with the sum of
+            the delays of the links traversed or only with the last one
+
+        Returns
+        -------
+        processed : bool
+            False if the block cannot be simulated at once, in which case its
+            sessions must be processed one by one
+        """
+        if not self.batch_supported():
+            return False
+        if self._static_kernel is None:
+            self._static_kernel = StaticSessionKernel(self.model, self.model.vnf_catalog)
+        outcomes = [None] * len(events)
+        keys = None
+        if self.outcomes is not None:
+            sfc_spec = self._catalog.sfc_spec
+            keys = [OutcomeCache.key(event.ingress_node, event.egress_node,
+                                     sfc_spec(event.sfc), event.delay) for _, event in events]
+            outcomes = [self.outcomes.get(key) for key in keys]
+        missed = [i for i, outcome in enumerate(outcomes) if outcome is None]
+        if missed:
+            result = self._static_kernel.run([events[i] for i in missed], cumulative_delay)
+            if result is None:
+                return False
+            hit = result['hit'].tolist()
+            hop_count = result['hop_count'].tolist()
+            link_delay = result['link_delay'].tolist()
+            proc_delay = result['proc_delay'].tolist()
+            latency = result['latency'].tolist()
+            for j, i in enumerate(missed):
+                outcomes[i] = SessionOutcome(hop_count[j], link_delay[j], proc_delay[j], latency[j],
+                                             1 if hit[j] else 0,
+                                             result['path_info'][j].links[:hop_count[j]])
+                if keys is not None:
+                    self.outcomes.put(keys[i], outcomes[i], self.model.cache_version)
+        for (time, event), outcome in zip(events, outcomes):
+            self._deliver_outcome(time, event, outcome)
+        return True
+
+    def _deliver_outcome(self, timestamp, event, outcome):
+        if self.collector is None or not event.log or not self._listens['session_summary']:
+            return
+        summary = SessionSummary(timestamp, event.sfc_id, event.ingress_node,
+                                 event.egress_node, self._catalog.sfc_spec(event.sfc),
+                                 event.delay)
+        summary.hop_count = outcome.hop_count
+        summary.link_delay = outcome.link_delay
+        summary.proc_delay = outcome.proc_delay
+        summary.latency = outcome.latency
+        summary.hits = outcome.hits
+        summary.links = outcome.links
+        self.collector.session_summary(summary, outcome.success)
+
+    def enable_outcome_cache(self, max_size=100000):
+        """Memoize the outcome of sessions, which is only correct if the
+        policy serves requests depending only on the request and on the
+        content of NFV caches
+
+        Outcomes are replayed to the collector as session summaries, hence
+        they are not memoized if the collector consumes other notifications.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            The maximum number of outcomes stored
+
+        Returns
+        -------
+        enabled : bool
+            Whether outcomes are memoized
+        """
+        if self.collector is None or not self.batch_supported():
+            return False
+        self.outcomes = OutcomeCache(self.model, max_size)
+        return True
+
+    def replay_session(self, timestamp, event):
+        """Deliver the memoized outcome of a session to the collector
+
+        Parameters
+        ----------
+        timestamp : float
+            The time of the event
+        event : SfcRequest
+            The event
+
+        Returns
+        -------
+        replayed : bool
+            False if the outcome of the session is not memoized, in which
+            case the event must be processed by the policy
+        """
+        if self.outcomes is None:
+            return False
+        outcome = self.outcomes.get(OutcomeCache.key(event.ingress_node, event.egress_node,
+                                                     self._catalog.sfc_spec(event.sfc),
+                                                     event.delay))
+        if outcome is None:
+            return False
+        self._deliver_outcome(timestamp, event, outcome)
+        return True
 
     def start_session(self, timestamp, sfc_id, ingress_node, egress_node, sfc, delay, log):
+        sfc = self._catalog.sfc_spec(sfc)
+        if self.outcomes is not None:
+            self._session_key = OutcomeCache.key(ingress_node, egress_node, sfc, delay)
+            self._session_version = self.model.cache_version
         self.session = dict(timestamp=timestamp,
                             ingress_node=ingress_node,
                             egress_node=egress_node,
@@ -2865,8 +2467,14 @@ class NetworkController:
                             delay=delay,
                             log=log)
 
+        self.summary = None
         if self.collector is not None and self.session['log']:
-            self.collector.start_session(timestamp, sfc_id, ingress_node, egress_node, sfc, delay)
+            if self._listens['session_summary']:
+                self.summary = SessionSummary(timestamp, sfc_id, ingress_node, egress_node, sfc,
+                                              delay)
+            if self._listens['start_session']:
+                self.collector.start_session(timestamp, sfc_id, ingress_node, egress_node, sfc,
+                                             delay)
 
     def forward_request_path(self, ingress_node, egress_node, path=None, main_path=True):
         if path is None:
@@ -2875,15 +2483,28 @@ class NetworkController:
             self.forward_request_vnf_hop(u, v, main_path)
 
     def forward_request_vnf_hop(self, u, v, main_path=True):
-        if self.collector is not None and self.session['log']:
+        summary = self.summary
+        if summary is not None:
+            summary.hop_count += 1
+            summary.links.append((u, v))
+            if main_path:
+                link_delay = self.model.link_delay[(u, v)]
+                summary.link_delay += link_delay
+                summary.latency += link_delay
+        if self.collector is not None and self.session['log'] and self._listens['request_vnf_hop']:
             self.collector.request_vnf_hop(u, v, main_path)
 
     def proc_vnf_payload(self, u, v, main_path=True):
-        if self.collector is not None and self.session['log']:
+        if self.collector is not None and self.session['log'] and self._listens['vnf_proc_payload']:
             self.collector.vnf_proc_payload(u, v, main_path)
 
     def vnf_proc(self, vnf):
-        if self.collector is not None and self.session['log']:
+        summary = self.summary
+        if summary is not None and vnf in self._catalog:
+            proc_delay = self._catalog.vnf_proc_delay(vnf)
+            summary.proc_delay += proc_delay
+            summary.latency += proc_delay
+        if self.collector is not None and self.session['log'] and self._listens['vnf_proc_delay']:
             self.collector.vnf_proc_delay(vnf)
 
     def get_vnf(self, node, vnf):
@@ -2895,11 +2516,13 @@ class NetworkController:
                 return False
 
     def sfc_hit(self, sfc_id):
-        if self.collector is not None and self.session['log']:
+        if self.summary is not None:
+            self.summary.hits += 1
+        if self.collector is not None and self.session['log'] and self._listens['sfc_hit']:
             self.collector.sfc_hit(sfc_id)
 
     def get_delay_sfc(self):
-        if self.collector is not None and self.session['log']:
+        if self.collector is not None and self.session['log'] and self._listens['get_sess_latency']:
             self.collector.get_sess_latency()
 
     def get_all_paths(self, topology, ingress_node, egress_node):
@@ -2914,51 +2537,150 @@ class NetworkController:
                     self.model.nfv_nodes_betw[node] += 0.1
         return self.model.nfv_nodes_betw[node]
 
+    def _add_vnf(self, node, vnf):
+        cache = self.model.nfv_cache[node]
+        if cache.has_vnf(vnf):
+            return None
+        evicted = cache.add_vnf(vnf)
+        self.model.vnf_inserted(node, vnf, evicted)
+        load = self._catalog.vnf_cpu(vnf)
+        if evicted is not None:
+            load -= self._catalog.vnf_cpu(evicted)
+        if load != 0:
+            position = self.nfv_position[node]
+            self.cpu_load[position] += load
+            slots = self._load_tree_slots.get(position)
+            if slots:
+                node_load = int(self.cpu_load[position])
+                for tree, i in slots:
+                    tree.update(i, node_load)
+        return evicted
+
     def put_vnf(self, node, vnf):
         if node in self.model.nfv_cache:
-            return self.model.nfv_cache[node].add_vnf(vnf)
+            return self._add_vnf(node, vnf)
 
     def put_sfc(self, node, sfc):
         if node in self.model.nfv_cache:
             for vnf in sfc:
-                self.model.nfv_cache[node].add_vnf(vnf)
+                self._add_vnf(node, vnf)
 
     def get_closest_nfv_node(self, path):
         return self.model.get_closest_nfv_node_path(path)
 
+    def path_positions(self, path):
+        """Return the positions in cpu_load of the NFV nodes of a path
+
+        Parameters
+        ----------
+        path : list
+            The path
+
+        Returns
+        -------
+        positions : np.ndarray
+            The positions, in the order in which nodes appear in the path
+        """
+        key = tuple(path)
+        if key not in self._path_positions:
+            self._path_positions[key] = np.array([self.nfv_position[node] for node in path
+                                                  if node in self.nfv_position], dtype=np.intp)
+        return self._path_positions[key]
+
     def sum_vnfs_cpu_on_node(self, node):
-        if node in self.model.nfv_cache:
-            return self.model.nfv_cache[node].sum_vnfs_cpu_node()
+        if node in self.nfv_position:
+            return int(self.cpu_load[self.nfv_position[node]])
 
     def nodes_rem_cpu(self, path):
-        rem_cpu = {}
-        for node in path:
-            if node in self.model.nfv_cache:
-                cpu = self.sum_vnfs_cpu_on_node(node)
-                rem_cpu[node] = 100 - cpu
-        return sum(rem_cpu.values())
+        return int((100 - self.cpu_load[self.path_positions(path)]).sum())
 
     def sort_paths_min_cpu_use(self, paths):
-        dict_of_paths = {}
-        dict_sum_cpu = {}
-        for i, path in enumerate(paths):
-            dict_sum_cpu[i] = self.nodes_rem_cpu(path) + 100
-            dict_of_paths[i] = path
-        path_min_sum_cpu = max(dict_sum_cpu, key=dict_sum_cpu.get)
-        # print('sum:', path_min_sum_cpu)
-        # print('path', dict_of_paths[path_min_sum_cpu])
-        return dict_of_paths[path_min_sum_cpu]
+        rem_cpu = [self.nodes_rem_cpu(path) for path in paths]
+        # The first path with the most remaining CPU
+        return paths[rem_cpu.index(max(rem_cpu))]
+
+    def max_rem_cpu_path(self, ingress_node, egress_node):
+        """Return the path with the minimum number of hops between two nodes
+        whose NFV nodes have the most remaining CPU
+
+        Ties are broken in favour of the first path returned by
+        nx.all_shortest_paths.
+
+        Parameters
+        ----------
+        ingress_node, egress_node : any hashable type
+            The ingress and egress nodes
+
+        Returns
+        -------
+        path : list
+            The selected path
+        rem_cpu : int
+            The sum of the remaining CPU of the NFV nodes of the path
+        delay : float
+            The sum of the delays of the links of the path
+        """
+        index = self.model.context.candidate_paths()
+        candidates = index.candidates(ingress_node, egress_node)
+        rem_cpu = candidates.rem_cpu(100 - self.cpu_load)
+        best = int(np.argmax(rem_cpu))
+        return candidates.paths[best], int(rem_cpu[best]), candidates.delays[best]
+
+    def least_loaded_nfv_node(self, path=None):
+        """Return the NFV node with the least CPU allocated
+
+        The node is read from the root of a segment tree over the loads of
+        the nodes considered, which is built on the first query and then
+        updated in logarithmic time whenever the load of one of its nodes
+        changes.
+
+        Parameters
+        ----------
+        path : list, optional
+            If specified, only the NFV nodes of this path are considered and
+            ties are broken in favour of the node closest to its first node.
+            Otherwise all NFV nodes are considered and ties are broken in
+            favour of the first node of model.nfv_cache
+
+        Returns
+        -------
+        node : any hashable type
+            The NFV node, or None if there is no NFV node to consider
+        """
+        if path is None:
+            key = None
+            positions = np.arange(len(self._nfv_nodes))
+        else:
+            key = tuple(path)
+            positions = self.path_positions(path)
+        if len(positions) == 0:
+            return None
+        tree = self._load_trees.get(key)
+        if tree is None:
+            tree = self._load_trees[key] = MinLoadTree(self.cpu_load[positions].tolist())
+            for i, position in enumerate(positions.tolist()):
+                self._load_tree_slots.setdefault(position, []).append((tree, i))
+        i, _ = tree.argmin()
+        return self._nfv_nodes[positions[i]]
 
     def nfv_nodes_path(self, path):
         return self.model.get_nfv_nodes_path(path)
 
     def find_nfv_node_with_min_cpu_alloc(self, source, target):
-        path = self.model.shortest_path[source][target]
-        target_node = min(self.sum_vnfs_cpu_on_node(node) for node in path if node in self.model.nfv_cache)
-        return target_node
+        node = self.least_loaded_nfv_node(self.model.shortest_path[source][target])
+        if node is None:
+            raise ValueError('No NFV node on the path from %s to %s' % (source, target))
+        return int(self.cpu_load[self.nfv_position[node]])
 
     def end_session(self, success=True):
 
+        if self.outcomes is not None and self.summary is not None:
+            self.outcomes.put(self._session_key, SessionOutcome.from_summary(self.summary, success),
+                              self._session_version)
         if self.collector is not None and self.session['log']:
-            self.collector.end_session(success)
+            if self.summary is not None:
+                self.collector.session_summary(self.summary, success)
+            if self._listens['end_session']:
+                self.collector.end_session(success)
         self.session = None
+        self.summary = None
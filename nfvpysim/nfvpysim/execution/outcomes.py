@@ -0,0 +1,125 @@
+"""Memoization of the outcome of sessions.
+
+When a policy serves requests depending only on the request and on the
+content of NFV caches, two sessions of requests with the same ingress node,
+egress node, SFC and delay budget have the same outcome as long as no cache
+changes in between. The outcome of such sessions is stored and replayed to
+collectors instead of walking the path again.
+"""
+
+__all__ = [
+    'SessionOutcome',
+    'OutcomeCache'
+]
+
+
+class SessionOutcome(object):
+    """Outcome of a session, as reported to collectors by a SessionSummary.
+    """
+
+    __slots__ = ('hop_count', 'link_delay', 'proc_delay', 'latency', 'hits', 'links',
+                 'success')
+
+    def __init__(self, hop_count, link_delay, proc_delay, latency, hits, links, success=True):
+        """Constructor
+
+        Parameters
+        ----------
+        hop_count : int
+            The number of hops traversed
+        link_delay : float
+            The sum of the delays of the links of the main path
+        proc_delay : float
+            The sum of the processing delays of the VNFs processed
+        latency : float
+            The latency of the session
+        hits : int
+            The number of times the SFC was reported as served
+        links : list
+            The links traversed. It must not be modified
+        success : bool, optional
+            Whether the session ended successfully
+        """
+        self.hop_count = hop_count
+        self.link_delay = link_delay
+        self.proc_delay = proc_delay
+        self.latency = latency
+        self.hits = hits
+        self.links = links
+        self.success = success
+
+    @classmethod
+    def from_summary(cls, summary, success=True):
+        return cls(summary.hop_count, summary.link_delay, summary.proc_delay, summary.latency,
+                   summary.hits, summary.links, success)
+
+
+class OutcomeCache(object):
+    """Outcomes of sessions keyed by request, valid for a given content of the
+    NFV caches of a network model.
+
+    The model counts the changes of its caches. All outcomes are dropped as
+    soon as the count differs from the one they were stored at.
+    """
+
+    def __init__(self, model, max_size=100000):
+        """Constructor
+
+        Parameters
+        ----------
+        model : NetworkModel
+            The network model
+        max_size : int, optional
+            The maximum number of outcomes stored. Once reached, new outcomes
+            are not stored until the cache is cleared
+        """
+        if max_size <= 0:
+            raise ValueError('max_size must be positive')
+        self.model = model
+        self.max_size = max_size
+        self.version = model.cache_version
+        self._outcomes = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(ingress_node, egress_node, sfc, delay):
+        """Return the key of a request for an SFC, given as an SfcSpec"""
+        return ingress_node, egress_node, sfc.id, delay
+
+    def _validate(self):
+        if self.model.cache_version != self.version:
+            self._outcomes.clear()
+            self.version = self.model.cache_version
+
+    def get(self, key):
+        """Return the outcome of a session, or None if it is not stored or the
+        caches changed since it was stored
+        """
+        self._validate()
+        outcome = self._outcomes.get(key)
+        if outcome is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return outcome
+
+    def put(self, key, outcome, version):
+        """Store the outcome of a session
+
+        Parameters
+        ----------
+        key : tuple
+            The key of the request
+        outcome : SessionOutcome
+            The outcome
+        version : int
+            The count of cache changes when the session started. The outcome
+            is stored only if the session did not change any cache
+        """
+        self._validate()
+        if version == self.version and len(self._outcomes) < self.max_size:
+            self._outcomes[key] = outcome
+
+    def clear(self):
+        self._outcomes.clear()
@@ -0,0 +1,68 @@
+"""Features of the path between an ingress and an egress node.
+
+Policies walk the shortest path of each request hop by hop and query, for each
+hop, the delay of the link and whether the node reached hosts an NFV cache.
+All of it only depends on the routing and on the location of NFV nodes, which
+do not change during an experiment, so it is computed once per ingress-egress
+pair and memoized by the network model.
+"""
+
+__all__ = ['PathInfo']
+
+
+class PathInfo(object):
+    """Read-only features of the shortest path between two nodes.
+
+    Hops are numbered from 0: hop i traverses links[i], from path[i] to
+    path[i + 1].
+
+    Attributes
+    ----------
+    path : list
+        The nodes of the path
+    links : list
+        The (u, v) links of the path
+    link_delays : list
+        The delay of each link
+    cum_delays : list
+        The sum of the delays of the links up to each hop, included
+    nfv_positions : tuple
+        The positions in the path of the nodes with an NFV cache
+    nfv_hops : list
+        For each hop, whether the node reached is an NFV node
+    closest_nfv_node : any hashable type
+        The NFV node of the path selected by the network model to host missed
+        VNFs, or None if the model does not select one
+    egress_index : int
+        The position of the egress node in the path
+    """
+
+    __slots__ = ('path', 'links', 'link_delays', 'cum_delays', 'nfv_positions',
+                 'nfv_hops', 'closest_nfv_node', 'egress_index')
+
+    def __init__(self, path, link_delay, nfv_nodes, closest_nfv_node=None):
+        """Constructor
+
+        Parameters
+        ----------
+        path : list
+            The nodes of the path, from the ingress to the egress node
+        link_delay : dict
+            The delay of each link, keyed by (u, v)
+        nfv_nodes : container
+            The NFV nodes of the topology
+        closest_nfv_node : any hashable type, optional
+            The NFV node of the path selected to host missed VNFs
+        """
+        self.path = path
+        self.links = [(path[i], path[i + 1]) for i in range(len(path) - 1)]
+        self.link_delays = [link_delay[link] for link in self.links]
+        self.cum_delays = []
+        sum_delay = 0
+        for delay in self.link_delays:
+            sum_delay += delay
+            self.cum_delays.append(sum_delay)
+        self.nfv_positions = tuple(i for i, v in enumerate(path) if v in nfv_nodes)
+        self.nfv_hops = [v in nfv_nodes for _, v in self.links]
+        self.closest_nfv_node = closest_nfv_node
+        self.egress_index = len(path) - 1
@@ -0,0 +1,545 @@
+"""Compact, array-backed representation of the routing state of a topology.
+
+Nodes are relabelled to contiguous integers and links are stored in CSR
+(compressed sparse row) format. Shortest paths are stored as a float32
+distance matrix and an int32 predecessor matrix, from which the path between
+any pair of nodes is rebuilt only when it is requested. Memory is then
+O(N^2) numbers instead of O(N^2) Python lists of nodes, which makes
+topologies with thousands of nodes tractable.
+
+Shortest paths are computed either with the Dijkstra implementation of
+networkx, which yields exactly the paths of nx.all_pairs_dijkstra_path, or
+with scipy.sparse.csgraph, which is much faster but may select a different
+path among several of equal length.
+
+Mapping adapters allow to use these arrays wherever a dict of dicts of paths
+or a dict of link attributes keyed by (u, v) tuples is expected.
+
+Alternatively, a shortest path oracle computes the paths from a source only
+when they are first requested and keeps them in a cache of bounded memory.
+Since requests are only routed from ingress nodes, only the paths from a few
+sources are ever computed.
+
+Finally, a candidate path index keeps all the paths with the minimum number of
+hops between pairs of nodes, for policies selecting one of them according to
+the load of the NFV nodes they traverse.
+"""
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import numpy as np
+import networkx as nx
+import fnss
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import shortest_path
+
+__all__ = [
+    'RoutingArrays',
+    'ShortestPathOracle',
+    'CandidatePaths',
+    'CandidatePathIndex',
+    'PathTable',
+    'LinkAttributeMap'
+]
+
+# Value of the predecessor matrix for the source node and unreachable nodes
+NO_PREDECESSOR = -9999
+
+# Number of rows of the matrices processed at once when computing shortest
+# paths with scipy or accumulating link attributes along shortest paths
+ROW_BLOCK_SIZE = 256
+
+# Implementations of the computation of shortest paths
+ROUTING_BACKENDS = ('networkx', 'scipy')
+
+# Default memory budget of the shortest path oracle, in bytes
+ORACLE_MEMORY_BUDGET = 256 * 2 ** 20
+
+# Approximate memory taken by the path to a target: the dict entry and the
+# list object, plus one pointer per node of the path
+PATH_ENTRY_SIZE = 160
+PATH_NODE_SIZE = 8
+
+
+class RoutingArrays(object):
+    """Routing state of a topology backed by NumPy arrays.
+
+    Attributes
+    ----------
+    nodes : list
+        The nodes of the topology. The index of a node in this list is its
+        integer label
+    index : dict
+        The integer label of each node
+    indptr, indices : np.ndarray
+        CSR adjacency of the topology. The neighbours of node i are
+        indices[indptr[i]:indptr[i + 1]], sorted
+    weight : np.ndarray
+        The weight of each link used for routing, in CSR order
+    dist : np.ndarray
+        float32 matrix of the length of the shortest paths, measured with the
+        routing weight. Unreachable pairs have infinite length
+    pred : np.ndarray
+        int32 matrix where pred[i, j] is the node preceding j on the shortest
+        path from i to j, or NO_PREDECESSOR if j == i or j is unreachable
+    delay : np.ndarray
+        float32 matrix of the sum of link delays along the shortest paths
+    """
+
+    def __init__(self, topology, weight='weight', backend='networkx'):
+        """Constructor
+
+        Parameters
+        ----------
+        topology : fnss.Topology
+            The topology
+        weight : str, optional
+            The link attribute used as weight to compute the shortest paths
+        backend : str, optional
+            The implementation of Dijkstra's algorithm used: 'networkx' or
+            'scipy'
+        """
+        if backend not in ROUTING_BACKENDS:
+            raise ValueError('Unknown routing backend %s. Valid options are %s'
+                             % (backend, ', '.join(ROUTING_BACKENDS)))
+        self.weight_attr = weight
+        self.backend = backend
+        self.nodes = list(topology.nodes())
+        self.index = {v: i for i, v in enumerate(self.nodes)}
+        self._build_links(topology, weight)
+        if backend == 'scipy':
+            self._compute_shortest_paths_scipy()
+        else:
+            self._compute_shortest_paths(topology, weight)
+        self._hops = None
+        if weight == 'delay':
+            self.delay = self.dist
+        else:
+            self.delay = self.path_sum(self._delay).astype(np.float32)
+        self.shortest_paths = PathTable(self)
+        self.link_delay = LinkAttributeMap(self, self._delay)
+        self.link_type = LinkAttributeMap(self, self._type_code, self._type_labels)
+
+    @property
+    def n_nodes(self):
+        return len(self.nodes)
+
+    def _build_links(self, topology, weight):
+        n = self.n_nodes
+        delays = fnss.get_delays(topology)
+        labels = []
+        rows, cols, weights, link_delays, type_codes = [], [], [], [], []
+        for u, v, data in topology.edges(data=True):
+            link_type = data.get('type')
+            if link_type not in labels:
+                labels.append(link_type)
+            directions = [(u, v)] if topology.is_directed() else [(u, v), (v, u)]
+            for x, y in directions:
+                rows.append(self.index[x])
+                cols.append(self.index[y])
+                weights.append(data.get(weight, 1))
+                link_delays.append(delays[(u, v)] if (u, v) in delays else 0)
+                type_codes.append(labels.index(link_type))
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        # Sorting links by flat key sorts them by row and then by column, which
+        # is the CSR order
+        keys = rows * n + cols
+        order = np.argsort(keys, kind='stable')
+        self._link_keys = keys[order]
+        self.indices = cols[order].astype(np.int32)
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=self.indptr[1:])
+        self.weight = np.asarray(weights, dtype=np.float64)[order]
+        self._delay = np.asarray(link_delays, dtype=np.float64)[order]
+        self._type_code = np.asarray(type_codes, dtype=np.int32)[order]
+        self._type_labels = labels
+
+    def _compute_shortest_paths(self, topology, weight):
+        n = self.n_nodes
+        self.dist = np.full((n, n), np.inf, dtype=np.float32)
+        self.pred = np.full((n, n), NO_PREDECESSOR, dtype=np.int32)
+        index = self.index
+        for s, source in enumerate(self.nodes):
+            # Paths returned by Dijkstra form a tree rooted at the source, so
+            # the predecessor of each node is enough to rebuild them exactly
+            dist, paths = nx.single_source_dijkstra(topology, source, weight=weight)
+            self.dist[s, [index[v] for v in dist]] = list(dist.values())
+            targets = [v for v in paths if v != source]
+            self.pred[s, [index[v] for v in targets]] = [index[paths[v][-2]] for v in targets]
+
+    def _compute_shortest_paths_scipy(self):
+        n = self.n_nodes
+        graph = csr_matrix((self.weight, self.indices, self.indptr), shape=(n, n))
+        self.dist = np.empty((n, n), dtype=np.float32)
+        self.pred = np.empty((n, n), dtype=np.int32)
+        # Sources are processed in blocks to bound the size of the float64
+        # matrices returned by scipy
+        for start in range(0, n, ROW_BLOCK_SIZE):
+            sources = np.arange(start, min(start + ROW_BLOCK_SIZE, n))
+            dist, pred = shortest_path(graph, method='D', directed=True,
+                                       return_predecessors=True, indices=sources)
+            self.dist[sources] = dist
+            self.pred[sources] = pred
+
+    @property
+    def hops(self):
+        """int32 matrix of the number of hops of the shortest paths"""
+        if self._hops is None:
+            self._hops = self.path_sum(np.ones(len(self.indices))).astype(np.int32)
+        return self._hops
+
+    def link_position(self, u, v):
+        """Return the position of the links (u, v) in CSR order
+
+        Parameters
+        ----------
+        u, v : np.ndarray or int
+            Integer labels of the endpoints of the links
+
+        Returns
+        -------
+        position : np.ndarray or int
+            The positions, or -1 for the pairs of nodes not linked
+        """
+        keys = np.asarray(u, dtype=np.int64) * self.n_nodes + v
+        pos = np.searchsorted(self._link_keys, keys)
+        pos = np.minimum(pos, len(self._link_keys) - 1)
+        return np.where(self._link_keys[pos] == keys, pos, -1)
+
+    def path_sum(self, values):
+        """Sum a link attribute along the shortest paths between all pairs
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The value of the attribute of each link, in CSR order
+
+        Returns
+        -------
+        path_sum : np.ndarray
+            float64 matrix of the sums. It is 0 on unreachable pairs
+        """
+        n = self.n_nodes
+        sums = np.zeros((n, n), dtype=np.float64)
+        for start in range(0, n, ROW_BLOCK_SIZE):
+            pred = self.pred[start:start + ROW_BLOCK_SIZE]
+            rows = np.arange(pred.shape[0])[:, None]
+            cols = np.broadcast_to(np.arange(n), pred.shape)
+            # Sources and unreachable nodes are their own ancestors and their
+            # sum is 0, so that pointer jumping leaves them unchanged
+            linked = pred >= 0
+            anc = np.where(linked, pred, cols)
+            acc = np.zeros(pred.shape, dtype=np.float64)
+            acc[linked] = values[self.link_position(anc[linked], cols[linked])]
+            while True:
+                next_anc = anc[rows, anc]
+                if np.array_equal(next_anc, anc):
+                    break
+                acc += acc[rows, anc]
+                anc = next_anc
+            sums[start:start + ROW_BLOCK_SIZE] = acc
+        return sums
+
+    def path_indices(self, s, t):
+        """Return the shortest path between two nodes as integer labels
+
+        Parameters
+        ----------
+        s, t : int
+            Integer labels of the source and target nodes
+
+        Returns
+        -------
+        path : list
+            Integer labels of the nodes of the path
+        """
+        pred = self.pred[s]
+        if s != t and pred[t] == NO_PREDECESSOR:
+            raise KeyError(self.nodes[t])
+        path = [t]
+        while t != s:
+            t = int(pred[t])
+            path.append(t)
+        path.reverse()
+        return path
+
+    def shortest_path(self, source, target):
+        """Return the shortest path between two nodes
+
+        Parameters
+        ----------
+        source, target : any hashable type
+            The source and target nodes
+
+        Returns
+        -------
+        path : list
+            The nodes of the path, including source and target
+        """
+        nodes = self.nodes
+        return [nodes[i] for i in self.path_indices(self.index[source], self.index[target])]
+
+    def path_length(self, source, target):
+        """Return the number of hops of the shortest path between two nodes"""
+        s, t = self.index[source], self.index[target]
+        if s != t and self.pred[s, t] == NO_PREDECESSOR:
+            raise KeyError(target)
+        return int(self.hops[s, t])
+
+    def path_delay(self, source, target):
+        """Return the sum of link delays along the shortest path between two
+        nodes
+        """
+        return float(self.delay[self.index[source], self.index[target]])
+
+
+class PathTable(Mapping):
+    """Read-only dict of dicts of shortest paths, rebuilt lazily from a
+    predecessor matrix: table[source][target] returns the path as a list.
+    """
+
+    def __init__(self, routing):
+        self.routing = routing
+
+    def __getitem__(self, source):
+        return _SourcePaths(self.routing, self.routing.index[source])
+
+    def __iter__(self):
+        return iter(self.routing.nodes)
+
+    def __len__(self):
+        return self.routing.n_nodes
+
+
+class _SourcePaths(Mapping):
+    """Shortest paths from a single source node"""
+
+    def __init__(self, routing, s):
+        self.routing = routing
+        self.s = s
+
+    def __getitem__(self, target):
+        routing = self.routing
+        nodes = routing.nodes
+        return [nodes[i] for i in routing.path_indices(self.s, routing.index[target])]
+
+    def _targets(self):
+        reachable = self.routing.pred[self.s] != NO_PREDECESSOR
+        reachable[self.s] = True
+        return np.flatnonzero(reachable)
+
+    def __iter__(self):
+        nodes = self.routing.nodes
+        return (nodes[i] for i in self._targets())
+
+    def __len__(self):
+        return len(self._targets())
+
+
+class LinkAttributeMap(Mapping):
+    """Read-only dict of a link attribute keyed by (u, v) tuples, backed by an
+    array in CSR order.
+    """
+
+    def __init__(self, routing, values, labels=None):
+        """Constructor
+
+        Parameters
+        ----------
+        routing : RoutingArrays
+            The routing arrays the links belong to
+        values : np.ndarray
+            The value of the attribute of each link, in CSR order
+        labels : list, optional
+            If specified, values are indices of this list
+        """
+        self.routing = routing
+        self.values = values
+        self.labels = labels
+
+    def __getitem__(self, link):
+        u, v = link
+        index = self.routing.index
+        if u not in index or v not in index:
+            raise KeyError(link)
+        pos = int(self.routing.link_position(index[u], index[v]))
+        if pos < 0:
+            raise KeyError(link)
+        value = self.values[pos].item()
+        return self.labels[value] if self.labels is not None else value
+
+    def __iter__(self):
+        nodes = self.routing.nodes
+        indptr = self.routing.indptr
+        indices = self.routing.indices
+        for i in range(self.routing.n_nodes):
+            for j in indices[indptr[i]:indptr[i + 1]]:
+                yield nodes[i], nodes[j]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ShortestPathOracle(Mapping):
+    """Shortest paths computed on request, one source at a time.
+
+    The first time a path from a source is requested, Dijkstra's algorithm
+    computes the paths from that source to all nodes. They are kept in an LRU
+    cache whose approximate memory footprint does not exceed a budget. The
+    oracle can be used in place of the dict of dicts returned by
+    nx.all_pairs_dijkstra_path, with which paths are identical:
+    oracle[source][target] returns the path as a list.
+    """
+
+    def __init__(self, topology, weight='weight', max_memory=ORACLE_MEMORY_BUDGET):
+        """Constructor
+
+        Parameters
+        ----------
+        topology : fnss.Topology
+            The topology
+        weight : str, optional
+            The link attribute used as weight to compute the shortest paths
+        max_memory : int, optional
+            The memory budget of the cache, in bytes. The paths from the last
+            source requested are always kept, even if they exceed it
+        """
+        if max_memory <= 0:
+            raise ValueError('max_memory must be positive')
+        self.topology = topology
+        self.weight = weight
+        self.max_memory = max_memory
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self._paths = OrderedDict()
+        self._size = {}
+
+    def __getitem__(self, source):
+        if source in self._paths:
+            self.hits += 1
+            self._paths.move_to_end(source)
+            return self._paths[source]
+        if source not in self.topology:
+            raise KeyError(source)
+        self.misses += 1
+        paths = nx.single_source_dijkstra_path(self.topology, source, weight=self.weight)
+        size = sum(PATH_ENTRY_SIZE + PATH_NODE_SIZE * len(path) for path in paths.values())
+        self._paths[source] = paths
+        self._size[source] = size
+        self.memory += size
+        while self.memory > self.max_memory and len(self._paths) > 1:
+            evicted, _ = self._paths.popitem(last=False)
+            self.memory -= self._size.pop(evicted)
+        return paths
+
+    def __iter__(self):
+        return iter(self.topology.nodes())
+
+    def __len__(self):
+        return self.topology.number_of_nodes()
+
+    def __contains__(self, source):
+        return source in self.topology
+
+    def clear(self):
+        """Drop all cached paths"""
+        self._paths.clear()
+        self._size.clear()
+        self.memory = 0
+
+
+class CandidatePaths(object):
+    """All the paths with the minimum number of hops between two nodes.
+
+    Attributes
+    ----------
+    paths : list
+        The paths, in the order in which nx.all_shortest_paths returns them
+    delays : list
+        The sum of the delays of the links of each path
+    nfv_index : np.ndarray
+        Matrix with a row per path listing the positions, in the NFV node array
+        of the index, of the NFV nodes of the path. Rows are padded with the
+        position following the last NFV node
+    """
+
+    __slots__ = ('paths', 'delays', 'nfv_index')
+
+    def __init__(self, paths, delays, nfv_index):
+        self.paths = paths
+        self.delays = delays
+        self.nfv_index = nfv_index
+
+    def rem_cpu(self, node_rem_cpu):
+        """Return the sum of the remaining CPU of the NFV nodes of each path
+
+        Parameters
+        ----------
+        node_rem_cpu : np.ndarray
+            The remaining CPU of each NFV node of the index
+
+        Returns
+        -------
+        rem_cpu : np.ndarray
+            The remaining CPU of each path
+        """
+        return np.append(node_rem_cpu, 0)[self.nfv_index].sum(axis=1)
+
+
+class CandidatePathIndex(object):
+    """Candidate paths between pairs of nodes, computed the first time a pair
+    is requested and then kept for the whole lifetime of the index.
+    """
+
+    def __init__(self, topology, nfv_nodes, link_delay):
+        """Constructor
+
+        Parameters
+        ----------
+        topology : fnss.Topology
+            The topology
+        nfv_nodes : list
+            The NFV nodes whose load is used to score paths. Their order
+            defines the order of the load arrays passed to the index
+        link_delay : dict
+            The delay of each link, keyed by (u, v)
+        """
+        self.topology = topology
+        self.nfv_nodes = list(nfv_nodes)
+        self.nfv_position = {v: i for i, v in enumerate(self.nfv_nodes)}
+        self.link_delay = link_delay
+        self._candidates = {}
+
+    def candidates(self, source, target):
+        """Return the candidate paths between two nodes
+
+        Parameters
+        ----------
+        source, target : any hashable type
+            The source and target nodes
+
+        Returns
+        -------
+        candidates : CandidatePaths
+            The candidate paths
+        """
+        key = (source, target)
+        if key not in self._candidates:
+            paths = list(nx.all_shortest_paths(self.topology, source, target))
+            delays = []
+            for path in paths:
+                sum_delay = 0
+                for hop in range(1, len(path)):
+                    sum_delay += self.link_delay[(path[hop - 1], path[hop])]
+                delays.append(sum_delay)
+            pad = len(self.nfv_nodes)
+            positions = [[self.nfv_position[v] for v in path if v in self.nfv_position]
+                         for path in paths]
+            width = max(len(p) for p in positions)
+            nfv_index = np.full((len(paths), width), pad, dtype=np.intp)
+            for i, p in enumerate(positions):
+                nfv_index[i, :len(p)] = p
+            self._candidates[key] = CandidatePaths(paths, delays, nfv_index)
+        return self._candidates[key]
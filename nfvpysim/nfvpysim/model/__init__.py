@@ -1,2 +1,3 @@
+from .catalog import *
 from .cache import *
 from .policy import *
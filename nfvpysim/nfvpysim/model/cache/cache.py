@@ -1,10 +1,12 @@
 from __future__ import division
 from nfvpysim.registry import register_cache_policy
+from nfvpysim.model.catalog import get_vnf_catalog
 from collections import deque
 
 
 __all__ = [
-    'NfvCache'
+    'NfvCache',
+    'BitmaskNfvCache'
     ]
 
 @register_cache_policy('NFV_CACHE')
@@ -15,10 +17,22 @@ class NfvCache:
         self.max_size = max_size
         if self.max_size <= 0:
             raise ValueError('max_size must be positive')
+        self.catalog = get_vnf_catalog()
 
     def add_vnf(self, vnf):
+        """Insert a VNF in the cache, evicting the oldest VNF if it is full
+
+        Returns
+        -------
+        evicted : any hashable type
+            The VNF evicted from the cache, or None if no VNF was evicted
+        """
+        evicted = None
         if not self.has_vnf(vnf):
+            if len(self.nfv_cache) == self.nfv_cache.maxlen:
+                evicted = self.nfv_cache[0] if self.nfv_cache else vnf
             self.nfv_cache.append(vnf)
+        return evicted
 
     def get_vnf(self, vnf):
         return self.has_vnf(vnf)
@@ -33,21 +47,60 @@ class NfvCache:
         print(self.nfv_cache)
 
     def sum_vnfs_cpu_node(self):
-        vnfs_cpu =  {0: 15,  # nat
-                     1: 25,  # fw
-                     2: 25,  # ids
-                     3: 20,  # wanopt
-                     4: 20,  # lb
-                     5: 25,  # encrypt
-                     6: 25,  # decrypts
-                     7: 30,  # dpi
-                     }
-
-        sum_vnfs_cpu = 0
-        for vnf in self.nfv_cache:
-            if self.has_vnf(vnf) and vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu[vnf]
-        return sum_vnfs_cpu
+        return sum(self.catalog.vnf_cpu(vnf) for vnf in self.nfv_cache)
+
+
+@register_cache_policy('NFV_CACHE_BITMASK')
+class BitmaskNfvCache(NfvCache):
+    """NFV cache with the same behaviour as NfvCache, which also keeps a
+    bitmask of the VNFs it stores and the sum of their CPU.
+
+    VNFs identified by non-negative integers are looked up in the bitmask, so
+    that membership queries and the sum of CPU take constant time. Other VNF
+    identifiers are looked up in the FIFO queue.
+    """
+
+    def __init__(self, max_size):
+        super(BitmaskNfvCache, self).__init__(max_size)
+        self.vnf_mask = 0
+        self.sum_cpu = 0
+
+    @staticmethod
+    def _vnf_bit(vnf):
+        return 1 << vnf if isinstance(vnf, int) and vnf >= 0 else 0
+
+    def _count(self, vnf, sign):
+        bit = self._vnf_bit(vnf)
+        if bit:
+            self.vnf_mask ^= bit
+        self.sum_cpu += sign * self.catalog.vnf_cpu(vnf)
+
+    def add_vnf(self, vnf):
+        evicted = None
+        if not self.has_vnf(vnf):
+            if len(self.nfv_cache) == self.nfv_cache.maxlen:
+                # The queue is full: appending evicts its oldest VNF
+                evicted = self.nfv_cache[0] if self.nfv_cache else vnf
+                self._count(evicted, -1)
+            self.nfv_cache.append(vnf)
+            self._count(vnf, 1)
+        return evicted
+
+    def get_vnf(self, vnf):
+        return self.has_vnf(vnf)
+
+    def has_vnf(self, vnf):
+        bit = self._vnf_bit(vnf)
+        if bit:
+            return self.vnf_mask & bit != 0
+        return vnf in self.nfv_cache
+
+    def remove_vnf(self, vnf):
+        self.nfv_cache.remove(vnf)
+        self._count(vnf, -1)
+
+    def sum_vnfs_cpu_node(self):
+        return self.sum_cpu
 
 
 """
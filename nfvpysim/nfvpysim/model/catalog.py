@@ -0,0 +1,375 @@
+"""Catalog of the VNF types that can be requested and placed.
+
+The CPU demand, processing delay and memory of each VNF type are stored in
+NumPy arrays indexed by VNF id, from 0 to the number of types minus one. VNFs
+with an id outside the catalog are accepted everywhere and have no CPU demand,
+processing delay or memory, as in the tables previously declared by each
+module.
+
+SFCs are interned by the catalog into SfcSpec objects, identified by an
+integer id. Workloads emit the id of the SFC of each request, from which
+policies and the controller get the SfcSpec.
+
+All components of a simulation read the catalog active in their process,
+returned by get_vnf_catalog. The runner activates the catalog named or
+described by the VNF_CATALOG setting before each experiment.
+"""
+import json
+import operator
+import random
+
+import numpy as np
+
+from nfvpysim.registry import VNF_CATALOG, register_vnf_catalog
+
+__all__ = [
+    'SfcSpec',
+    'VnfCatalog',
+    'default_vnf_catalog',
+    'load_vnf_catalog',
+    'get_vnf_catalog',
+    'set_vnf_catalog'
+]
+
+
+class SfcSpec(object):
+    """An SFC interned by a VNF catalog.
+
+    Specs are created by VnfCatalog.intern_sfc only, which returns the same
+    spec for equal sequences of VNFs. They behave as read-only sequences of
+    VNFs.
+
+    Attributes
+    ----------
+    id : int
+        The id of the SFC in the catalog
+    vnfs : tuple
+        The VNFs of the SFC, in order
+    mask : int
+        The bitmask of the VNFs of the SFC, with bit i set for VNF i
+    vnf_bits : tuple
+        A (vnf, bit) tuple for each VNF of the SFC, in order
+    cpu : int
+        The total CPU demand of the VNFs, counting repeated VNFs once per
+        occurrence
+    proc_delay : float
+        The total mean processing delay of the VNFs
+    memory : int
+        The total memory taken by the VNFs
+    delay : float
+        The default delay budget of requests for the SFC
+    """
+
+    __slots__ = ('id', 'vnfs', 'mask', 'vnf_bits', 'cpu', 'proc_delay', 'memory', 'delay')
+
+    def __init__(self, sfc_id, vnfs, cpu, proc_delay, memory, delay):
+        self.id = sfc_id
+        self.vnfs = vnfs
+        self.vnf_bits = tuple((vnf, 1 << vnf) for vnf in vnfs)
+        self.mask = 0
+        for _, bit in self.vnf_bits:
+            self.mask |= bit
+        self.cpu = cpu
+        self.proc_delay = proc_delay
+        self.memory = memory
+        self.delay = delay
+
+    def __iter__(self):
+        return iter(self.vnfs)
+
+    def __len__(self):
+        return len(self.vnfs)
+
+    def __getitem__(self, index):
+        return self.vnfs[index]
+
+    def __contains__(self, vnf):
+        return vnf in self.vnfs
+
+    def __repr__(self):
+        return 'SfcSpec(%d, %r)' % (self.id, list(self.vnfs))
+
+
+class VnfCatalog(object):
+    """Features of each VNF type and totals of each SFC.
+
+    SFCs are interned the first time they are requested: each distinct
+    sequence of VNFs gets an SfcSpec with an integer id, storing its totals.
+
+    Attributes
+    ----------
+    cpu : ndarray
+        The CPU demand of each VNF
+    proc_delay : ndarray
+        The mean processing delay of each VNF
+    proc_delay_spread : ndarray
+        The half-width of the uniform distribution of the processing delay of
+        each VNF around its mean. The delay is constant if it is 0
+    memory : ndarray
+        The memory taken by each VNF, in cache slots
+    names : list
+        The name of each VNF
+    """
+
+    def __init__(self, cpu, proc_delay=None, proc_delay_spread=None, memory=None, names=None):
+        """Constructor
+
+        Parameters
+        ----------
+        cpu : array-like
+            The CPU demand of each VNF, indexed by VNF id
+        proc_delay : array-like, optional
+            The mean processing delay of each VNF. If not specified, it is
+            equal to the CPU demand
+        proc_delay_spread : array-like, optional
+            The half-width of the uniform distribution of the processing delay
+            of each VNF. If not specified, processing delays are constant
+        memory : array-like, optional
+            The memory taken by each VNF. If not specified, each VNF takes
+            one cache slot
+        names : list, optional
+            The name of each VNF
+        """
+        self.cpu = np.array(cpu, dtype=np.int64)
+        n_vnfs = len(self.cpu)
+        if n_vnfs == 0:
+            raise ValueError('The catalog must include at least one VNF')
+        self.proc_delay = self._column(proc_delay, self.cpu, np.float64, 'proc_delay')
+        self.proc_delay_spread = self._column(proc_delay_spread, 0, np.float64, 'proc_delay_spread')
+        self.memory = self._column(memory, 1, np.int64, 'memory')
+        if (self.cpu < 0).any() or (self.memory < 0).any():
+            raise ValueError('CPU demands and memory must be non-negative')
+        if (self.proc_delay_spread < 0).any() or \
+                (self.proc_delay - self.proc_delay_spread < 0).any():
+            raise ValueError('Processing delays must be non-negative')
+        self.names = list(names) if names is not None else [str(vnf) for vnf in range(n_vnfs)]
+        if len(self.names) != n_vnfs:
+            raise ValueError('names must have an entry per VNF')
+        # Scalar lookups are served by dicts of Python numbers, which are
+        # faster than indexing arrays and accept VNFs outside the catalog
+        self._cpu = dict(enumerate(self.cpu.tolist()))
+        self._proc_delay = dict(enumerate(self.proc_delay.tolist()))
+        self._proc_delay_spread = dict(enumerate(self.proc_delay_spread.tolist()))
+        self._memory = dict(enumerate(self.memory.tolist()))
+        # Interned SFCs and their totals, indexed by SFC id
+        self._sfc_id = {}
+        self._specs = []
+        self._sfc_cpu = []
+        self._sfc_proc_delay = []
+        self._sfc_memory = []
+
+    def _column(self, values, default, dtype, name):
+        if values is None:
+            return np.full(len(self.cpu), default, dtype=dtype) if np.isscalar(default) \
+                else np.array(default, dtype=dtype)
+        column = np.array(values, dtype=dtype)
+        if column.shape != self.cpu.shape:
+            raise ValueError('%s must have an entry per VNF' % name)
+        return column
+
+    def __len__(self):
+        return len(self.cpu)
+
+    def __contains__(self, vnf):
+        return vnf in self._cpu
+
+    @property
+    def vnfs(self):
+        """The ids of the VNFs of the catalog"""
+        return range(len(self.cpu))
+
+    @property
+    def deterministic(self):
+        """Whether the processing delay of all VNFs is constant"""
+        return not self.proc_delay_spread.any()
+
+    def vnf_cpu(self, vnf):
+        """Return the CPU demand of a VNF, 0 if it is not in the catalog"""
+        return self._cpu.get(vnf, 0)
+
+    def vnf_memory(self, vnf):
+        """Return the memory taken by a VNF, 0 if it is not in the catalog"""
+        return self._memory.get(vnf, 0)
+
+    def vnf_proc_delay(self, vnf):
+        """Return the processing delay of a VNF, 0 if it is not in the
+        catalog. If the delay is not constant, it is drawn from its
+        distribution
+        """
+        spread = self._proc_delay_spread.get(vnf, 0)
+        if spread:
+            return random.uniform(self._proc_delay[vnf] - spread, self._proc_delay[vnf] + spread)
+        return self._proc_delay.get(vnf, 0)
+
+    def intern_sfc(self, sfc, delay=None):
+        """Return the spec of an SFC, creating it the first time
+
+        Parameters
+        ----------
+        sfc : iterable
+            The VNFs of the SFC, in order. They must be non-negative integers
+        delay : float, optional
+            The default delay budget of requests for the SFC, used only if
+            the spec is created. By default, it is the total CPU demand of
+            the VNFs
+
+        Returns
+        -------
+        spec : SfcSpec
+            The spec of the SFC
+        """
+        key = tuple(sfc)
+        sfc_id = self._sfc_id.get(key)
+        if sfc_id is None:
+            try:
+                vnfs = tuple(operator.index(vnf) for vnf in key)
+            except TypeError:
+                raise ValueError('VNFs must be non-negative integers, not %r' % (key,))
+            if any(vnf < 0 for vnf in vnfs):
+                raise ValueError('VNFs must be non-negative integers, not %r' % (key,))
+            # VNFs are summed one by one, as the tables they replace were
+            cpu = sum(self.vnf_cpu(vnf) for vnf in vnfs)
+            proc_delay = sum(self._proc_delay.get(vnf, 0) for vnf in vnfs)
+            memory = sum(self.vnf_memory(vnf) for vnf in vnfs)
+            sfc_id = self._sfc_id[key] = len(self._specs)
+            self._specs.append(SfcSpec(sfc_id, vnfs, cpu, proc_delay, memory,
+                                       cpu if delay is None else delay))
+            self._sfc_cpu.append(cpu)
+            self._sfc_proc_delay.append(proc_delay)
+            self._sfc_memory.append(memory)
+        return self._specs[sfc_id]
+
+    def sfc_spec(self, sfc):
+        """Return the spec of an SFC
+
+        Parameters
+        ----------
+        sfc : SfcSpec, int or iterable
+            The spec, the id of an interned SFC or the VNFs of an SFC, which
+            are interned if needed
+
+        Returns
+        -------
+        spec : SfcSpec
+            The spec of the SFC
+        """
+        if isinstance(sfc, SfcSpec):
+            return sfc
+        if isinstance(sfc, (int, np.integer)):
+            if not 0 <= sfc < len(self._specs):
+                raise ValueError('No SFC with id %d' % sfc)
+            return self._specs[sfc]
+        return self.intern_sfc(sfc)
+
+    @property
+    def n_sfcs(self):
+        """The number of SFCs interned"""
+        return len(self._specs)
+
+    def sfc_cpu(self, sfc):
+        """Return the total CPU demand of the VNFs of an SFC, counting
+        repeated VNFs once per occurrence
+        """
+        return self.sfc_spec(sfc).cpu
+
+    def sfc_proc_delay(self, sfc):
+        """Return the total mean processing delay of the VNFs of an SFC"""
+        return self.sfc_spec(sfc).proc_delay
+
+    def sfc_memory(self, sfc):
+        """Return the total memory taken by the VNFs of an SFC"""
+        return self.sfc_spec(sfc).memory
+
+    def sfc_totals(self, sfc_ids):
+        """Return the totals of a sequence of interned SFCs
+
+        Parameters
+        ----------
+        sfc_ids : array-like
+            The ids of the SFCs
+
+        Returns
+        -------
+        totals : dict
+            Arrays with the 'cpu', 'proc_delay' and 'memory' of each SFC
+        """
+        sfc_ids = np.asarray(sfc_ids, dtype=np.int64)
+        return {'cpu': np.array(self._sfc_cpu, dtype=np.int64)[sfc_ids],
+                'proc_delay': np.array(self._sfc_proc_delay, dtype=np.float64)[sfc_ids],
+                'memory': np.array(self._sfc_memory, dtype=np.int64)[sfc_ids]}
+
+    def to_dict(self):
+        """Return the features of the VNFs as a dict accepted by
+        load_vnf_catalog
+        """
+        return {'cpu': self.cpu.tolist(),
+                'proc_delay': self.proc_delay.tolist(),
+                'proc_delay_spread': self.proc_delay_spread.tolist(),
+                'memory': self.memory.tolist(),
+                'names': list(self.names)}
+
+
+@register_vnf_catalog('DEFAULT')
+def default_vnf_catalog():
+    """Return the catalog of the 8 VNF types used by all scenarios, whose
+    processing delay is equal to their CPU demand
+    """
+    return VnfCatalog(cpu=[15, 25, 25, 20, 20, 25, 25, 30],
+                      names=['nat', 'fw', 'ids', 'wanopt', 'lb', 'encrypt', 'decrypt', 'dpi'])
+
+
+def load_vnf_catalog(spec):
+    """Build a VNF catalog from a configuration value
+
+    Parameters
+    ----------
+    spec : str, dict or VnfCatalog
+        The name of a registered catalog, the path of a JSON file storing a
+        dict, or a dict whose keys are the arguments of VnfCatalog. A catalog
+        is returned unchanged
+
+    Returns
+    -------
+    catalog : VnfCatalog
+        The catalog
+    """
+    if isinstance(spec, VnfCatalog):
+        return spec
+    if isinstance(spec, str):
+        if spec in VNF_CATALOG:
+            return VNF_CATALOG[spec]()
+        try:
+            with open(spec) as f:
+                spec = json.load(f)
+        except (IOError, OSError):
+            raise ValueError('%s is neither a registered VNF catalog nor a readable file' % spec)
+    if not isinstance(spec, dict) or 'cpu' not in spec:
+        raise ValueError('A VNF catalog must specify the CPU demand of each VNF')
+    return VnfCatalog(**spec)
+
+
+# Catalog read by the components of the simulations of this process
+_catalog = None
+
+
+def get_vnf_catalog():
+    """Return the VNF catalog active in this process, the default one if none
+    was set
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = default_vnf_catalog()
+    return _catalog
+
+
+def set_vnf_catalog(catalog):
+    """Set the VNF catalog read by the simulations of this process
+
+    Parameters
+    ----------
+    catalog : str, dict or VnfCatalog
+        The catalog, or a value accepted by load_vnf_catalog. If None, the
+        default catalog is used
+    """
+    global _catalog
+    _catalog = load_vnf_catalog(catalog) if catalog is not None else None
@@ -1,13 +1,16 @@
 from abc import abstractmethod, ABC
-from collections import defaultdict
 
-import networkx as nx
 from nfvpysim.registry import register_policy
 
 # from nfvpysim.util import path_links
 
+# Placeholder never equal to a node, used when no node is skipped
+_NO_NODE = object()
+
 __all__ = [
     'Policy',
+    'StaticPlacementPolicy',
+    'OnDemandPlacementPolicy',
     'Bcsp',
     'TapAlgo',
     'FirstOrder',
@@ -24,41 +27,213 @@ __all__ = [
 
 
 class Policy:
+    """Base class of VNF allocation policies.
+
+    Policies walk the path of each request with traverse, which processes the
+    VNFs of the SFC found on NFV nodes and reports the SFC as served at the
+    first hop where all of them have been processed and the delay is within
+    budget. The class attributes and hook methods below adapt the walk to
+    each policy.
+
+    The SFC of an event is the id of an SFC interned by the VNF catalog or,
+    for compatibility, a sequence of VNFs. Policies get its SfcSpec from the
+    catalog.
+    """
+    # Whether the engine should pass events to process_batch in blocks
+    # rather than one by one to process_event
+    supports_batch = False
+
+    # Whether the outcome of a session only depends on the request and on the
+    # content of NFV caches, so that it can be memoized by the controller
+    memoize_sessions = False
+
+    # Whether the delay budget is compared with the sum of the delays of the
+    # links traversed or only with the delay of the last one
+    cumulative_delay = False
+
+    # Whether the CPU required by the SFC is added to the delay at every hop
+    add_sfc_cpu_to_delay = False
+
+    # Whether VNFs are not processed at the egress node
+    skip_egress_node = False
+
+    # Whether VNFs of the SFC not found on NFV nodes are passed to
+    # place_missed_vnfs
+    track_missed_vnfs = False
+
     def __init__(self, view, controller, **kwargs):
         self.view = view
         self.controller = controller
+        self.context = view.context()
+        self.catalog = view.vnf_catalog()
+
+    def traverse(self, sfc_id, egress_node, sfc, delay, info):
+        """Walk the path of a request, processing the VNFs of its SFC
+
+        Parameters
+        ----------
+        sfc_id : int
+            The id of the SFC
+        egress_node : any hashable type
+            The egress node of the request
+        sfc : SfcSpec
+            The SFC
+        delay : float
+            The delay budget of the request
+        info : PathInfo
+            The path
+
+        Returns
+        -------
+        hit : bool
+            Whether the SFC was served
+        """
+        controller = self.controller
+        pending, vnf_bits, sfc_cpu = sfc.mask, sfc.vnf_bits, sfc.cpu
+        links = info.links
+        delays = info.cum_delays if self.cumulative_delay else info.link_delays
+        nfv_hops = info.nfv_hops
+        extra_delay = sfc_cpu if self.add_sfc_cpu_to_delay else 0
+        skip_node = egress_node if self.skip_egress_node else _NO_NODE
+        missed = [] if self.track_missed_vnfs else None
+        for hop in range(len(links)):
+            u, v = links[hop]
+            controller.forward_request_vnf_hop(u, v)
+            if nfv_hops[hop] and v != skip_node and self.process_at_nfv_node(u, v, sfc, sfc_cpu):
+                for vnf_bit in vnf_bits:
+                    vnf, bit = vnf_bit
+                    if controller.get_vnf(v, vnf):
+                        if pending & bit:
+                            pending ^= bit
+                            controller.vnf_proc(vnf)
+                            controller.proc_vnf_payload(u, v)
+                    elif missed is not None:
+                        missed.append(vnf_bit)
+            if missed:
+                pending = self.place_missed_vnfs(u, v, missed, pending, info)
+            sfc_delay = delays[hop] + extra_delay if extra_delay else delays[hop]
+            if not pending and sfc_delay <= delay:
+                controller.sfc_hit(sfc_id)
+                return True
+        return False
+
+    def process_at_nfv_node(self, u, v, sfc, sfc_cpu):
+        """Hook called when a request reaches an NFV node, before processing
+        the VNFs of the SFC stored by the node
+
+        Returns
+        -------
+        process : bool
+            Whether the VNFs stored by the node are processed
+        """
+        return True
+
+    def place_missed_vnfs(self, u, v, missed, pending, info):
+        """Hook called at each hop after VNFs of the SFC have been missed
+
+        Parameters
+        ----------
+        u, v : any hashable type
+            The link traversed
+        missed : list
+            The (vnf, bit) tuples of the VNFs missed so far, with repetitions,
+            where bit is the bit of the VNF in the mask of the SFC
+        pending : int
+            The mask of the VNFs of the SFC not processed yet
+        info : PathInfo
+            The path
+
+        Returns
+        -------
+        pending : int
+            The mask of the VNFs not processed after the hop
+        """
+        return pending
 
     @abstractmethod
     def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
         raise NotImplementedError('The selected policy must implement a process event method')
 
+    def process_batch(self, events):
+        """Process a block of events
+
+        Parameters
+        ----------
+        events : list
+            List of (time, event) tuples, where events are SfcRequest, in the
+            order of the workload
+        """
+        for time, event in events:
+            if not self.controller.replay_session(time, event):
+                self.process_event(time, event.sfc_id, event.ingress_node, event.egress_node,
+                                   event.sfc, event.delay, event.log)
+
+
+class StaticPlacementPolicy(Policy):
+    """Base class of policies that never change the content of NFV caches.
+
+    Requests walk the shortest path from their ingress node and are served at
+    the first hop where all the VNFs of their SFC have been processed and the
+    delay is within budget. Since sessions do not affect each other, blocks of
+    events are simulated at once by the controller.
+    """
+    supports_batch = True
+    memoize_sessions = True
+
+    def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
+        sfc = self.catalog.sfc_spec(sfc)
+        info = self.view.path_info(ingress_node, egress_node)
+        self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
+        self.traverse(sfc_id, egress_node, sfc, delay, info)
+        self.controller.end_session()
+
+    def process_batch(self, events):
+        if not self.controller.process_static_batch(events, self.cumulative_delay):
+            super(StaticPlacementPolicy, self).process_batch(events)
+
+
+class OnDemandPlacementPolicy(Policy):
+    """Base class of policies placing the VNFs missed by a request on the
+    NFV node of its path selected by the network model.
+
+    VNFs are not processed at the egress node. Every time a VNF of the SFC is
+    not found on an NFV node it is recorded as missed, and all the VNFs missed
+    are placed and processed once the request reaches the selected node.
+    """
+    skip_egress_node = True
+    track_missed_vnfs = True
+
+    # Whether the processing delay of missed VNFs is accounted when they are
+    # processed on the node where they are placed
+    proc_missed_vnfs = True
+
+    def place_missed_vnfs(self, u, v, missed, pending, info):
+        if v == info.closest_nfv_node:
+            controller = self.controller
+            for vnf, bit in missed:
+                pending &= ~bit
+                controller.put_vnf(v, vnf)
+                if self.proc_missed_vnfs:
+                    controller.vnf_proc(vnf)
+                controller.proc_vnf_payload(u, v)
+        return pending
+
+    def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
+        sfc = self.catalog.sfc_spec(sfc)
+        info = self.view.path_info(ingress_node, egress_node)
+        self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
+        self.traverse(sfc_id, egress_node, sfc, delay, info)
+        self.controller.end_session()
+
 
 @register_policy('BCSP')
 class Bcsp(Policy):
     def __init__(self, view, controller, **kwargs):
         super(Bcsp, self).__init__(view, controller)
         topology = view.topology()
-        self.betw = nx.betweenness_centrality(topology)
+        self.betw = self.context.centrality.centrality('betweenness')
         self.nfv_nodes = [v for v in topology if topology.node[v]["stack"][0] == "nfv_node"]
 
-    @staticmethod
-    def sum_vnfs_cpu(vnfs):
-        vnfs_cpu = {0: 15,  # nat
-                    1: 25,  # fw
-                    2: 25,  # ids
-                    3: 20,  # wanopt
-                    4: 20,  # lb
-                    5: 25,  # encrypt
-                    6: 25,  # decrypts
-                    7: 30,  # dpi
-                    }
-
-        sum_vnfs_cpu = 0
-        for vnf in vnfs:
-            if vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu[vnf]
-        return sum_vnfs_cpu
-
     def find_highest_betw_node(self, path):
         max_betw = -1
         highest_betw_node = None
@@ -77,136 +252,59 @@ class Bcsp(Policy):
         return None
 
     def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
-        delay_sfc = defaultdict(int)  # dict to store the delay taken to run the sfc over the path
-        path = self.view.shortest_path(ingress_node, egress_node)
-        self.place_sfc_on_highest_betw_node(path, sfc)
+        sfc = self.catalog.sfc_spec(sfc)
+        info = self.view.path_info(ingress_node, egress_node)
+        self.place_sfc_on_highest_betw_node(info.path, sfc)
         self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
-        vnf_status = {vnf: 0 for vnf in sfc}  # 0 - not processed / 1 - processed
-        sum_cpu_sfc = Bcsp.sum_vnfs_cpu(sfc)  # total time processing of the sfc
-        # for u, v in path_links(path):
-        for hop in range(1, len(path)):
-            delay_sfc[sfc_id] = 0
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_vnf_hop(u, v)
-            delay_sfc[sfc_id] += self.view.link_delay(u, v)
-            if self.view.is_nfv_node(v):
-                for vnf in sfc:
-                    if self.controller.get_vnf(v, vnf):
-                        if vnf_status[vnf] == 0:
-                            vnf_status[vnf] = 1
-                            self.controller.vnf_proc(vnf)
-                            self.controller.proc_vnf_payload(u, v)
-            # delay_sfc[sfc_id] += sum_cpu_sfc
-            if all(value == 1 for value in vnf_status.values()) and delay_sfc[sfc_id] <= delay:
-                self.controller.sfc_hit(sfc_id)
-                break
-
+        self.traverse(sfc_id, egress_node, sfc, delay, info)
         self.controller.end_session()
 
 
 @register_policy('TAP_ALGO')
 class TapAlgo(Policy):
+    # The path and the node selected only depend on the load of NFV nodes
+    memoize_sessions = True
+
     def __init__(self, view, controller, **kwargs):
         super(TapAlgo, self).__init__(view, controller)
 
-    @staticmethod
-    def sum_vnfs_cpu(vnfs):
-        vnfs_cpu = {0: 15,  # nat
-                    1: 25,  # fw
-                    2: 25,  # ids
-                    3: 20,  # wanopt
-                    4: 20,  # lb
-                    5: 25,  # encrypt
-                    6: 25,  # decrypts
-                    7: 30,  # dpi
-                    }
-
-        sum_vnfs_cpu = 0
-        for vnf in vnfs:
-            if vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu[vnf]
-        return sum_vnfs_cpu
-
     def find_path(self, ingress_node, egress_node, sfc, delay):
-        topology = self.view.topology()
-        paths = self.controller.get_all_paths(topology, ingress_node, egress_node)  # list of (list) paths
-        target_path = self.controller.sort_paths_min_cpu_use(paths)
-        print('target_path', target_path)
-        sum_cpu_sfc = TapAlgo.sum_vnfs_cpu(sfc)
+        # Shortest path whose NFV nodes have the most remaining CPU
+        target_path, rem_cpu, delay_path = self.controller.max_rem_cpu_path(ingress_node,
+                                                                            egress_node)
+        sum_cpu_sfc = self.catalog.sfc_cpu(sfc)
         dict_node_cpu = {}
-        if self.controller.nodes_rem_cpu(target_path) >= sum_cpu_sfc and self.view.delay_path(target_path) < delay:
+        if rem_cpu >= sum_cpu_sfc and delay_path < delay:
             nfv_nodes = self.controller.nfv_nodes_path(target_path)
-            print('nfv_nodes', nfv_nodes)
             for node in nfv_nodes:
                 dict_node_cpu[node] = self.controller.sum_vnfs_cpu_on_node(node)
-                print('dict_nodes', dict_node_cpu[node])
             node_max_cpu = min(dict_node_cpu, key=dict_node_cpu.get)
             node_max_cpu_avail = dict_node_cpu[node_max_cpu]
-            print('node_max_cpu', node_max_cpu_avail)
             for node in target_path:
                 if node == node_max_cpu:
                     if sum_cpu_sfc <= node_max_cpu_avail:
                         self.controller.put_sfc(node, sfc)
                         break
 
-
-
         return target_path
 
     def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
-        delay_sfc = defaultdict(int)  # dict to store the delay taken to run the sfc over the path
-        vnf_status = {vnf: 0 for vnf in sfc}  # 0 - not processed / 1 - processed
-        sum_cpu_sfc = TapAlgo.sum_vnfs_cpu(sfc)
+        sfc = self.catalog.sfc_spec(sfc)
         self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
         path = self.find_path(ingress_node, egress_node, sfc, delay)
-        # delay_sfc[sfc_id] = 0
-        for hop in range(1, len(path)):
-            delay_sfc[sfc_id] = 0
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_vnf_hop(u, v)
-            delay_sfc[sfc_id] += self.view.link_delay(u, v)
-            if self.view.is_nfv_node(v) and v != egress_node:
-                for vnf in sfc:
-                    if self.controller.get_vnf(v, vnf):
-                        if vnf_status[vnf] == 0:
-                            vnf_status[vnf] = 1
-                            self.controller.vnf_proc(vnf)
-                            self.controller.proc_vnf_payload(u, v)
-            # delay_sfc[sfc_id] += sum_cpu_sfc
-            if all(value == 1 for value in vnf_status.values()) and delay_sfc[sfc_id] <= delay:
-                self.controller.sfc_hit(sfc_id)
-                break
-
+        self.traverse(sfc_id, egress_node, sfc, delay, self.view.route_info(path))
         self.controller.end_session()
 
 
 @register_policy('FIRST_FIT')
 class FirstFit(Policy, ABC):
+    cumulative_delay = True
+
     def __init__(self, view, controller, **kwargs):
         super(FirstFit, self).__init__(view, controller)
 
-    @staticmethod
-    def sum_vnfs_cpu(vnfs):
-        vnfs_cpu = {0: 15,  # nat
-                    1: 25,  # fw
-                    2: 25,  # ids
-                    3: 20,  # wanopt
-                    4: 20,  # lb
-                    5: 25,  # encrypt
-                    6: 25,  # decrypts
-                    7: 30,  # dpi
-                    }
-
-        sum_vnfs_cpu = 0
-        for vnf in vnfs:
-            if vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu.get(vnf)
-        return sum_vnfs_cpu
-
     def first_fit_search(self, path, sfc):
-        sum_vnfs_sfc = FirstFit.sum_vnfs_cpu(sfc)
+        sum_vnfs_sfc = self.catalog.sfc_cpu(sfc)
         print(sum_vnfs_sfc)
         for node in path:
             if self.controller.sum_vnfs_cpu_on_node(node) <= sum_vnfs_sfc:
@@ -214,585 +312,91 @@ class FirstFit(Policy, ABC):
                 break
         return
 
+    def process_at_nfv_node(self, u, v, sfc, sfc_cpu):
+        # Place the SFC on the node if it has enough CPU and process it there
+        if self.controller.sum_vnfs_cpu_on_node(v) <= sfc_cpu:
+            self.controller.put_sfc(v, sfc)
+            return True
+        return False
+
     def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
-        delay_sfc = defaultdict(int)  # dict to store the delay taken to run the sfc over the path
-        vnf_status = {vnf: 0 for vnf in sfc}  # 0 - not processed / 1 - processed
-        sum_cpu_sfc = FirstFit.sum_vnfs_cpu(sfc)
+        sfc = self.catalog.sfc_spec(sfc)
         self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
-        path = self.view.shortest_path(ingress_node, egress_node)
-        delay_sfc[sfc_id] = 0
-        for hop in range(1, len(path)):
-            # delay_sfc[sfc_id] = 0
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_vnf_hop(u, v)
-            delay_sfc[sfc_id] += self.view.link_delay(u, v)
-            if self.view.is_nfv_node(v):
-                if self.controller.sum_vnfs_cpu_on_node(v) <= sum_cpu_sfc:
-                    self.controller.put_sfc(v, sfc)
-                    for vnf in sfc:
-                        if self.controller.get_vnf(v, vnf):
-                            if vnf_status[vnf] == 0:
-                                vnf_status[vnf] = 1
-                                self.controller.vnf_proc(vnf)
-                                self.controller.proc_vnf_payload(u, v)
-            # delay_sfc[sfc_id] += sum_cpu_sfc
-            if all(value == 1 for value in vnf_status.values()) and delay_sfc[sfc_id] <= delay:
-                self.controller.sfc_hit(sfc_id)
-                break
-
+        info = self.view.path_info(ingress_node, egress_node)
+        self.traverse(sfc_id, egress_node, sfc, delay, info)
         self.controller.end_session()
 
 
 @register_policy('MARKOV')
-class Markov(Policy):
+class Markov(StaticPlacementPolicy):
     def __init__(self, view, controller, **kwargs):
         super(Markov, self).__init__(view, controller)
 
-    @staticmethod
-    def sum_vnfs_cpu(vnfs):
-        vnfs_cpu = {0: 15,  # nat
-                    1: 25,  # fw
-                    2: 25,  # ids
-                    3: 20,  # wanopt
-                    4: 20,  # lb
-                    5: 25,  # encrypt
-                    6: 25,  # decrypts
-                    7: 30,  # dpi
-                    }
-
-        sum_vnfs_cpu = 0
-        for vnf in vnfs:
-            if vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu[vnf]
-        return sum_vnfs_cpu
-
-    def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
-        delay_sfc = defaultdict(int)  # dict to store the delay taken to run the sfc over the path
-        path = self.view.shortest_path(ingress_node, egress_node)
-        self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
-        vnf_status = {vnf: 0 for vnf in sfc}  # 0 - not processed / 1 - processed
-        sum_cpu_sfc = FirstOrder.sum_vnfs_cpu(sfc)  # total time processing of the sfc
-        # for u, v in path_links(path):
-        for hop in range(1, len(path)):
-            delay_sfc[sfc_id] = 0
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_vnf_hop(u, v)
-            delay_sfc[sfc_id] += self.view.link_delay(u, v)
-            if self.view.is_nfv_node(v):
-                for vnf in sfc:
-                    if self.controller.get_vnf(v, vnf):
-                        if vnf_status[vnf] == 0:
-                            vnf_status[vnf] = 1
-                            self.controller.vnf_proc(vnf)
-                            self.controller.proc_vnf_payload(u, v)
-            # delay_sfc[sfc_id] += sum_cpu_sfc
-            if all(value == 1 for value in vnf_status.values()) and delay_sfc[sfc_id] <= delay:
-                self.controller.sfc_hit(sfc_id)
-                break
-
-        self.controller.end_session()
-
 
 @register_policy('FIRST_ORDER')
-class FirstOrder(Policy):
+class FirstOrder(StaticPlacementPolicy):
+    cumulative_delay = True
+
     def __init__(self, view, controller, **kwargs):
         super(FirstOrder, self).__init__(view, controller)
 
-    @staticmethod
-    def sum_vnfs_cpu(vnfs):
-        vnfs_cpu = {0: 15,  # nat
-                    1: 25,  # fw
-                    2: 25,  # ids
-                    3: 20,  # wanopt
-                    4: 20,  # lb
-                    5: 25,  # encrypt
-                    6: 25,  # decrypts
-                    7: 30,  # dpi
-                    }
-
-        sum_vnfs_cpu = 0
-        for vnf in vnfs:
-            if vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu[vnf]
-        return sum_vnfs_cpu
-
-    def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
-        delay_sfc = defaultdict(int)  # dict to store the delay taken to run the sfc over the path
-        path = self.view.shortest_path(ingress_node, egress_node)
-        self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
-        vnf_status = {vnf: 0 for vnf in sfc}  # 0 - not processed / 1 - processed
-        sum_cpu_sfc = FirstOrder.sum_vnfs_cpu(sfc)  # total time processing of the sfc
-        # for u, v in path_links(path):
-        delay_sfc[sfc_id] = 0
-        for hop in range(1, len(path)):
-            # delay_sfc[sfc_id] = 0
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_vnf_hop(u, v)
-            delay_sfc[sfc_id] += self.view.link_delay(u, v)
-            if self.view.is_nfv_node(v):
-                for vnf in sfc:
-                    if self.controller.get_vnf(v, vnf):
-                        if vnf_status[vnf] == 0:
-                            vnf_status[vnf] = 1
-                            self.controller.vnf_proc(vnf)
-                            self.controller.proc_vnf_payload(u, v)
-            # delay_sfc[sfc_id] += sum_cpu_sfc
-            if all(value == 1 for value in vnf_status.values()) and delay_sfc[sfc_id] <= delay:
-                self.controller.sfc_hit(sfc_id)
-                break
-
-        self.controller.end_session()
-
 
 @register_policy('BASELINE')
-class Baseline(Policy):
+class Baseline(StaticPlacementPolicy):
 
     def __init__(self, view, controller, **kwargs):
         super(Baseline, self).__init__(view, controller)
 
-    @staticmethod
-    def sum_vnfs_cpu(vnfs):
-        vnfs_cpu = {0: 15,  # nat
-                    1: 25,  # fw
-                    2: 25,  # ids
-                    3: 20,  # wanopt
-                    4: 20,  # lb
-                    5: 25,  # encrypt
-                    6: 25,  # decrypts
-                    7: 30  # dpi
-                    }
-
-        sum_vnfs_cpu = 0
-        for vnf in vnfs:
-            if vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu[vnf]
-        return sum_vnfs_cpu
-
-    def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
-        delay_sfc = defaultdict(int)  # dict to store the delay taken to run the sfc over the path
-        path = self.view.shortest_path(ingress_node, egress_node)
-        self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
-        vnf_status = {vnf: 0 for vnf in sfc}  # 0 - not processed / 1 - processed
-        sum_cpu_sfc = FirstOrder.sum_vnfs_cpu(sfc)  # total time processing of the sfc
-        # for u, v in path_links(path):
-        delay_sfc[sfc_id] = sum_cpu_sfc
-        for hop in range(1, len(path)):
-            delay_sfc[sfc_id] = 0
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_vnf_hop(u, v)
-            delay_sfc[sfc_id] += self.view.link_delay(u, v)
-            if self.view.is_nfv_node(v):
-                for vnf in sfc:
-                    if self.controller.get_vnf(v, vnf):
-                        if vnf_status[vnf] == 0:
-                            vnf_status[vnf] = 1
-                            self.controller.vnf_proc(vnf)
-                            self.controller.proc_vnf_payload(u, v)
-            # delay_sfc[sfc_id] += sum_cpu_sfc
-            if all(value == 1 for value in vnf_status.values()) and delay_sfc[sfc_id] <= delay:
-                self.controller.sfc_hit(sfc_id)
-                break
-
-        self.controller.end_session()
-
 
 @register_policy('HOD_VNF')
-class Hod(Policy):
+class Hod(OnDemandPlacementPolicy):
+    cumulative_delay = True
 
     def __init__(self, view, controller):
         super(Hod, self).__init__(view, controller)
 
-    @staticmethod
-    def sum_vnfs_cpu(vnfs):
-        vnfs_cpu = {0: 15,  # nat
-                    1: 25,  # fw
-                    2: 25,  # ids
-                    3: 20,  # wanopt
-                    4: 20,  # lb
-                    5: 25,  # encrypt
-                    6: 25,  # decrypts
-                    7: 30,  # dpi
-                    }
-
-        sum_vnfs_cpu = 0
-        for vnf in vnfs:
-            if vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu[vnf]
-        return sum_vnfs_cpu
-
-    def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
-        delay_sfc = defaultdict(int)  # dict to store the delay taken to run the sfc over the path
-        missed_vnfs = []
-        path = self.view.shortest_path(ingress_node, egress_node)
-        self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
-        vnf_status = {vnf: 0 for vnf in sfc}  # 0 - not processed / 1 - processed
-        sum_cpu_sfc = Hod.sum_vnfs_cpu(sfc)  # total time processing of the sfc
-        # for u, v in path_links(path):
-        delay_sfc[sfc_id] = 0
-        for hop in range(1, len(path)):
-            # delay_sfc[sfc_id] = 0
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_vnf_hop(u, v)
-            delay_sfc[sfc_id] += self.view.link_delay(u, v)
-            if self.view.is_nfv_node(v) and v != egress_node:
-                for vnf in sfc:
-                    if self.controller.get_vnf(v, vnf):
-                        if vnf_status[vnf] == 0:
-                            vnf_status[vnf] = 1
-                            self.controller.vnf_proc(vnf)
-                            self.controller.proc_vnf_payload(u, v)
-                        elif vnf_status[vnf] == 1:
-                            continue
-                    else:
-                        missed_vnfs.append(vnf)
-
-            if len(missed_vnfs) != 0:
-                closest_nfv_node = self.controller.get_closest_nfv_node(path)
-                if v == closest_nfv_node:  # and v == nfv_node_min_cpu_all:
-                    for missed_vnf in missed_vnfs:
-                        vnf_status[missed_vnf] = 1
-                        self.controller.put_vnf(v, missed_vnf)
-                        self.controller.vnf_proc(missed_vnf)
-                        self.controller.proc_vnf_payload(u, v)
-            # delay_sfc[sfc_id] += sum_cpu_sfc
-            if all(value == 1 for value in vnf_status.values()) and delay_sfc[sfc_id] <= delay:
-                self.controller.sfc_hit(sfc_id)
-                break
-
-        self.controller.end_session()
-
 
 @register_policy('HOD_VNF_OFF')
-class HodOff(Policy):
+class HodOff(StaticPlacementPolicy):
+    cumulative_delay = True
 
     def __init__(self, view, controller):
         super(HodOff, self).__init__(view, controller)
 
-    @staticmethod
-    def sum_vnfs_cpu(vnfs):
-        vnfs_cpu = {0: 15,  # nat
-                    1: 25,  # fw
-                    2: 25,  # ids
-                    3: 20,  # wanopt
-                    4: 20,  # lb
-                    5: 25,  # encrypt
-                    6: 25,  # decrypts
-                    7: 30  # dpi
-                    }
-
-        sum_vnfs_cpu = 0
-        for vnf in vnfs:
-            if vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu[vnf]
-        return sum_vnfs_cpu
-
-    def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
-        delay_sfc = {}  # dict to store the delay taken to run the sfc over the path
-        path = self.view.shortest_path(ingress_node, egress_node)
-        self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
-        vnf_status = {vnf: 0 for vnf in sfc}  # 0 - not processed / 1 - processed
-        sum_cpu_sfc = Hod.sum_vnfs_cpu(sfc)  # total time processing of the sfc
-        # for u, v in path_links(path):
-        delay_sfc[sfc_id] = 0
-        for hop in range(1, len(path)):
-            # delay_sfc[sfc_id] = 0
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_vnf_hop(u, v)
-            delay_sfc[sfc_id] += self.view.link_delay(u, v)
-            if self.view.is_nfv_node(v):
-                for vnf in sfc:
-                    if self.controller.get_vnf(v, vnf):
-                        if vnf_status[vnf] == 0:
-                            vnf_status[vnf] = 1
-                            self.controller.vnf_proc(vnf)
-                            self.controller.proc_vnf_payload(u, v)
-            # delay_sfc[sfc_id] += sum_cpu_sfc
-            if all(value == 1 for value in vnf_status.values()) and delay_sfc[sfc_id] <= delay:
-                self.controller.sfc_hit(sfc_id)
-                break
-
-        self.controller.end_session()
-
 
 ########################################## CENTRALITY-BASED APPROACHES (USED IN DISSERTATION)##########################
 
 @register_policy('HOD_DEG')
-class HodDeg(Policy):
+class HodDeg(OnDemandPlacementPolicy):
+    add_sfc_cpu_to_delay = True
+    proc_missed_vnfs = False
 
     def __init__(self, view, controller, **kwargs):
         super(HodDeg, self).__init__(view, controller)
 
-    @staticmethod
-    def sum_vnfs_cpu(vnfs):
-        vnfs_cpu = {0: 15,  # nat
-                    1: 25,  # fw
-                    2: 25,  # ids
-                    3: 20,  # wanopt
-                    4: 20,  # lb
-                    5: 25,  # encrypt
-                    6: 25,  # decrypts
-                    7: 30,  # dpi
-                    }
-
-        sum_vnfs_cpu = 0
-        for vnf in vnfs:
-            if vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu[vnf]
-        return sum_vnfs_cpu
-
-    def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
-        delay_sfc = defaultdict(int)  # dict to store the delay taken to run the sfc over the path
-        missed_vnfs = []
-        path = self.view.shortest_path(ingress_node, egress_node)
-        self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
-        vnf_status = {vnf: 0 for vnf in sfc}  # 0 - not processed / 1 - processed
-        sum_cpu_sfc = HodDeg.sum_vnfs_cpu(sfc)  # total time processing of the sfc
-        # for u, v in path_links(path):
-        for hop in range(1, len(path)):
-            delay_sfc[sfc_id] = 0
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_vnf_hop(u, v)
-            delay_sfc[sfc_id] += self.view.link_delay(u, v)
-            if self.view.is_nfv_node(v) and v != egress_node:
-                for vnf in sfc:
-                    if self.controller.get_vnf(v, vnf):
-                        if vnf_status[vnf] == 0:
-                            vnf_status[vnf] = 1
-                            self.controller.vnf_proc(vnf)
-                            self.controller.proc_vnf_payload(u, v)
-                        elif vnf_status[vnf] == 1:
-                            continue
-                    else:
-                        missed_vnfs.append(vnf)
-
-            if len(missed_vnfs) != 0:
-                # sum_cpu_missed_vnfs = Hod.sum_vnfs_cpu(missed_vnfs)
-                # nfv_node_min_cpu_all = self.controller.find_nfv_node_with_min_cpu_alloc(ingress_node, egress_node)
-                closest_nfv_node = self.controller.get_closest_nfv_node(path)
-                # sum_cpu_vnfs_on_node = self.controller.sum_vnfs_cpu_on_node(closest_nfv_node)
-                if v == closest_nfv_node:  # and v == nfv_node_min_cpu_all:
-                    for missed_vnf in missed_vnfs:
-                        vnf_status[missed_vnf] = 1
-                        self.controller.put_vnf(v, missed_vnf)
-                        # self.controller.vnf_proc(missed_vnf)
-                        self.controller.proc_vnf_payload(u, v)
-            delay_sfc[sfc_id] += sum_cpu_sfc
-            if all(value == 1 for value in vnf_status.values()) and delay_sfc[sfc_id] <= delay:
-                self.controller.sfc_hit(sfc_id)
-                break
-
-        self.controller.end_session()
-
 
 @register_policy('HOD_CLOSE')
-class HodClose(Policy):
+class HodClose(OnDemandPlacementPolicy):
+    add_sfc_cpu_to_delay = True
+    proc_missed_vnfs = False
 
     def __init__(self, view, controller):
         super(HodClose, self).__init__(view, controller)
 
-    @staticmethod
-    def sum_vnfs_cpu(vnfs):
-        vnfs_cpu = {0: 15,  # nat
-                    1: 25,  # fw
-                    2: 25,  # ids
-                    3: 20,  # wanopt
-                    4: 20,  # lb
-                    5: 25,  # encrypt
-                    6: 25,  # decrypts
-                    7: 30,  # dpi
-                    }
-
-        sum_vnfs_cpu = 0
-        for vnf in vnfs:
-            if vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu[vnf]
-        return sum_vnfs_cpu
-
-    def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
-        delay_sfc = defaultdict(int)  # dict to store the delay taken to run the sfc over the path
-        missed_vnfs = []
-        path = self.view.shortest_path(ingress_node, egress_node)
-        self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
-        vnf_status = {vnf: 0 for vnf in sfc}  # 0 - not processed / 1 - processed
-        sum_cpu_sfc = HodClose.sum_vnfs_cpu(sfc)  # total time processing of the sfc
-        # for u, v in path_links(path):
-        for hop in range(1, len(path)):
-            delay_sfc[sfc_id] = 0
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_vnf_hop(u, v)
-            delay_sfc[sfc_id] += self.view.link_delay(u, v)
-            if self.view.is_nfv_node(v) and v != egress_node:
-                for vnf in sfc:
-                    if self.controller.get_vnf(v, vnf):
-                        if vnf_status[vnf] == 0:
-                            vnf_status[vnf] = 1
-                            self.controller.vnf_proc(vnf)
-                            self.controller.proc_vnf_payload(u, v)
-                        elif vnf_status[vnf] == 1:
-                            continue
-                    else:
-                        missed_vnfs.append(vnf)
-
-            if len(missed_vnfs) != 0:
-                sum_cpu_missed_vnfs = Hod.sum_vnfs_cpu(missed_vnfs)
-                nfv_node_min_cpu_all = self.controller.find_nfv_node_with_min_cpu_alloc(ingress_node, egress_node)
-                closest_nfv_node = self.controller.get_closest_nfv_node(path)
-                # sum_cpu_vnfs_on_node = self.controller.sum_vnfs_cpu_on_node(closest_nfv_node)
-                if v == closest_nfv_node:  # and v == nfv_node_min_cpu_all:
-                    for missed_vnf in missed_vnfs:
-                        vnf_status[missed_vnf] = 1
-                        self.controller.put_vnf(v, missed_vnf)
-                        # self.controller.vnf_proc(missed_vnf)
-                        self.controller.proc_vnf_payload(u, v)
-            delay_sfc[sfc_id] += sum_cpu_sfc
-            if all(value == 1 for value in vnf_status.values()) and delay_sfc[sfc_id] <= delay:
-                self.controller.sfc_hit(sfc_id)
-                break
-
-        self.controller.end_session()
-
 
 @register_policy('HOD_PAGE')
-class HodPage(Policy):
+class HodPage(OnDemandPlacementPolicy):
+    add_sfc_cpu_to_delay = True
+    proc_missed_vnfs = False
 
     def __init__(self, view, controller, **kwargs):
         super(HodPage, self).__init__(view, controller)
 
-    @staticmethod
-    def sum_vnfs_cpu(vnfs):
-        vnfs_cpu = {0: 15,  # nat
-                    1: 25,  # fw
-                    2: 25,  # ids
-                    3: 20,  # wanopt
-                    4: 20,  # lb
-                    5: 25,  # encrypt
-                    6: 25,  # decrypts
-                    7: 30,  # dpi
-                    }
-
-        sum_vnfs_cpu = 0
-        for vnf in vnfs:
-            if vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu[vnf]
-        return sum_vnfs_cpu
-
-    def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
-        delay_sfc = defaultdict(int)  # dict to store the delay taken to run the sfc over the path
-        missed_vnfs = []
-        path = self.view.shortest_path(ingress_node, egress_node)
-        self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
-        vnf_status = {vnf: 0 for vnf in sfc}  # 0 - not processed / 1 - processed
-        sum_cpu_sfc = HodPage.sum_vnfs_cpu(sfc)  # total time processing of the sfc
-        # for u, v in path_links(path):
-        for hop in range(1, len(path)):
-            delay_sfc[sfc_id] = 0
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_vnf_hop(u, v)
-            delay_sfc[sfc_id] += self.view.link_delay(u, v)
-            if self.view.is_nfv_node(v) and v != egress_node:
-                for vnf in sfc:
-                    if self.controller.get_vnf(v, vnf):
-                        if vnf_status[vnf] == 0:
-                            vnf_status[vnf] = 1
-                            self.controller.vnf_proc(vnf)
-                            self.controller.proc_vnf_payload(u, v)
-                        elif vnf_status[vnf] == 1:
-                            continue
-                    else:
-                        missed_vnfs.append(vnf)
-
-            if len(missed_vnfs) != 0:
-                sum_cpu_missed_vnfs = Hod.sum_vnfs_cpu(missed_vnfs)
-                nfv_node_min_cpu_all = self.controller.find_nfv_node_with_min_cpu_alloc(ingress_node, egress_node)
-                closest_nfv_node = self.controller.get_closest_nfv_node(path)
-                # sum_cpu_vnfs_on_node = self.controller.sum_vnfs_cpu_on_node(closest_nfv_node)
-                if v == closest_nfv_node:  # and v == nfv_node_min_cpu_all:
-                    for missed_vnf in missed_vnfs:
-                        vnf_status[missed_vnf] = 1
-                        self.controller.put_vnf(v, missed_vnf)
-                        # self.controller.vnf_proc(missed_vnf)
-                        self.controller.proc_vnf_payload(u, v)
-            delay_sfc[sfc_id] += sum_cpu_sfc
-            if all(value == 1 for value in vnf_status.values()) and delay_sfc[sfc_id] <= delay:
-                self.controller.sfc_hit(sfc_id)
-                break
-
-        self.controller.end_session()
-
 
 @register_policy('HOD_EIGEN')
-class HodEigen(Policy):
+class HodEigen(OnDemandPlacementPolicy):
+    add_sfc_cpu_to_delay = True
+    proc_missed_vnfs = False
 
     def __init__(self, view, controller, **kwargs):
         super(HodEigen, self).__init__(view, controller)
-
-    @staticmethod
-    def sum_vnfs_cpu(vnfs):
-        vnfs_cpu = {0: 15,  # nat
-                    1: 25,  # fw
-                    2: 25,  # ids
-                    3: 20,  # wanopt
-                    4: 20,  # lb
-                    5: 25,  # encrypt
-                    6: 25,  # decrypts
-                    7: 30,  # dpi
-                    }
-
-        sum_vnfs_cpu = 0
-        for vnf in vnfs:
-            if vnf in vnfs_cpu.keys():
-                sum_vnfs_cpu += vnfs_cpu[vnf]
-        return sum_vnfs_cpu
-
-    def process_event(self, time, sfc_id, ingress_node, egress_node, sfc, delay, log):
-        delay_sfc = defaultdict(int)  # dict to store the delay taken to run the sfc over the path
-        missed_vnfs = []
-        path = self.view.shortest_path(ingress_node, egress_node)
-        self.controller.start_session(time, sfc_id, ingress_node, egress_node, sfc, delay, log)
-        vnf_status = {vnf: 0 for vnf in sfc}  # 0 - not processed / 1 - processed
-        sum_cpu_sfc = HodEigen.sum_vnfs_cpu(sfc)  # total time processing of the sfc
-        # for u, v in path_links(path):
-        for hop in range(1, len(path)):
-            delay_sfc[sfc_id] = 0
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_vnf_hop(u, v)
-            delay_sfc[sfc_id] += self.view.link_delay(u, v)
-            if self.view.is_nfv_node(v) and v != egress_node:
-                for vnf in sfc:
-                    if self.controller.get_vnf(v, vnf):
-                        if vnf_status[vnf] == 0:
-                            vnf_status[vnf] = 1
-                            self.controller.vnf_proc(vnf)
-                            self.controller.proc_vnf_payload(u, v)
-                        elif vnf_status[vnf] == 1:
-                            continue
-                    else:
-                        missed_vnfs.append(vnf)
-
-            if len(missed_vnfs) != 0:
-                sum_cpu_missed_vnfs = Hod.sum_vnfs_cpu(missed_vnfs)
-                nfv_node_min_cpu_all = self.controller.find_nfv_node_with_min_cpu_alloc(ingress_node, egress_node)
-                closest_nfv_node = self.controller.get_closest_nfv_node(path)
-                # sum_cpu_vnfs_on_node = self.controller.sum_vnfs_cpu_on_node(closest_nfv_node)
-                if v == closest_nfv_node:  # and v == nfv_node_min_cpu_all:
-                    for missed_vnf in missed_vnfs:
-                        vnf_status[missed_vnf] = 1
-                        self.controller.put_vnf(v, missed_vnf)
-                        # self.controller.vnf_proc(missed_vnf)
-                        self.controller.proc_vnf_payload(u, v)
-            delay_sfc[sfc_id] += sum_cpu_sfc
-            if all(value == 1 for value in vnf_status.values()) and delay_sfc[sfc_id] <= delay:
-                self.controller.sfc_hit(sfc_id)
-                break
-
-        self.controller.end_session()
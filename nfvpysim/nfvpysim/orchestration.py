@@ -12,13 +12,15 @@ import sys
 import signal
 import traceback
 
-from nfvpysim.execution import exec_experiment
+from nfvpysim.execution import exec_experiment, set_centrality_cache_dir
+from nfvpysim.model.catalog import set_vnf_catalog
+from nfvpysim.scenarios.workload import PrefetchingWorkload
 from nfvpysim.registry import TOPOLOGY_FACTORY, POLICY, VNF_ALLOCATION, WORKLOAD, DATA_COLLECTOR, CACHE_POLICY, \
-    VNF_PLACEMENT
+    VNF_PLACEMENT, NETWORK_MODEL
 from nfvpysim.results import ResultSet
-from nfvpysim.util import SequenceNumber, timestr
+from nfvpysim.util import SequenceNumber, timestr, Tree
 
-__all__ = ['Orchestrator', 'run_scenario']
+__all__ = ['Orchestrator', 'run_scenario', 'group_by_policy']
 
 logger = logging.getLogger('orchestration')
 
@@ -66,6 +68,8 @@ class Orchestrator(object):
         """
         # Create queue of experiment configurations
         queue = collections.deque(self.settings.EXPERIMENT_QUEUE)
+        if 'MULTI_POLICY_EXECUTION' in self.settings and self.settings.MULTI_POLICY_EXECUTION:
+            queue = collections.deque(group_by_policy(queue))
         # Calculate number of experiments and number of processes
         self.n_exp = len(queue) * self.settings.N_REPLICATIONS
         self.n_proc = self.settings.N_PROCESSES \
@@ -149,8 +153,13 @@ class Orchestrator(object):
         # Extract parameters
         params, results, duration = args
         self.n_success += 1
-        # Store results
-        self.results.add(params, results)
+        # Store results. Experiments simulating several policies return the
+        # parameters and results of each of them
+        if isinstance(params, list):
+            for policy_params, policy_results in zip(params, results):
+                self.results.add(policy_params, policy_results)
+        else:
+            self.results.add(params, results)
         self.exp_durations.append(duration)
         if self.n_success % self.summary_freq == 0:
             # Number of experiments scheduled to be executed
@@ -164,14 +173,48 @@ class Orchestrator(object):
                         self.n_success, self.n_fail, n_scheduled, eta)
 
 
+def group_by_policy(experiments):
+    """Group experiments differing only in their policy and description.
+
+    Each group is simulated iterating over the workload only once, so that the
+    workload is generated or read once and all policies are compared on the
+    same events.
+
+    Parameters
+    ----------
+    experiments : iterable
+        The experiment trees
+
+    Returns
+    -------
+    groups : list
+        List of experiments. Groups of more than one experiment are lists of
+        experiment trees, in the order in which they appear
+    """
+    groups = []
+    keys = []
+    for experiment in experiments:
+        key = {path: val for path, val in Tree(experiment).paths().items()
+               if path[0] not in ('policy', 'desc')}
+        for i, group_key in enumerate(keys):
+            if group_key == key:
+                groups[i].append(experiment)
+                break
+        else:
+            keys.append(key)
+            groups.append([experiment])
+    return [group if len(group) > 1 else group[0] for group in groups]
+
+
 def run_scenario(settings, params, curr_exp, n_exp):
     """Run a single scenario experiment
     Parameters
     ----------
     settings : Settings
-        experiment parameters tree
         The simulator settings
-    params : Tree
+    params : Tree or list
+        experiment parameters tree, or list of trees of experiments differing
+        only in their policy, which are simulated on the same events
     curr_exp : int
         sequence number of the experiment
     n_exp : int
@@ -183,7 +226,8 @@ def run_scenario(settings, params, curr_exp, n_exp):
         which stores all the attributes of the experiment. The second element
         is a dictionary which stores the results. The third element is an
         integer expressing the wall-clock duration of the experiment (in
-        seconds)
+        seconds). If params is a list, the first two elements are lists with
+        an entry per experiment
     """
     global logger
     try:
@@ -194,8 +238,16 @@ def run_scenario(settings, params, curr_exp, n_exp):
         # Get list of metrics required
         metrics = settings.DATA_COLLECTORS
 
+        # Centralities of topologies are stored on disk only if requested
+        if 'CENTRALITY_CACHE_DIR' in settings:
+            set_centrality_cache_dir(settings.CENTRALITY_CACHE_DIR)
+
+        # VNF types read by caches, policies and workloads of this process
+        set_vnf_catalog(settings.VNF_CATALOG if 'VNF_CATALOG' in settings else None)
+
         # Copy parameters so that they can be manipulated
-        tree = copy.deepcopy(params)
+        multi_policy = isinstance(params, list)
+        tree = copy.deepcopy(params[0] if multi_policy else params)
 
         # Set topology
         topology_spec = tree['topology']
@@ -213,7 +265,11 @@ def run_scenario(settings, params, curr_exp, n_exp):
             logger.error('No workload implementation named %s was found.'
                          % workload_name)
             return None
+        # Events are generated ahead of the simulation if a mode is given
+        prefetch = workload_spec.pop('prefetch', None)
         workload = WORKLOAD[workload_name](topology, **workload_spec)
+        if prefetch is not None:
+            workload = PrefetchingWorkload(workload, prefetch)
 
         # perform allocation space t vnfs on nfv_nodes
         if 'vnf_allocation' in tree:
@@ -254,16 +310,23 @@ def run_scenario(settings, params, curr_exp, n_exp):
         """
 
         # caching and routing strategy definition
-        policy = tree['policy']
-        if policy['name'] not in POLICY:
-            logger.error('No implementation of strategy %s was found.' % policy['name'])
-            return None
+        policies = [copy.deepcopy(p['policy']) for p in params] if multi_policy \
+            else [tree['policy']]
+        for policy in policies:
+            if policy['name'] not in POLICY:
+                logger.error('No implementation of strategy %s was found.' % policy['name'])
+                return None
+            if policy['name'] not in NETWORK_MODEL:
+                logger.error('No network model for strategy %s was found.' % policy['name'])
+                return None
 
         # Configuration parameters of network model
         netconf = tree['netconf']
 
         # Text description of the scenario run to print on screen
         scenario = tree['desc'] if 'desc' in tree else "Description N/A"
+        if multi_policy:
+            scenario = "%s, policies: %s" % (scenario, ', '.join(p['name'] for p in policies))
 
         logger.info('Experiment %d/%d | Preparing scenario: %s', curr_exp, n_exp, scenario)
 
@@ -274,7 +337,9 @@ def run_scenario(settings, params, curr_exp, n_exp):
         collectors = {m: {} for m in metrics}
 
         logger.info('Experiment %d/%d | Start simulation', curr_exp, n_exp)
-        results = exec_experiment(topology, workload, netconf, policy, nfv_cache_policy, collectors)
+        results = exec_experiment(topology, workload, netconf,
+                                  policies if multi_policy else policies[0],
+                                  nfv_cache_policy, collectors)
 
         duration = time.time() - start_time
         logger.info("Experiment %d/%d | End simulation | Duration %s.",
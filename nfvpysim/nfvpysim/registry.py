@@ -17,6 +17,14 @@ VNF_PLACEMENT = {}
 # Dictionary storying all workload generators keyed by ID
 WORKLOAD = {}
 
+# Dictionary storying the network model class used by each strategy keyed by
+# strategy ID
+NETWORK_MODEL = {}
+
+# Dictionary storying the network view class used by each strategy keyed by
+# strategy ID
+NETWORK_VIEW = {}
+
 # Dictionary storying all data collector classes keyed by ID
 DATA_COLLECTOR = {}
 
@@ -26,6 +34,9 @@ RESULTS_READER = {}
 # Dictionary storying all results writer functions keyed by ID
 RESULTS_WRITER = {}
 
+# Dictionary storying all functions building VNF catalogs keyed by ID
+VNF_CATALOG = {}
+
 
 def register_decorator(register):
     """Returns a decorator that register a class or function to a specified
@@ -60,6 +71,9 @@ register_topology_factory = register_decorator(TOPOLOGY_FACTORY)
 register_vnf_allocation = register_decorator(VNF_ALLOCATION)
 register_vnf_placement = register_decorator(VNF_PLACEMENT)
 register_workload = register_decorator(WORKLOAD)
+register_network_model = register_decorator(NETWORK_MODEL)
+register_network_view = register_decorator(NETWORK_VIEW)
 register_data_collector = register_decorator(DATA_COLLECTOR)
 register_results_reader = register_decorator(RESULTS_READER)
 register_results_writer = register_decorator(RESULTS_WRITER)
+register_vnf_catalog = register_decorator(VNF_CATALOG)
@@ -64,6 +64,10 @@ def _validate_settings(settings, freeze=True):
         settings.RESULTS_FORMAT = res_format
         logger.warning('RESULTS_FORMAT setting not specified. Set to %s'
                        % res_format)
+    if 'MULTI_POLICY_EXECUTION' not in settings:
+        settings.MULTI_POLICY_EXECUTION = False
+    if 'VNF_CATALOG' not in settings:
+        settings.VNF_CATALOG = 'DEFAULT'
     if 'LOG_LEVEL' not in settings:
         log_level = 'INFO'
         settings.LOG_LEVEL = log_level
@@ -1,4 +1,34 @@
 import random
+from nfvpysim.model.catalog import get_vnf_catalog
+
+# SFCs requested by the random SFC workload and the delay budget of their
+# requests, keyed by service id
+SERVICES = {
+    1: {'sfc': [0, 1, 2], 'delay': 100},
+    2: {'sfc': [0, 4, 3], 'delay': 100},
+    3: {'sfc': [3, 7, 2], 'delay': 100},
+    4: {'sfc': [1, 2, 4, 5], 'delay': 200},
+    5: {'sfc': [2, 1, 4, 7], 'delay': 200},
+    6: {'sfc': [2, 4, 5, 6], 'delay': 200},
+    7: {'sfc': [3, 6, 7, 2], 'delay': 200},
+    8: {'sfc': [1, 2, 6, 7], 'delay': 200},
+    9: {'sfc': [2, 4, 1, 5, 3], 'delay': 350},
+    10: {'sfc': [4, 3, 5, 1, 2], 'delay': 350},
+    11: {'sfc': [4, 3, 5, 6, 7], 'delay': 350},
+    12: {'sfc': [0, 4, 3, 5, 6], 'delay': 350},
+    13: {'sfc': [2, 4, 5, 6, 7], 'delay': 350},
+    14: {'sfc': [2, 4, 5, 6, 7, 3], 'delay': 400},
+    15: {'sfc': [1, 3, 5, 4, 7, 2], 'delay': 420},
+    16: {'sfc': [2, 1, 4, 3, 7, 8], 'delay': 420},
+    17: {'sfc': [4, 3, 5, 6, 0, 1, 2], 'delay': 450},
+    18: {'sfc': [1, 2, 6, 3, 5, 4, 7], 'delay': 450},
+    19: {'sfc': [0, 1, 2, 4, 3, 7, 5, 6], 'delay': 500},
+    20: {'sfc': [3, 0, 1, 4, 5, 7, 6, 2], 'delay': 500},
+}
+
+
+# VNFs of the SFCs generated by length
+SFC_BY_LEN_VNFS = [0, 1, 2, 3, 4, 5, 6, 7]
 
 
 class RequestSfcByLen:
@@ -6,7 +36,7 @@ class RequestSfcByLen:
     @staticmethod
     def gen_sfc_by_len(sfc_len):
         sfc = []
-        vnfs = [0, 1, 2, 3, 4, 5, 6, 7]
+        vnfs = SFC_BY_LEN_VNFS
         len = 0
         while len < sfc_len:
             vnf = random.choice(vnfs)
@@ -20,32 +50,8 @@ class RequestRandomSfc:
 
     @staticmethod
     def select_random_sfc():
-        services = {
-
-            1: {'sfc': [0, 1, 2], 'delay': 100},
-            2: {'sfc': [0, 4, 3], 'delay': 100},
-            3: {'sfc': [3, 7, 2], 'delay': 100},
-            4: {'sfc': [1, 2, 4, 5], 'delay': 200},
-            5: {'sfc': [2, 1, 4, 7], 'delay': 200},
-            6: {'sfc': [2, 4, 5, 6], 'delay': 200},
-            7: {'sfc': [3, 6, 7, 2], 'delay': 200},
-            8: {'sfc': [1, 2, 6, 7], 'delay': 200},
-            9: {'sfc': [2, 4, 1, 5, 3], 'delay': 350},
-            10: {'sfc': [4, 3, 5, 1, 2], 'delay': 350},
-            11: {'sfc': [4, 3, 5, 6, 7], 'delay': 350},
-            12: {'sfc': [0, 4, 3, 5, 6], 'delay': 350},
-            13: {'sfc': [2, 4, 5, 6, 7], 'delay': 350},
-            14: {'sfc': [2, 4, 5, 6, 7, 3], 'delay': 400},
-            15: {'sfc': [1, 3, 5, 4, 7, 2], 'delay': 420},
-            16: {'sfc': [2, 1, 4, 3, 7, 8], 'delay': 420},
-            17: {'sfc': [4, 3, 5, 6, 0, 1, 2], 'delay': 450},
-            18: {'sfc': [1, 2, 6, 3, 5, 4, 7], 'delay': 450},
-            19: {'sfc': [0, 1, 2, 4, 3, 7, 5, 6], 'delay': 500},
-            20: {'sfc': [3, 0, 1, 4, 5, 7, 6, 2], 'delay': 500},
-
-        }
-        key = random.choice(list(services.keys()))
-        return list(services[key]['sfc'])
+        key = random.choice(list(SERVICES.keys()))
+        return list(SERVICES[key]['sfc'])
 
 
 class RequestVarLenSfc:
@@ -53,19 +59,11 @@ class RequestVarLenSfc:
     @staticmethod
     def var_len_seq_sfc():
         var_len_sfc = []
-        sfcs = {0: 15,  # nat
-                1: 25,  # fw
-                2: 25,  # ids
-                3: 20,  # wanopt
-                4: 20,  # lb
-                5: 25,  # encrypt
-                6: 25,  # decrypts
-                7: 30,  # dpi
-                }
-
-        sfc_len = random.randint(2, 8)
+        vnfs = list(get_vnf_catalog().vnfs)
+
+        sfc_len = min(random.randint(2, 8), len(vnfs))
         while sfc_len != 0:
-            vnf = random.choice(list(sfcs.keys()))
+            vnf = random.choice(vnfs)
             if vnf not in var_len_sfc:
                 var_len_sfc.append(vnf)
                 sfc_len -= 1
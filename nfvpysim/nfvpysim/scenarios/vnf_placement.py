@@ -2,6 +2,7 @@ import fnss
 import random
 from nfvpysim.execution.network import NetworkModelBaseLine, NetworkModelProposal
 from nfvpysim.registry import register_vnf_placement
+from nfvpysim.model.catalog import get_vnf_catalog
 
 
 __all__ = ['hod_placement', 'random_placement', 'random_var_len_placement']
@@ -58,20 +59,13 @@ def random_var_len_placement(topology, nfv_cache_policy):
 
     def var_len_seq_sfc():
         var_len_sfc = []
-        sfcs = {1: 15,  # nat
-                2: 25,  # fw
-                3: 25,  # ids
-                4: 20,  # wanopt
-                5: 20,  # lb
-                6: 25,  # encrypt
-                7: 25,  # decrypts
-                8: 30,  # dpi
-                }
+        # VNFs are numbered from 1 by the placements of this module
+        sfcs = [(vnf + 1, cpu) for vnf, cpu in enumerate(get_vnf_catalog().cpu.tolist())]
 
         sfc_len = random.randint(1, 8)
         sum_cpu = 0
         while sfc_len != 0:
-            vnf_sample, cpu = random.choice(list(sfcs.items()))
+            vnf_sample, cpu = random.choice(sfcs)
             if vnf_sample not in var_len_sfc:
                 var_len_sfc.append(vnf_sample)
                 sfc_len -= 1
@@ -1,17 +1,36 @@
 from nfvpysim.registry import register_workload
+from nfvpysim.model.catalog import get_vnf_catalog
+from nfvpysim.execution.events import SfcRequest
+from nfvpysim.tools.traces import SfcTrace, TraceRecorder, read_sfc_trace_blocks
+from nfvpysim.execution.engine import BATCH_SIZE
 from nfvpysim.scenarios.topology import *
 from nfvpysim.scenarios.requests import *
 import math
-import csv
+import queue
 import random
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from itertools import islice
+
+import numpy as np
 
 __all__ = [
     'StationaryWorkloadSfcByLen',
     'StationaryWorkloadVarLenSfc',
     'StationaryWorkloadRandomSfc',
-    'TraceDrivenWorkload'
+    'TraceDrivenWorkload',
+    'BinaryTraceDrivenWorkload',
+    'PrefetchingWorkload'
 ]
 
+# Number of requests of a binary trace read at once
+TRACE_BLOCK_SIZE = 4096
+
+# Number of events drawn at once by vectorized stationary workloads. The
+# stream of events of a seed depends on it
+WORKLOAD_BLOCK_SIZE = 4096
+
 
 def truncate(number, digits):
     stepper = 10.0 ** digits
@@ -23,18 +42,22 @@ def generate_uniform_delay(lower, upper):
     return round(delay, 2)
 
 
+# Bounds of the uniform delay budget of each VNF of the SFCs of variable length
+VNF_DELAY_BOUNDS = {
+    1: (10, 15),  # nat
+    2: (20, 25),  # fw
+    3: (20, 25),  # ids
+    4: (15, 20),  # wanopt
+    5: (15, 20),  # lb
+    6: (20, 25),  # encrypt
+    7: (20, 25),  # decrypts
+    8: (25, 30),  # dpi
+}
+
+
 def get_uniform_delay_sfc(sfc):
-    sfcs_delay = {
-        1: generate_uniform_delay(10, 15),  # nat
-        2: generate_uniform_delay(20, 25),  # fw
-        3: generate_uniform_delay(20, 25),  # ids
-        4: generate_uniform_delay(15, 20),  # wanopt
-        5: generate_uniform_delay(15, 20),  # lb
-        6: generate_uniform_delay(20, 25),  # encrypt
-        7: generate_uniform_delay(20, 25),  # decrypts
-        8: generate_uniform_delay(25, 30),  # dpi
-
-    }
+    sfcs_delay = {vnf: generate_uniform_delay(lower, upper)
+                  for vnf, (lower, upper) in VNF_DELAY_BOUNDS.items()}
     delay_sfc = 0
     for vnf in sfc:
         if vnf in sfcs_delay.keys():
@@ -44,54 +67,153 @@ def get_uniform_delay_sfc(sfc):
 
 
 def get_delay(service):
-    dict_services = {
-
-        1: {'sfc': [0, 1, 2], 'delay': 100},
-        2: {'sfc': [0, 4, 3], 'delay': 100},
-        3: {'sfc': [3, 7, 2], 'delay': 100},
-        4: {'sfc': [1, 2, 4, 5], 'delay': 200},
-        5: {'sfc': [2, 1, 4, 7], 'delay': 200},
-        6: {'sfc': [2, 4, 5, 6], 'delay': 200},
-        7: {'sfc': [3, 6, 7, 2], 'delay': 200},
-        8: {'sfc': [1, 2, 6, 7], 'delay': 200},
-        9: {'sfc': [2, 4, 1, 5, 3], 'delay': 350},
-        10: {'sfc': [4, 3, 5, 1, 2], 'delay': 350},
-        11: {'sfc': [4, 3, 5, 6, 7], 'delay': 350},
-        12: {'sfc': [0, 4, 3, 5, 6], 'delay': 350},
-        13: {'sfc': [2, 4, 5, 6, 7], 'delay': 350},
-        14: {'sfc': [2, 4, 5, 6, 7, 3], 'delay': 400},
-        15: {'sfc': [1, 3, 5, 4, 7, 2], 'delay': 420},
-        16: {'sfc': [2, 1, 4, 3, 7, 8], 'delay': 420},
-        17: {'sfc': [4, 3, 5, 6, 0, 1, 2], 'delay': 450},
-        18: {'sfc': [1, 2, 6, 3, 5, 4, 7], 'delay': 450},
-        19: {'sfc': [0, 1, 2, 4, 3, 7, 5, 6], 'delay': 500},
-        20: {'sfc': [3, 0, 1, 4, 5, 7, 6, 2], 'delay': 500}
-
-    }
-    for k, v in dict_services.items():
-        for k1, v1 in v.items():
-            if v1 == service:
-                return v.get('delay', v)
+    for v in SERVICES.values():
+        if v['sfc'] == list(service):
+            return v['delay']
 
 
 def get_delay_vnfs(vnfs):
-    vnfs_cpu = {0: 15,  # nat
-                1: 25,  # fw
-                2: 25,  # ids
-                3: 20,  # wanopt
-                4: 20,  # lb
-                5: 25,  # encrypt
-                6: 25,  # decrypts
-                7: 30  # dpi
-                }
-
-
-    sum_vnfs_cpu = 0
-    for vnf in vnfs:
-        if vnf in vnfs_cpu.keys():
-            sum_vnfs_cpu += vnfs_cpu[vnf]
-
-    return sum_vnfs_cpu
+    return get_vnf_catalog().sfc_cpu(vnfs)
+
+
+def record_events(events, record_to, catalog):
+    """Return the events of a workload, recorded to a binary trace if a path
+    is given
+
+    Events are passed in blocks to a TraceRecorder, which writes them from a
+    background thread. Blocks are as large as those processed by the engine,
+    so that the workload generates events at the same moments as when it is
+    not recorded.
+
+    Parameters
+    ----------
+    events : iterator
+        Iterator over the (time, event) tuples of the workload
+    record_to : str
+        The directory of the trace, or None to not record events
+    catalog : VnfCatalog
+        The catalog that interned the SFCs of the events
+
+    Returns
+    -------
+    events : iterator
+        Iterator over the same (time, event) tuples
+    """
+    if record_to is None:
+        return events
+    return _recorded_events(events, TraceRecorder(record_to, catalog))
+
+
+def _recorded_events(events, recorder):
+    try:
+        block = list(islice(events, BATCH_SIZE))
+        while block:
+            recorder.put(block)
+            yield from block
+            block = list(islice(events, BATCH_SIZE))
+    finally:
+        recorder.close()
+
+
+def generate_vectorized_events(rng, n_warmup, n_measured, rate, ingress_nodes, egress_nodes,
+                               draw_sfcs):
+    """Generate the events of a stationary workload in blocks of random
+    numbers drawn from a NumPy generator
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator
+        The generator
+    n_warmup : int
+        The number of requests not measured
+    n_measured : int
+        The number of requests measured
+    rate : float
+        The rate of arrival of requests
+    ingress_nodes : list
+        The ingress nodes, selected uniformly
+    egress_nodes : list
+        The egress nodes, selected uniformly
+    draw_sfcs : callable
+        Function called with the generator and a number of requests, which
+        returns the list of the ids of their SFCs and the list of their delay
+        budgets
+
+    Returns
+    -------
+    events : iterator
+        Iterator over (time, event) tuples
+    """
+    t_event = 0.0
+    n_events = n_warmup + n_measured
+    for start in range(0, n_events, WORKLOAD_BLOCK_SIZE):
+        n = min(WORKLOAD_BLOCK_SIZE, n_events - start)
+        # Inter-arrival times are summed in order, starting from the last one
+        times = np.cumsum(np.concatenate(([t_event], rng.exponential(1.0 / rate, n))))[1:]
+        t_event = times[-1]
+        ingress = rng.integers(len(ingress_nodes), size=n).tolist()
+        egress = rng.integers(len(egress_nodes), size=n).tolist()
+        sfcs, delays = draw_sfcs(rng, n)
+        sfc_ids = (np.trunc(times * 100.0) / 100.0).tolist()
+        times = times.tolist()
+        for i in range(n):
+            yield times[i], SfcRequest(sfc_ids[i], ingress_nodes[ingress[i]],
+                                       egress_nodes[egress[i]], sfcs[i], delays[i],
+                                       start + i >= n_warmup)
+
+
+def draw_sfcs_of_distinct_vnfs(rng, vnfs, lengths):
+    """Draw SFCs of distinct VNFs in random order
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator
+        The generator
+    vnfs : list
+        The VNFs
+    lengths : array
+        The number of VNFs of each SFC
+
+    Returns
+    -------
+    sfcs : array
+        The VNFs of each SFC in a row, padded with -1
+    """
+    # Each row is a random permutation of the VNFs, cut to the length of its SFC
+    order = np.argsort(rng.random((len(lengths), len(vnfs))), axis=1)
+    sfcs = np.asarray(vnfs, dtype=np.int64)[order]
+    sfcs[np.arange(len(vnfs)) >= np.asarray(lengths)[:, None]] = -1
+    return sfcs
+
+
+def intern_sfcs(catalog, sfcs, specs):
+    """Intern SFCs given as rows of VNFs padded with -1
+
+    Parameters
+    ----------
+    catalog : VnfCatalog
+        The catalog
+    sfcs : array
+        The VNFs of each SFC in a row, padded with -1
+    specs : dict
+        The specs of the SFCs interned so far, keyed by the bytes of their
+        rows. It is updated with the new SFCs
+
+    Returns
+    -------
+    specs : list
+        The spec of each row
+    """
+    sfcs = np.ascontiguousarray(sfcs, dtype=np.int64)
+    rows = sfcs.view(np.dtype((np.void, sfcs.dtype.itemsize * sfcs.shape[1]))).reshape(-1)
+    keys, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    distinct = []
+    for key, i in zip(keys.tolist(), first.tolist()):
+        spec = specs.get(key)
+        if spec is None:
+            spec = specs[key] = catalog.intern_sfc([vnf for vnf in sfcs[i].tolist() if vnf >= 0])
+        distinct.append(spec)
+    return [distinct[j] for j in inverse.reshape(-1).tolist()]
 
 
 @register_workload('STATIONARY_SFC_BY_LEN')
@@ -104,46 +226,68 @@ class StationaryWorkloadSfcByLen:
     This is useful for running large schedules of events where RAM is limited
     as its memory impact is considerably lower
 
+    If *vectorized* is True, random numbers are drawn in blocks from a NumPy
+    generator seeded with *seed*, which is much faster than drawing them one
+    by one from the random module but gives a different stream of events
+
+    If *record_to* is a directory, events are also written there as a binary
+    trace, which the TRACE_DRIVEN_BINARY workload replays
+
     All requests are mapped to receivers uniformly unless a positive *beta*
     parameter is specified
 
 
     """
 
-    def __init__(self, topology, sfc_len, sfc_req_rate=1.0, n_warmup=0, n_measured=1 * 10 ** 4, seed=None, **kwargs):
+    def __init__(self, topology, sfc_len, sfc_req_rate=1.0, n_warmup=0, n_measured=1 * 10 ** 4,
+                 seed=None, vectorized=False, record_to=None, **kwargs):
+        if vectorized and not 0 < sfc_len <= len(SFC_BY_LEN_VNFS):
+            raise ValueError('sfc_len must be between 1 and %d' % len(SFC_BY_LEN_VNFS))
         self.sfc_len = sfc_len
+        self.catalog = get_vnf_catalog()
+        self.record_to = record_to
         self.ingress_nodes = [v for v in topology.nodes() if topology.node[v]['stack'][0] == 'ingress_node']
         self.egress_nodes = [v for v in topology.nodes() if topology.node[v]['stack'][0] == 'egress_node']
         self.sfc_req_rate = sfc_req_rate
         self.n_warmup = n_warmup
         self.n_measured = n_measured
+        self.seed = seed
+        self.vectorized = vectorized
+        self._specs = {}
         random.seed(seed)
 
+    def draw_sfcs(self, rng, n):
+        sfcs = draw_sfcs_of_distinct_vnfs(rng, SFC_BY_LEN_VNFS, np.full(n, self.sfc_len))
+        specs = intern_sfcs(self.catalog, sfcs, self._specs)
+        return [spec.id for spec in specs], [spec.cpu for spec in specs]
+
     def __iter__(self):
+        return record_events(self._events(), self.record_to, self.catalog)
+
+    def _events(self):
+        if self.vectorized:
+            yield from generate_vectorized_events(np.random.default_rng(self.seed), self.n_warmup,
+                                                  self.n_measured, self.sfc_req_rate,
+                                                  self.ingress_nodes, self.egress_nodes,
+                                                  self.draw_sfcs)
+            return
         req_counter = 0
         t_event = 0.0
-        header = ['id', 'sfc']
-        with open('random_sfc_by_len.csv', 'w', newline='\n') as f:
-            writer = csv.writer(f)
-            writer.writerow(header)
-            while req_counter < self.n_warmup + self.n_measured:
-                for i in range(1, self.n_measured + 1):
-                    t_event += (random.expovariate(self.sfc_req_rate))
-                    ingress_node = random.choice(self.ingress_nodes)
-                    egress_node = random.choice(self.egress_nodes)
-                    self.req = RequestSfcByLen()
-                    self.sfc = self.req.gen_sfc_by_len(self.sfc_len)
-                    delay = get_delay_vnfs(self.sfc)
-                    sfc_id = truncate(t_event, 2)
-                    log = (req_counter >= self.n_warmup)
-                    event = {'sfc_id': sfc_id, 'ingress_node': ingress_node, 'egress_node': egress_node,
-                             'sfc': self.sfc, 'delay': delay, 'log': log}
-                    # file_lines = [str(sfc)[1:-1], '\n'] #str(i),',',
-                    # f.writelines(file_lines)
-                    yield t_event, event
-                    req_counter += 1
-                f.close()
-            return
+        while req_counter < self.n_warmup + self.n_measured:
+            for i in range(1, self.n_measured + 1):
+                t_event += (random.expovariate(self.sfc_req_rate))
+                ingress_node = random.choice(self.ingress_nodes)
+                egress_node = random.choice(self.egress_nodes)
+                self.req = RequestSfcByLen()
+                self.sfc = self.req.gen_sfc_by_len(self.sfc_len)
+                spec = self.catalog.intern_sfc(self.sfc)
+                delay = spec.cpu
+                sfc_id = truncate(t_event, 2)
+                log = (req_counter >= self.n_warmup)
+                event = SfcRequest(sfc_id, ingress_node, egress_node, spec.id, delay, log)
+                yield t_event, event
+                req_counter += 1
+        return
 
 
 @register_workload('STATIONARY_VAR_LEN_SFC')
@@ -156,27 +300,59 @@ class StationaryWorkloadVarLenSfc:
     This is useful for running large schedules of events where RAM is limited
     as its memory impact is considerably lower
 
+    If *vectorized* is True, random numbers are drawn in blocks from a NumPy
+    generator seeded with *seed*, which is much faster than drawing them one
+    by one from the random module but gives a different stream of events
+
+    If *record_to* is a directory, events are also written there as a binary
+    trace, which the TRACE_DRIVEN_BINARY workload replays
+
     All requests are mapped to receivers uniformly unless a positive *beta*
     parameter is specified
 
 
     """
 
-    def __init__(self, topology, sfc_req_rate=1.0, n_warmup=0, n_measured=4 * 10 ** 5, seed=None):
+    def __init__(self, topology, sfc_req_rate=1.0, n_warmup=0, n_measured=4 * 10 ** 5, seed=None,
+                 vectorized=False, record_to=None):
         self.ingress_nodes = [v for v in topology.nodes() if topology.node[v]['stack'][0] == 'ingress_node']
         self.egress_nodes = [v for v in topology.nodes() if topology.node[v]['stack'][0] == 'egress_node']
         self.rate = sfc_req_rate
         self.n_measured = n_measured
         self.n_warmup = n_warmup
+        self.catalog = get_vnf_catalog()
+        self.record_to = record_to
+        self.seed = seed
+        self.vectorized = vectorized
+        self._specs = {}
         random.seed(seed)
 
+    def draw_sfcs(self, rng, n):
+        vnfs = list(self.catalog.vnfs)
+        lengths = np.minimum(rng.integers(2, 9, size=n), len(vnfs))
+        sfcs = draw_sfcs_of_distinct_vnfs(rng, vnfs, lengths)
+        # The budget of a request is the sum of a uniform delay, rounded to
+        # two decimals, for each VNF of its SFC with delay bounds
+        lower = np.zeros(max(max(vnfs), max(VNF_DELAY_BOUNDS)) + 2)
+        upper = np.zeros(len(lower))
+        for vnf, (low, high) in VNF_DELAY_BOUNDS.items():
+            lower[vnf], upper[vnf] = low, high
+        # Padding VNFs, equal to -1, select the last bounds, which are null
+        delays = np.round(rng.uniform(lower[sfcs], upper[sfcs]), 2).sum(axis=1)
+        specs = intern_sfcs(self.catalog, sfcs, self._specs)
+        return [spec.id for spec in specs], delays.tolist()
+
     def __iter__(self):
+        return record_events(self._events(), self.record_to, self.catalog)
+
+    def _events(self):
+        if self.vectorized:
+            yield from generate_vectorized_events(np.random.default_rng(self.seed), self.n_warmup,
+                                                  self.n_measured, self.rate, self.ingress_nodes,
+                                                  self.egress_nodes, self.draw_sfcs)
+            return
         req_counter = 0
         t_event = 0.0
-        # header = ['id', 'sfc']
-        # with open('var_seq_len_sfc.csv', 'w', newline='\n') as f:
-        # writer = csv.writer(f)
-        # writer.writerow(header)
         while req_counter < self.n_warmup + self.n_measured:
             # for i in range(0, self.n_req):
             t_event += (random.expovariate(self.rate))
@@ -187,13 +363,10 @@ class StationaryWorkloadVarLenSfc:
             delay = get_uniform_delay_sfc(self.sfc)
             sfc_id = truncate(t_event, 2)
             log = (req_counter >= self.n_warmup)
-            event = {'sfc_id': sfc_id, 'ingress_node': ingress_node, 'egress_node': egress_node, 'sfc': self.sfc,
-                     'delay': delay, 'log': log}
-            # file_lines = [str(i),',', str(sfc)[1:-1], '\n']
-            # f.writelines(file_lines)
+            event = SfcRequest(sfc_id, ingress_node, egress_node,
+                               self.catalog.intern_sfc(self.sfc).id, delay, log)
             yield t_event, event
             req_counter += 1
-            # f.close() n_warmup=0,  n_measured=4 * 10 ** 5,
         return
 
 
@@ -207,80 +380,372 @@ class StationaryWorkloadRandomSfc:
     This is useful for running large schedules of events where RAM is limited
     as its memory impact is considerably lower
 
+    If *vectorized* is True, random numbers are drawn in blocks from a NumPy
+    generator seeded with *seed*, which is much faster than drawing them one
+    by one from the random module but gives a different stream of events
+
+    If *record_to* is a directory, events are also written there as a binary
+    trace, which the TRACE_DRIVEN_BINARY workload replays
+
     All requests are mapped to receivers uniformly unless a positive *beta*
     parameter is specified
 
 
     """
 
-    def __init__(self, topology, sfc_req_rate, n_warmup, n_measured=20 ** 1, seed=None):
+    def __init__(self, topology, sfc_req_rate, n_warmup, n_measured=20 ** 1, seed=None,
+                 vectorized=False, record_to=None):
         self.ingress_nodes = [v for v in topology.nodes() if topology.node[v]['stack'][0] == 'ingress_node']
         self.egress_nodes = [v for v in topology.nodes() if topology.node[v]['stack'][0] == 'egress_node']
         self.sfc_req_rate = sfc_req_rate
         self.n_measured = n_measured
         self.n_warmup = n_warmup
+        # Services are interned once and kept with the delay budget of their
+        # requests, which may differ from the default one of their spec
+        self.catalog = get_vnf_catalog()
+        self.record_to = record_to
+        self.services = [(self.catalog.intern_sfc(service['sfc']), service['delay'])
+                         for service in SERVICES.values()]
+        self.seed = seed
+        self.vectorized = vectorized
         random.seed(seed)
 
+    def draw_sfcs(self, rng, n):
+        services = [self.services[j] for j in rng.integers(len(self.services), size=n).tolist()]
+        return [spec.id for spec, _ in services], [delay for _, delay in services]
+
     def __iter__(self):
+        return record_events(self._events(), self.record_to, self.catalog)
+
+    def _events(self):
+        if self.vectorized:
+            yield from generate_vectorized_events(np.random.default_rng(self.seed), self.n_warmup,
+                                                  self.n_measured, self.sfc_req_rate,
+                                                  self.ingress_nodes, self.egress_nodes,
+                                                  self.draw_sfcs)
+            return
         req_counter = 0
         t_event = 0.0
 
-        # header = ['id', 'sfc']
-        # with open('var_seq_len_sfc.csv', 'w', newline='\n') as f:
-        # writer = csv.writer(f)
-        # writer.writerow(header)
 
         while req_counter < self.n_warmup + self.n_measured:
             # for i in range(0, self.n_req):
             t_event += (random.expovariate(self.sfc_req_rate))
             ingress_node = random.choice(self.ingress_nodes)
             egress_node = random.choice(self.egress_nodes)
-            req = RequestRandomSfc()
-            self.sfc = req.select_random_sfc()
-            delay = get_delay(self.sfc)
+            spec, delay = random.choice(self.services)
             sfc_id = truncate(t_event, 2)
             log = (req_counter >= self.n_warmup)
-            event = {'sfc_id': sfc_id, 'ingress_node': ingress_node, 'egress_node': egress_node, 'sfc': self.sfc,
-                     'delay': delay, 'log': log}
-            # file_lines = [str(i),',', str(sfc)[1:-1], '\n']
-            # f.writelines(file_lines)
+            event = SfcRequest(sfc_id, ingress_node, egress_node, spec.id, delay, log)
             yield t_event, event
             req_counter += 1
-            # f.close() n_warmup=0,  n_measured=4 * 10 ** 5,
         return
 
 
 @register_workload('TRACE_DRIVEN')
 class TraceDrivenWorkload:
+    """Workload of the SFCs read from a trace file.
+
+    Each line of the trace lists the id of a request followed by the VNFs of
+    its SFC, separated by commas, as written by GenerateTraceDrivenRequests.
+    A header line is skipped. Traces compressed with gzip, xz or zstd are
+    decompressed while they are read, according to their extension, and are
+    decoded in large blocks. The first *first_request* requests of the trace
+    are skipped, by seeking if the trace was indexed by index_sfc_trace: the
+    following *n_warmup* requests are still simulated, to warm up the
+    network. The delay budget of each request is the total CPU demand of its
+    SFC. If *record_to* is a directory, events are also written there as a
+    binary trace.
+    """
+
     def __init__(self, topology, n_warmup, n_measured,
-                 sfc_reqs_file='/home/vitor/PycharmProjects/nfvpysim/sfc_seq_len_2_test.csv', rate=1.0, **kwargs):
-        # Set high buffering to avoid one-line reads
-        self.buffering = 64 * 1024 * 1024
+                 sfc_reqs_file='/home/vitor/PycharmProjects/nfvpysim/sfc_seq_len_2_test.csv',
+                 rate=1.0, record_to=None, first_request=0, **kwargs):
+        if first_request < 0:
+            raise ValueError('first_request must be non-negative')
         self.n_warmup = n_warmup
         self.n_measured = n_measured
         self.sfc_reqs_file = sfc_reqs_file
         self.rate = rate
+        self.catalog = get_vnf_catalog()
+        self.record_to = record_to
+        self.first_request = first_request
         self.ingress_nodes = [v for v in topology.nodes() if topology.node[v]['stack'][0] == 'ingress_node']
         self.egress_nodes = [v for v in topology.nodes() if topology.node[v]['stack'][0] == 'egress_node']
 
     def __iter__(self):
+        return record_events(self._events(), self.record_to, self.catalog)
+
+    def _events(self):
         req_counter = 0
         t_event = 0.0
-        with open(self.sfc_reqs_file, 'r', buffering=self.buffering) as sfc_file:
-            for sfc in sfc_file:
+        # Specs of the SFCs read so far, keyed by the bytes of their VNFs
+        specs = {}
+        for vnfs, offsets in read_sfc_trace_blocks(self.sfc_reqs_file, self.first_request):
+            data = vnfs.tobytes()
+            bounds = (offsets * vnfs.itemsize).tolist()
+            for i in range(len(offsets) - 1):
+                key = data[bounds[i]:bounds[i + 1]]
+                spec = specs.get(key)
+                if spec is None:
+                    sfc = vnfs[offsets[i]:offsets[i + 1]].tolist()
+                    spec = specs[key] = self.catalog.intern_sfc(sfc)
                 t_event += (random.expovariate(self.rate))
                 ingress_node = random.choice(self.ingress_nodes)
                 egress_node = random.choice(self.egress_nodes)
                 sfc_id = truncate(t_event, 2)
-                delay = get_delay_vnfs(sfc)
                 log = (req_counter >= self.n_warmup)
-                event = {'sfc_id': sfc_id, 'ingress_node': ingress_node, 'egress_node': egress_node, 'sfc': sfc,
-                         'delay': delay, 'log': log}
+                event = SfcRequest(sfc_id, ingress_node, egress_node, spec.id, spec.cpu, log)
                 yield t_event, event
                 req_counter += 1
                 if req_counter >= self.n_warmup + self.n_measured:
                     return
+        raise ValueError("Trace did not contain enough requests")
+
+
+@register_workload('TRACE_DRIVEN_BINARY')
+class BinaryTraceDrivenWorkload:
+    """Workload of the SFCs read from a binary trace.
+
+    The trace is a directory written by convert_sfc_trace or write_sfc_trace.
+    Its columns are memory-mapped and read in blocks, so that the trace is
+    neither parsed nor loaded in memory and experiments running in parallel
+    share its pages. Requests are generated as by TraceDrivenWorkload, except
+    that the arrival times and the ingress and egress nodes stored in the
+    trace, if any, replace random ones, and the delay budgets stored in the
+    trace, if any, replace the total CPU demand of SFCs. Traces recorded
+    by workloads with *record_to* are replayed exactly, given the same number
+    of warmup requests. If *record_to* is a directory, events are also written
+    there as a binary trace.
+    """
+
+    def __init__(self, topology, n_warmup, n_measured, sfc_reqs_file, rate=1.0, record_to=None,
+                 **kwargs):
+        self.trace = SfcTrace(sfc_reqs_file)
+        if n_warmup + n_measured > len(self.trace):
             raise ValueError("Trace did not contain enough requests")
+        self.n_warmup = n_warmup
+        self.n_measured = n_measured
+        self.rate = rate
+        self.catalog = get_vnf_catalog()
+        self.record_to = record_to
+        self.ingress_nodes = [v for v in topology.nodes()
+                              if topology.node[v]['stack'][0] == 'ingress_node']
+        self.egress_nodes = [v for v in topology.nodes()
+                             if topology.node[v]['stack'][0] == 'egress_node']
+
+    def _column(self, column, start, stop):
+        return column[start:stop].tolist() if column is not None else None
+
+    def __iter__(self):
+        return record_events(self._events(), self.record_to, self.catalog)
+
+    def _events(self):
+        trace = self.trace
+        n_requests = self.n_warmup + self.n_measured
+        # Specs of the SFCs read so far, keyed by the bytes of their VNFs
+        specs = {}
+        t_event = 0.0
+        for start in range(0, n_requests, TRACE_BLOCK_SIZE):
+            stop = min(start + TRACE_BLOCK_SIZE, n_requests)
+            offsets = trace.offsets[start:stop + 1].tolist()
+            first = offsets[0]
+            vnfs = trace.vnfs[first:offsets[-1]].tobytes()
+            timestamps = self._column(trace.timestamps, start, stop)
+            ingress_nodes = self._column(trace.ingress_nodes, start, stop)
+            egress_nodes = self._column(trace.egress_nodes, start, stop)
+            delays = self._column(trace.delays, start, stop)
+            for i in range(stop - start):
+                key = vnfs[offsets[i] - first:offsets[i + 1] - first]
+                spec = specs.get(key)
+                if spec is None:
+                    spec = specs[key] = self.catalog.intern_sfc(list(key))
+                if timestamps is None:
+                    t_event += (random.expovariate(self.rate))
+                else:
+                    t_event = timestamps[i]
+                ingress_node = random.choice(self.ingress_nodes) if ingress_nodes is None \
+                    else ingress_nodes[i]
+                egress_node = random.choice(self.egress_nodes) if egress_nodes is None \
+                    else egress_nodes[i]
+                sfc_id = truncate(t_event, 2)
+                log = (start + i >= self.n_warmup)
+                delay = spec.cpu if delays is None else delays[i]
+                yield t_event, SfcRequest(sfc_id, ingress_node, egress_node, spec.id, delay, log)
+
+
+class PrefetchingWorkload:
+    """Wrapper generating the events of a workload ahead of the simulation.
+
+    Events are generated in chunks by a producer running concurrently with
+    the consumer of the workload, which iterates over the same (time, event)
+    tuples as over the workload itself.
+
+    With mode 'thread', the producer is a thread putting chunks in a bounded
+    queue. It suits workloads reading traces, whose I/O and decompression
+    release the interpreter lock. Workloads drawing from the random module
+    share it with the simulation: if the simulation draws from it too, for
+    instance because VNF processing delays are random, the order of the
+    draws, hence the results, are not reproducible.
+
+    With mode 'process', the producer is a forked process writing chunks to
+    a ring of slots in shared memory, which suits workloads generating
+    events with CPU-bound code. The producer draws from its own copy of the
+    random module, taken when iteration starts. The SFCs it interns are
+    interned again by the consumer, in the same order, so that their ids are
+    the same as without prefetching. Event ids and delays must be numbers,
+    nodes must be integers and delays are returned as floats. Processes that
+    cannot fork, such as the daemonic workers of a pool of processes, fall
+    back to a thread.
+    """
+
+    # Fields of the events of a chunk in shared memory
+    chunk_dtype = np.dtype([('time', np.float64), ('sfc_id', np.float64),
+                            ('ingress_node', np.int64), ('egress_node', np.int64),
+                            ('sfc', np.int64), ('delay', np.float64), ('log', np.bool_)])
+
+    def __init__(self, workload, mode='thread', chunk_size=BATCH_SIZE, n_chunks=4):
+        """Constructor
+
+        Parameters
+        ----------
+        workload : iterable
+            The workload
+        mode : str, optional
+            'thread' or 'process'
+        chunk_size : int, optional
+            The number of events of each chunk
+        n_chunks : int, optional
+            The maximum number of chunks generated ahead of the consumer
+        """
+        if mode not in ('thread', 'process'):
+            raise ValueError("mode must be 'thread' or 'process', not %r" % mode)
+        if chunk_size <= 0 or n_chunks <= 0:
+            raise ValueError('chunk_size and n_chunks must be positive')
+        self.workload = workload
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.n_chunks = n_chunks
+
+    def __iter__(self):
+        if self.mode == 'process' and 'fork' in mp.get_all_start_methods() \
+                and not mp.current_process().daemon:
+            return self._process_events()
+        return self._thread_events()
+
+    def _thread_events(self):
+        chunks = queue.Queue(self.n_chunks)
+        stop = threading.Event()
+
+        def produce():
+            try:
+                events = iter(self.workload)
+                chunk = list(islice(events, self.chunk_size))
+                while chunk and not stop.is_set():
+                    chunks.put(chunk)
+                    chunk = list(islice(events, self.chunk_size))
+                chunks.put(None)
+            except BaseException as e:
+                chunks.put(e)
+
+        producer = threading.Thread(target=produce, name='PrefetchingWorkload')
+        producer.daemon = True
+        producer.start()
+        try:
+            for chunk in iter(chunks.get, None):
+                if isinstance(chunk, BaseException):
+                    raise chunk
+                yield from chunk
+        finally:
+            # Unblock the producer if the consumer stops early
+            stop.set()
+            while producer.is_alive():
+                try:
+                    chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+    def _produce_chunks(self, ring, free, full, random_state):
+        """Write the events of the workload to the slots of the ring"""
+        # The random module is reseeded after a fork, hence its state is
+        # restored to the one of the consumer
+        random.setstate(random_state)
+        catalog = get_vnf_catalog()
+        known_sfcs = set()
+        try:
+            events = iter(self.workload)
+            chunk = list(islice(events, self.chunk_size))
+            while chunk:
+                slot = free.get()
+                if slot is None:
+                    return
+                n = len(chunk)
+                requests = [event for _, event in chunk]
+                sfcs = [catalog.sfc_spec(event.sfc) for event in requests]
+                # VNFs of the SFCs not sent yet, so that the consumer interns them
+                new_sfcs = []
+                for spec in sfcs:
+                    if spec.id not in known_sfcs:
+                        known_sfcs.add(spec.id)
+                        new_sfcs.append((spec.id, spec.vnfs))
+                record = ring[slot]
+                record['time'][:n] = [time for time, _ in chunk]
+                record['sfc_id'][:n] = [event.sfc_id for event in requests]
+                record['ingress_node'][:n] = [event.ingress_node for event in requests]
+                record['egress_node'][:n] = [event.egress_node for event in requests]
+                record['sfc'][:n] = [spec.id for spec in sfcs]
+                record['delay'][:n] = [event.delay for event in requests]
+                record['log'][:n] = [event.log for event in requests]
+                full.put((slot, n, new_sfcs))
+                chunk = list(islice(events, self.chunk_size))
+            full.put(None)
+        except Exception as e:
+            full.put(ValueError('Prefetched workload failed: %r' % e))
+
+    def _process_events(self):
+        ctx = mp.get_context('fork')
+        size = self.n_chunks * self.chunk_size * self.chunk_dtype.itemsize
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        ring = np.ndarray((self.n_chunks, self.chunk_size), dtype=self.chunk_dtype,
+                          buffer=memory.buf)
+        free = ctx.Queue()
+        full = ctx.Queue()
+        for slot in range(self.n_chunks):
+            free.put(slot)
+        producer = ctx.Process(target=self._produce_chunks,
+                               args=(ring, free, full, random.getstate()),
+                               name='PrefetchingWorkload')
+        producer.daemon = True
+        producer.start()
+        catalog = get_vnf_catalog()
+        # Ids of the SFCs interned by the consumer, keyed by producer id
+        sfc_ids = {}
+        record = None
+        try:
+            for message in iter(full.get, None):
+                if isinstance(message, Exception):
+                    raise message
+                slot, n, new_sfcs = message
+                for producer_id, vnfs in new_sfcs:
+                    sfc_ids[producer_id] = catalog.intern_sfc(vnfs).id
+                record = ring[slot, :n]
+                times = record['time'].tolist()
+                events = list(map(SfcRequest, record['sfc_id'].tolist(),
+                                  record['ingress_node'].tolist(), record['egress_node'].tolist(),
+                                  map(sfc_ids.__getitem__, record['sfc'].tolist()),
+                                  record['delay'].tolist(), record['log'].tolist()))
+                free.put(slot)
+                yield from zip(times, events)
+        finally:
+            free.put(None)
+            producer.join(1)
+            if producer.is_alive():
+                producer.terminate()
+                producer.join()
+            # Views of the shared memory must be released before closing it
+            del ring, record
+            memory.close()
+            memory.unlink()
 
 
 # topo = topology_tatanld()
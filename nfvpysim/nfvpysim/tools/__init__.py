@@ -4,3 +4,4 @@ Examples include code for importing and analyzing traffic traces, modeling the
 behavior of caches and statistical utilities.
 """
 from .stats import *
+from .traces import *
@@ -0,0 +1,758 @@
+"""Functions for reading and converting traces of SFC requests.
+
+Text traces are CSV files where each line lists the id of a request followed
+by the VNFs of its SFC, as written by GenerateTraceDrivenRequests. They may be
+compressed with gzip (.gz), xz (.xz, .lzma) or, if the zstandard package is
+installed, zstd (.zst, .zstd), and are decompressed while they are read. They
+are decoded in large blocks, whose lines are split into arrays of VNFs at
+once. The index of a text trace stores the position of each block, so that
+requests at the start of the trace are skipped by seeking instead of parsing
+them.
+
+Binary traces store the same requests in a directory of flat arrays, which
+are memory-mapped when read, so that experiments running in parallel share
+the pages of the trace instead of each parsing the text file:
+
+ * meta.json: the number of requests and of VNFs and the optional columns
+ * vnfs.u8: the VNFs of all SFCs, one after the other, as uint8
+ * offsets.i8: the position of the first VNF of each SFC in vnfs.u8, plus
+   the total number of VNFs, as int64
+ * ids.i8: the id of each request, as int64
+ * timestamps.f8, ingress.i8, egress.i8, delays.f8: optional arrival time,
+   as float64, ingress and egress nodes, as int64, and delay budget, as
+   float64, of each request
+"""
+import io
+import os
+import gzip
+import json
+import lzma
+import queue
+import numbers
+import operator
+import itertools
+import threading
+from array import array
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+__all__ = [
+    'open_sfc_trace',
+    'parse_sfc_trace_line',
+    'read_sfc_trace',
+    'read_sfc_trace_blocks',
+    'index_sfc_trace',
+    'load_sfc_trace_index',
+    'write_sfc_trace',
+    'convert_sfc_trace',
+    'SfcTrace',
+    'TraceRecorder',
+]
+
+# Version of the format of binary traces
+SFC_TRACE_VERSION = 1
+
+# Names and types of the columns of binary traces
+_COLUMNS = {
+    'vnfs': ('vnfs.u8', np.uint8),
+    'offsets': ('offsets.i8', np.int64),
+    'ids': ('ids.i8', np.int64),
+    'timestamps': ('timestamps.f8', np.float64),
+    'ingress_nodes': ('ingress.i8', np.int64),
+    'egress_nodes': ('egress.i8', np.int64),
+    'delays': ('delays.f8', np.float64),
+}
+
+_OPTIONAL_COLUMNS = ('timestamps', 'ingress_nodes', 'egress_nodes', 'delays')
+
+# Number of bytes of a text trace decoded at once, once decompressed
+TEXT_BLOCK_SIZE = 1 << 22
+
+# Number of bytes of the first block of a text trace decoded
+_FIRST_BLOCK_SIZE = 1 << 16
+
+# Suffix of the path of the index of a text trace
+SFC_TRACE_INDEX_SUFFIX = '.idx.npz'
+
+# Longest decimal VNF that fits an int64
+_MAX_DIGITS = 18
+
+# Number of requests buffered in memory while writing a binary trace
+_CHUNK_SIZE = 1 << 16
+
+_MISSING = object()
+
+# Getters of the fields of the (time, event) tuples written by TraceRecorder
+_TIME = operator.itemgetter(0)
+_EVENT = operator.itemgetter(1)
+_SFC = operator.attrgetter('sfc')
+_INGRESS_NODE = operator.attrgetter('ingress_node')
+_EGRESS_NODE = operator.attrgetter('egress_node')
+_DELAY = operator.attrgetter('delay')
+
+
+def open_sfc_trace(path):
+    """Open a text trace of SFC requests for reading bytes, decompressing it
+    according to the extension of its path
+
+    Parameters
+    ----------
+    path : str
+        The path of the trace. Traces ending with .gz are decompressed with
+        gzip, with .xz or .lzma with xz and with .zst or .zstd with zstd
+
+    Returns
+    -------
+    f : file object
+        The binary file of the decompressed trace
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.gz':
+        return gzip.open(path, 'rb')
+    if extension in ('.xz', '.lzma'):
+        return lzma.open(path, 'rb')
+    if extension in ('.zst', '.zstd'):
+        if zstandard is None:
+            raise ImportError('Reading %s requires the zstandard package' % path)
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True,
+                                                          closefd=True)
+    return open(path, 'rb', buffering=0)
+
+
+def parse_sfc_trace_line(line, line_number=0, path=None):
+    """Parse a line of a text trace of SFC requests
+
+    Parameters
+    ----------
+    line : str
+        The line
+    line_number : int, optional
+        The position of the line in the trace, starting from 0. The first
+        line is skipped if it is a header
+    path : str, optional
+        The path of the trace, reported in errors
+
+    Returns
+    -------
+    request : tuple
+        The id of the request, as a string, and the list of the VNFs of its
+        SFC, or None if the line is blank or is the header
+    """
+    fields = [field.strip() for field in line.split(',')]
+    if not any(fields):
+        return None
+    try:
+        vnfs = [int(field) for field in fields[1:] if field]
+    except ValueError:
+        if line_number == 0:
+            return None
+        raise ValueError('Invalid SFC at line %d of %s: %r' % (line_number + 1, path, line))
+    return fields[0], vnfs
+
+
+def read_sfc_trace(path):
+    """Iterate over the requests of a text trace of SFC requests
+
+    Parameters
+    ----------
+    path : str
+        The path of the trace, which may be compressed
+
+    Returns
+    -------
+    requests : iterator
+        Iterator over the (id, vnfs) tuples of the requests
+    """
+    with io.TextIOWrapper(io.BufferedReader(open_sfc_trace(path), TEXT_BLOCK_SIZE)) as f:
+        for line_number, line in enumerate(f):
+            request = parse_sfc_trace_line(line, line_number, path)
+            if request is not None:
+                yield request
+
+
+def _read_blocks(f, block_size):
+    """Iterate over blocks of whole lines of a binary file.
+
+    Blocks grow from _FIRST_BLOCK_SIZE up to *block_size*, so that reading
+    only the start of a file does not decode a whole block.
+    """
+    tail = b''
+    size = min(_FIRST_BLOCK_SIZE, block_size)
+    while True:
+        data = f.read(size)
+        size = min(2 * size, block_size)
+        if not data:
+            if tail:
+                yield tail if tail.endswith(b'\n') else tail + b'\n'
+            return
+        data = tail + data
+        cut = data.rfind(b'\n') + 1
+        tail = data[cut:]
+        if cut:
+            yield data[:cut]
+
+
+def _parse_lines(text, line_number, path):
+    """Parse the lines of a block one by one.
+
+    Return the VNFs of the SFCs and their offsets, the number of lines and
+    the error raised by the first invalid line, if any, before which parsing
+    stops.
+    """
+    vnfs = array('q')
+    offsets = [0]
+    n_lines = 0
+    for n_lines, line in enumerate(io.StringIO(text, newline=None), 1):
+        try:
+            request = parse_sfc_trace_line(line, line_number + n_lines - 1, path)
+            if request is not None:
+                try:
+                    vnfs.extend(request[1])
+                except OverflowError:
+                    raise ValueError('Invalid SFC at line %d of %s: %r'
+                                     % (line_number + n_lines, path, line))
+                offsets.append(len(vnfs))
+        except ValueError as error:
+            del vnfs[offsets[-1]:]
+            return (np.array(vnfs, dtype=np.int64), np.array(offsets, dtype=np.int64),
+                    n_lines - 1, error)
+    return np.array(vnfs, dtype=np.int64), np.array(offsets, dtype=np.int64), n_lines, None
+
+
+def _split_lines(data):
+    """Split the lines of a block into the VNFs of their SFCs at once.
+
+    Return the VNFs of the SFCs, their offsets and the number of lines, or
+    None if the block holds characters other than digits, commas and white
+    space, or fields that are not separated by commas, in which case its
+    lines must be parsed one by one.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    digit = (buf >= ord('0')) & (buf <= ord('9'))
+    newline = buf == ord('\n')
+    comma = buf == ord(',')
+    carriage_return = buf == ord('\r')
+    if not (digit | newline | comma | carriage_return | (buf == ord(' '))
+            | (buf == ord('\t'))).all():
+        return None
+    # Carriage returns are accepted only at the end of lines
+    if not newline[np.flatnonzero(carriage_return) + 1].all():
+        return None
+    starts = np.flatnonzero(digit[1:] & ~digit[:-1]) + 1
+    if digit[0]:
+        starts = np.concatenate(([0], starts))
+    ends = np.flatnonzero(digit[:-1] & ~digit[1:]) + 1
+
+    # Number of newlines and of commas before each field and each line
+    newlines_before = np.cumsum(newline, dtype=np.int32)
+    commas_before = np.cumsum(comma, dtype=np.int32)
+    lines = newlines_before[starts]
+    field_commas = commas_before[starts]
+    line_commas = np.concatenate(([0], commas_before[newline]))
+    n_lines = len(line_commas) - 1
+    first = np.ones(len(starts), dtype=bool)
+    first[1:] = lines[1:] != lines[:-1]
+    # Fields of a line must be separated by commas and the first one, the id
+    # of the request, must come before the first comma
+    if (field_commas[1:] == field_commas[:-1])[~first[1:]].any():
+        return None
+    if (field_commas[first] != line_commas[lines[first]]).any():
+        return None
+
+    # Decimal values of the VNFs, which follow the id of each line
+    starts = starts[~first]
+    lengths = ends[~first] - starts
+    max_length = lengths.max() if len(lengths) else 0
+    if max_length > _MAX_DIGITS:
+        return None
+    vnfs = np.zeros(len(starts), dtype=np.int64)
+    for position in range(max_length):
+        digits = buf[np.minimum(starts + position, len(buf) - 1)] - ord('0')
+        vnfs = np.where(lengths > position, vnfs * 10 + digits, vnfs)
+    lengths = np.bincount(lines[~first], minlength=n_lines)[lines[first]]
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return vnfs, offsets, n_lines
+
+
+def _parse_block(data, line_number, path):
+    """Return the VNFs of the SFCs of a block of lines, their offsets, the
+    number of lines and the error raised by the first invalid line, if any
+    """
+    if line_number == 0:
+        # The first line of the trace may be a header
+        cut = data.find(b'\n') + 1
+        if b'\r' not in data[:cut].rstrip(b'\r\n'):
+            head = _parse_lines(data[:cut].decode('utf-8'), 0, path)
+            split = _split_lines(data[cut:]) if cut < len(data) else \
+                (np.empty(0, dtype=np.int64), np.zeros(1, dtype=np.int64), 0)
+            if split is not None:
+                vnfs, offsets, n_lines = split
+                return (np.concatenate((head[0], vnfs)),
+                        np.concatenate((head[1], offsets[1:] + head[1][-1])),
+                        n_lines + 1, None)
+    else:
+        split = _split_lines(data)
+        if split is not None:
+            return split + (None,)
+    return _parse_lines(data.decode('utf-8'), line_number, path)
+
+
+def _iter_blocks(path, block_size, index=None, start=0):
+    """Iterate over the parsed blocks of a text trace, seeking to the block
+    holding request *start* if an index is given.
+
+    Yield the number of requests and of lines before each block, its
+    position in the decompressed trace, the VNFs of its SFCs and their
+    offsets. Errors are raised once the requests before them are yielded.
+    """
+    n_requests = n_lines = position = 0
+    with open_sfc_trace(path) as f:
+        if index is not None:
+            block = np.searchsorted(index['requests'], start, side='right') - 1
+            if block > 0:
+                n_requests = int(index['requests'][block])
+                n_lines = int(index['lines'][block])
+                position = int(index['positions'][block])
+                f.seek(position)
+        for data in _read_blocks(f, block_size):
+            vnfs, offsets, block_lines, error = _parse_block(data, n_lines, path)
+            yield n_requests, n_lines, position, vnfs, offsets
+            if error is not None:
+                raise error
+            n_requests += len(offsets) - 1
+            n_lines += block_lines
+            position += len(data)
+
+
+def read_sfc_trace_blocks(path, start=0, block_size=TEXT_BLOCK_SIZE):
+    """Iterate over the SFCs of a text trace of SFC requests in blocks
+
+    Blocks of the decompressed trace are decoded at once into arrays. If the
+    trace has an up-to-date index, written by index_sfc_trace, the requests
+    before *start* are skipped by seeking to the block holding request
+    *start*, which saves parsing the blocks before it. Compressed traces are
+    still decompressed up to that block.
+
+    Parameters
+    ----------
+    path : str
+        The path of the trace, which may be compressed
+    start : int, optional
+        The number of requests skipped at the start of the trace
+    block_size : int, optional
+        The number of bytes of the decompressed trace decoded at once
+
+    Returns
+    -------
+    blocks : iterator
+        Iterator over (vnfs, offsets) tuples of arrays of int64, where the
+        VNFs of the SFC of the i-th request of a block are
+        vnfs[offsets[i]:offsets[i + 1]]
+    """
+    if start < 0:
+        raise ValueError('start must be non-negative')
+    index = load_sfc_trace_index(path) if start > 0 else None
+    for first, _, _, vnfs, offsets in _iter_blocks(path, block_size, index, start):
+        skip = start - first
+        if skip >= len(offsets) - 1:
+            continue
+        if skip > 0:
+            vnfs = vnfs[offsets[skip]:]
+            offsets = offsets[skip:] - offsets[skip]
+        yield vnfs, offsets
+
+
+def _index_path(path):
+    return path + SFC_TRACE_INDEX_SUFFIX
+
+
+def _trace_stat(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def index_sfc_trace(path, block_size=TEXT_BLOCK_SIZE):
+    """Write the index of a text trace of SFC requests, next to the trace
+
+    The index stores the number of requests and of lines before each block
+    of the trace and the position of the block in the decompressed trace.
+
+    Parameters
+    ----------
+    path : str
+        The path of the trace, which may be compressed
+    block_size : int, optional
+        The number of bytes of the decompressed trace between two entries of
+        the index
+
+    Returns
+    -------
+    n_requests : int
+        The number of requests of the trace
+    """
+    requests, lines, positions = [], [], []
+    n_requests = 0
+    for n_requests, n_lines, position, _, offsets in _iter_blocks(path, block_size):
+        requests.append(n_requests)
+        lines.append(n_lines)
+        positions.append(position)
+        n_requests += len(offsets) - 1
+    size, mtime_ns = _trace_stat(path)
+    with open(_index_path(path), 'wb') as f:
+        np.savez(f, requests=np.array(requests, dtype=np.int64),
+                 lines=np.array(lines, dtype=np.int64),
+                 positions=np.array(positions, dtype=np.int64),
+                 stat=np.array([size, mtime_ns, n_requests], dtype=np.int64))
+    return n_requests
+
+
+def load_sfc_trace_index(path):
+    """Return the index of a text trace of SFC requests
+
+    Parameters
+    ----------
+    path : str
+        The path of the trace
+
+    Returns
+    -------
+    index : dict
+        The arrays 'requests', 'lines' and 'positions', with an entry per
+        block, or None if the trace has no index or changed since it was
+        indexed
+    """
+    try:
+        with np.load(_index_path(path)) as f:
+            index = {name: f[name] for name in ('requests', 'lines', 'positions', 'stat')}
+    except FileNotFoundError:
+        return None
+    if tuple(index['stat'][:2]) != _trace_stat(path):
+        return None
+    return index
+
+
+def write_sfc_trace(path, sfcs, ids=None, timestamps=None, ingress_nodes=None,
+                    egress_nodes=None, delays=None):
+    """Write SFC requests to a binary trace
+
+    Requests are written in blocks, so that traces larger than memory can be
+    written from iterators.
+
+    Parameters
+    ----------
+    path : str
+        The directory of the trace. It is created if it does not exist
+    sfcs : iterable
+        The SFCs of the requests, each a sequence of VNFs from 0 to 255
+    ids : iterable, optional
+        The integer ids of the requests. By default, requests are numbered
+        from 1
+    timestamps : iterable, optional
+        The time of arrival of each request
+    ingress_nodes : iterable, optional
+        The ingress node of each request, as an integer
+    egress_nodes : iterable, optional
+        The egress node of each request, as an integer
+    delays : iterable, optional
+        The delay budget of each request
+
+    Returns
+    -------
+    n_requests : int
+        The number of requests written
+    """
+    columns = {'timestamps': timestamps, 'ingress_nodes': ingress_nodes,
+               'egress_nodes': egress_nodes, 'delays': delays}
+    columns = {name: values for name, values in columns.items() if values is not None}
+    names = sorted(columns)
+    ids = ids if ids is not None else itertools.count(1)
+
+    def requests():
+        for request in itertools.zip_longest(ids, sfcs, *[columns[name] for name in names],
+                                             fillvalue=_MISSING):
+            if request[1] is _MISSING:
+                if isinstance(ids, itertools.count) and \
+                        all(value is _MISSING for value in request[2:]):
+                    return
+                raise ValueError('Columns of the trace have more values than SFCs')
+            if _MISSING in request:
+                raise ValueError('Columns of the trace have fewer values than SFCs')
+            yield request
+
+    return _write_requests(path, requests(), names)
+
+
+class _TraceWriter(object):
+    """Append blocks of requests to the files of a binary trace"""
+
+    def __init__(self, path, columns):
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self.path = path
+        self.columns = columns
+        self.files = {name: open(os.path.join(path, _COLUMNS[name][0]), 'wb')
+                      for name in ['ids', 'vnfs', 'offsets'] + columns}
+        self.n_requests = 0
+        self.n_vnfs = 0
+
+    def write(self, ids, vnfs, lengths, values):
+        """Write a block of requests
+
+        Parameters
+        ----------
+        ids : list
+            The ids of the requests
+        vnfs : bytes
+            The VNFs of all the SFCs of the block, one after the other
+        lengths : list
+            The number of VNFs of each SFC
+        values : dict
+            The list of the values of each optional column
+        """
+        offsets = array('q', itertools.accumulate(lengths, initial=self.n_vnfs))
+        offsets.pop()
+        for name, column in [('ids', ids), ('offsets', offsets)] + \
+                [(name, values[name]) for name in self.columns]:
+            if not isinstance(column, array):
+                column = array(np.dtype(_COLUMNS[name][1]).char, column)
+            column.tofile(self.files[name])
+        self.files['vnfs'].write(vnfs)
+        self.n_requests += len(lengths)
+        self.n_vnfs += len(vnfs)
+
+    def close(self):
+        """Write the end of the offsets and the metadata of the trace"""
+        array('q', [self.n_vnfs]).tofile(self.files['offsets'])
+        for f in self.files.values():
+            f.close()
+        meta = {'version': SFC_TRACE_VERSION, 'n_requests': self.n_requests,
+                'n_vnfs': self.n_vnfs, 'columns': self.columns}
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        return self.n_requests
+
+    def abort(self):
+        for f in self.files.values():
+            f.close()
+
+
+def _write_requests(path, requests, columns):
+    """Write (id, sfc, column values...) tuples to a binary trace"""
+    writer = _TraceWriter(path, columns)
+    try:
+        for block in iter(lambda: list(itertools.islice(requests, _CHUNK_SIZE)), []):
+            vnfs = array('B')
+            lengths = []
+            for position, request in enumerate(block):
+                length = len(vnfs)
+                try:
+                    vnfs.extend(request[1])
+                except OverflowError:
+                    raise ValueError('Invalid SFC %r of request %d: VNFs must be between '
+                                     '0 and 255' % (request[1], writer.n_requests + position))
+                lengths.append(len(vnfs) - length)
+            values = {name: [request[i] for request in block]
+                      for i, name in enumerate(columns, 2)}
+            writer.write([request[0] for request in block], vnfs.tobytes(), lengths, values)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
+
+
+def convert_sfc_trace(csv_path, path):
+    """Convert a text trace of SFC requests to a binary trace
+
+    Parameters
+    ----------
+    csv_path : str
+        The path of the text trace, whose lines list the integer id of a
+        request followed by the VNFs of its SFC
+    path : str
+        The directory of the binary trace
+
+    Returns
+    -------
+    n_requests : int
+        The number of requests converted
+    """
+    def requests():
+        for position, (request_id, vnfs) in enumerate(read_sfc_trace(csv_path)):
+            try:
+                request_id = int(request_id)
+            except ValueError:
+                raise ValueError('Invalid id %r of request %d of %s: ids must be integers'
+                                 % (request_id, position, csv_path))
+            yield request_id, vnfs
+
+    return _write_requests(path, requests(), [])
+
+
+class SfcTrace(object):
+    """Binary trace of SFC requests, whose columns are memory-mapped.
+
+    Columns are read-only NumPy arrays, or None for optional columns not in
+    the trace.
+    """
+
+    def __init__(self, path):
+        """Constructor
+
+        Parameters
+        ----------
+        path : str
+            The directory of the trace, as written by write_sfc_trace
+        """
+        meta_path = os.path.join(path, 'meta.json')
+        if not os.path.isfile(meta_path):
+            raise ValueError('%s is not a binary SFC trace' % path)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('version') != SFC_TRACE_VERSION:
+            raise ValueError('Unsupported version %r of SFC trace %s'
+                             % (meta.get('version'), path))
+        self.path = path
+        self.n_requests = meta['n_requests']
+        self.n_vnfs = meta['n_vnfs']
+        lengths = {'vnfs': self.n_vnfs, 'offsets': self.n_requests + 1}
+        for name in _COLUMNS:
+            if name in _OPTIONAL_COLUMNS and name not in meta['columns']:
+                setattr(self, name, None)
+                continue
+            setattr(self, name, self._map(name, lengths.get(name, self.n_requests)))
+
+    def _map(self, name, length):
+        filename, dtype = _COLUMNS[name]
+        if length == 0:
+            return np.zeros(0, dtype=dtype)
+        column = np.memmap(os.path.join(self.path, filename), dtype=dtype, mode='r')
+        if len(column) != length:
+            raise ValueError('Column %s of SFC trace %s has %d values instead of %d'
+                             % (name, self.path, len(column), length))
+        return column
+
+    def __len__(self):
+        return self.n_requests
+
+    def sfc(self, i):
+        """Return the VNFs of the SFC of a request, as a view of the trace"""
+        return self.vnfs[self.offsets[i]:self.offsets[i + 1]]
+
+
+class TraceRecorder(object):
+    """Write the events of a workload to a binary trace from a background
+    thread.
+
+    Blocks of (time, event) tuples are put in a bounded queue, drained by a
+    thread writing the arrival time, the ingress and egress nodes, the VNFs
+    of the SFC and the delay budget of each request. Nodes must be integers.
+    Replaying the trace with the TRACE_DRIVEN_BINARY workload, with the same
+    number of warmup requests, yields the same events.
+    """
+
+    def __init__(self, path, catalog, max_blocks=16):
+        """Constructor
+
+        Parameters
+        ----------
+        path : str
+            The directory of the trace
+        catalog : VnfCatalog
+            The catalog that interned the SFCs of the events
+        max_blocks : int, optional
+            The maximum number of blocks waiting to be written. Once reached,
+            put blocks until the writer catches up
+        """
+        if max_blocks <= 0:
+            raise ValueError('max_blocks must be positive')
+        self.path = path
+        self.catalog = catalog
+        self.n_requests = 0
+        self._sfc_bytes_cache = {}
+        self._queue = queue.Queue(max_blocks)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='TraceRecorder')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _sfc_bytes(self, sfc):
+        # SFC ids are resolved without interning, which is left to the
+        # thread generating events
+        key = sfc if isinstance(sfc, numbers.Integral) else getattr(sfc, 'id', None)
+        if key is None:
+            vnfs = sfc
+        elif key in self._sfc_bytes_cache:
+            return self._sfc_bytes_cache[key]
+        else:
+            vnfs = self.catalog.sfc_spec(key).vnfs
+        try:
+            value = bytes(vnfs)
+        except ValueError:
+            raise ValueError('Invalid SFC %r: VNFs must be between 0 and 255' % (sfc,))
+        if key is not None:
+            self._sfc_bytes_cache[key] = value
+        return value
+
+    def _write_block(self, writer, block):
+        # Columns are extracted by built-in functions without allocating
+        # objects per event, so that the thread holds the interpreter lock as
+        # little as possible and does not trigger garbage collections
+        events = list(map(_EVENT, block))
+        sfcs = list(map(_SFC, events))
+        cache = self._sfc_bytes_cache
+        try:
+            vnfs = list(map(cache.__getitem__, sfcs))
+        except (KeyError, TypeError):
+            vnfs = list(map(self._sfc_bytes, sfcs))
+        values = {'timestamps': list(map(_TIME, block)),
+                  'ingress_nodes': list(map(_INGRESS_NODE, events)),
+                  'egress_nodes': list(map(_EGRESS_NODE, events)),
+                  'delays': list(map(_DELAY, events))}
+        ids = range(writer.n_requests + 1, writer.n_requests + len(block) + 1)
+        writer.write(array('q', ids), b''.join(vnfs), list(map(len, vnfs)), values)
+
+    def _run(self):
+        writer = None
+        try:
+            writer = _TraceWriter(self.path, sorted(_OPTIONAL_COLUMNS))
+            for block in iter(self._queue.get, None):
+                self._write_block(writer, block)
+            self.n_requests = writer.close()
+        except Exception as e:
+            if writer is not None:
+                writer.abort()
+            self._error = e
+            # Blocks are still consumed, so that put never blocks forever
+            while self._queue.get() is not None:
+                pass
+
+    def put(self, block):
+        """Queue a block of (time, event) tuples to be written
+
+        Parameters
+        ----------
+        block : list
+            The block. Its events must not be modified afterwards
+        """
+        self._queue.put(block)
+
+    def close(self):
+        """Write the blocks queued and the metadata of the trace
+
+        Returns
+        -------
+        n_requests : int
+            The number of requests written
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise ValueError('Could not record trace %s: %s' % (self.path, self._error))
+        return self.n_requests